@@ -0,0 +1,31 @@
+"""
+Runs all benchmarks.
+
+Usage: python -m benchmarks [--sizes 1000,10000] [--runs 10] [--output bench.json]
+"""
+import argparse
+
+from benchmarks import bench_chain, bench_cli, bench_sqlite
+from benchmarks.common import write
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="benchmarks")
+    parser.add_argument("--sizes", default="1000,10000", help="Number of seeded tasks, comma separated")
+    parser.add_argument("--runs", type=int, default=10, help="Samples per end-to-end benchmark")
+    parser.add_argument("--output", help="JSON output file, default stdout")
+    args = parser.parse_args()
+
+    results = dict()
+    results.update(bench_chain.bench_dispatch([1, 10, 100], 1000))
+    results.update(bench_chain.bench_factories(1000))
+    for size in [int(size) for size in args.sizes.split(",")]:
+        results.update(bench_cli.bench_size(size, args.runs))
+    for profile in bench_sqlite.PROFILES:
+        results.update(bench_sqlite.bench_insert(profile, 10000, args.runs))
+
+    write(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmarks of the chain engine and the factories.
+
+Usage: python -m benchmarks.bench_chain [--sizes 1,10,100] [--runs 1000] [--output chain.json]
+"""
+import argparse
+import logging
+
+from benchmarks.common import measure, write
+from zenith.chain import Chain, Command, CommandState, Context, Processor, Runner
+from zenith.factory.client import ClientFactory
+from zenith.factory.project import ProjectFactory
+from zenith.factory.task import TaskFactory
+
+
+class NopCommand(Command):
+    pass
+
+
+def create_processor(size: int, parallel: bool = False) -> Processor:
+    processor = Processor(parallel)
+
+    for chain in (processor.initialization, processor.reporting, processor.authentication,
+                  processor.authorization, processor.validating, processor.processing):
+        for n in range(size):
+            chain.append(NopCommand())
+
+    return processor
+
+
+def run_uncompiled(processor: Chain, context: Context) -> None:
+    Chain.execute(processor, context)
+    Chain.post_execute(processor, context, CommandState.SUCCESS, None)
+
+
+def run_compiled(processor: Chain, context: Context) -> None:
+    plan = processor.compile()
+    plan.execute(context)
+    plan.post_execute(context, CommandState.SUCCESS, None)
+
+
+def bench_dispatch(sizes: list, runs: int) -> dict:
+    results = dict()
+    context = Context()
+
+    for size in sizes:
+        chain = Chain()
+        runner = Runner()
+        for n in range(size):
+            chain.append(NopCommand())
+            runner.append(NopCommand())
+
+        uncompiled = create_processor(size)
+        compiled = create_processor(size)
+        compiled.compile()
+        parallel = create_processor(size, True)
+
+        results[f"chain/{size}"] = measure(lambda: run_uncompiled(chain, context), runs, number=10)
+        results[f"runner/{size}"] = measure(lambda: runner.execute(context), runs, number=10)
+        results[f"processor/uncompiled/{size * 6}"] = measure(lambda: run_uncompiled(uncompiled, context), runs,
+                                                              number=10)
+        results[f"processor/compiled/{size * 6}"] = measure(lambda: run_compiled(compiled, context), runs,
+                                                            number=10)
+        results[f"processor/parallel/{size * 6}"] = measure(lambda: parallel.execute(context), runs, number=10)
+
+    return results
+
+
+def bench_factories(runs: int) -> dict:
+    results = dict()
+
+    for factory in (ClientFactory, ProjectFactory, TaskFactory):
+        # Parallel scheduling is opt-in: compiling it also groups the commands in stages
+        parallel = type(factory.__name__, (factory,), {"parallel": True})
+
+        for name in sorted(dir(factory)):
+            if name.startswith("create_") and name != "create_default":
+                # The uncached factory method: build and compile the processor, as @template does once
+                create = getattr(factory, name).__wrapped__
+                results[f"factory/{factory.__name__}.{name}"] = measure(
+                    lambda: create(factory, logging.ERROR).compile(), runs, number=10)
+                results[f"factory/parallel/{factory.__name__}.{name}"] = measure(
+                    lambda: create(parallel, logging.ERROR).compile(), runs, number=10)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_chain")
+    parser.add_argument("--sizes", default="1,10,100", help="Commands per chain or phase, comma separated")
+    parser.add_argument("--runs", type=int, default=1000, help="Samples per benchmark")
+    parser.add_argument("--output", help="JSON output file, default stdout")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = dict()
+    results.update(bench_dispatch(sizes, args.runs))
+    results.update(bench_factories(args.runs))
+
+    write(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
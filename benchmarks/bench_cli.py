@@ -0,0 +1,114 @@
+"""
+End-to-end benchmarks of `zenith task start/stop/list`, against temporary .zenith directories seeded with tasks.
+
+Usage: python -m benchmarks.bench_cli [--sizes 1000,10000] [--runs 10] [--output cli.json]
+"""
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+
+from benchmarks.common import statistics, write
+from zenith.models import Client, Project, Task, TaskState
+
+# Run the zenith package of this source tree
+ENVIRONMENT = dict(os.environ)
+ENVIRONMENT["PYTHONPATH"] = os.pathsep.join(
+    [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] +
+    [path for path in os.environ.get("PYTHONPATH", "").split(os.pathsep) if path])
+
+
+def zenith(directory: str, *args) -> float:
+    """
+    Runs zenith in the directory.
+
+    :return: the duration in seconds
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "zenith", *args], cwd=directory, env=ENVIRONMENT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def seed(directory: str, size: int, new: int) -> list:
+    """
+    Initializes a .zenith directory with an active client and project, size stopped and new tasks.
+
+    :return: the IDs of the new tasks
+    """
+    zenith(directory, "init")
+
+    engine = create_engine(f"sqlite:///{os.path.join(directory, '.zenith', 'var', 'db', 'zenith.db')}")
+    now = datetime.datetime.now()
+
+    with engine.begin() as connection:
+        connection.execute(insert(Client), [{"client_name": "bench", "client_active": True}])
+        connection.execute(insert(Project), [{"client_id": 1, "project_name": "bench", "project_active": True}])
+
+        chunk = 10000
+        for offset in range(0, size, chunk):
+            connection.execute(insert(Task), [
+                {"project_id": 1, "task_name": f"task {n}", "task_state": TaskState.STOPPED, "task_start": now,
+                 "task_finish": now, "task_duration": 60} for n in range(offset, min(size, offset + chunk))])
+
+        connection.execute(insert(Task), [{"project_id": 1, "task_state": TaskState.NEW} for n in range(new)])
+
+    engine.dispose()
+    return list(range(size + 1, size + new + 1))
+
+
+def configure(directory: str, profile: str) -> None:
+    """
+    Selects the SQLite profile of the .zenith directory.
+    """
+    etc_dir = os.path.join(directory, ".zenith", "var", "etc")
+    os.makedirs(etc_dir, exist_ok=True)
+
+    with open(os.path.join(etc_dir, "zenith.ini"), "wt") as file:
+        file.write(f"[database]\nprofile = {profile}\n")
+
+
+def bench_size(size: int, runs: int, profile: str = None) -> dict:
+    results = dict()
+    prefix = f"cli/{profile}" if profile else "cli"
+
+    with tempfile.TemporaryDirectory(prefix="zenith-bench-") as directory:
+        task_ids = seed(directory, size, runs)
+        if profile:
+            configure(directory, profile)
+
+        start = list()
+        stop = list()
+        for task_id in task_ids:
+            start.append(zenith(directory, "task", "start", str(task_id)))
+            stop.append(zenith(directory, "task", "stop", str(task_id)))
+
+        results[f"{prefix}/task start/{size}"] = statistics(start)
+        results[f"{prefix}/task stop/{size}"] = statistics(stop)
+        results[f"{prefix}/task list/{size}"] = statistics([zenith(directory, "task", "list") for n in range(runs)])
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_cli")
+    parser.add_argument("--sizes", default="1000,10000", help="Number of seeded tasks, comma separated, "
+                                                              "e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--runs", type=int, default=10, help="Samples per benchmark")
+    parser.add_argument("--output", help="JSON output file, default stdout")
+    args = parser.parse_args()
+
+    results = dict()
+    for size in [int(size) for size in args.sizes.split(",")]:
+        results.update(bench_size(size, args.runs))
+
+    write(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
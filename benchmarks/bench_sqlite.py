@@ -0,0 +1,78 @@
+"""
+Benchmarks of the SQLite profiles: bulk inserts, single-row commits and `zenith task start/stop/list`.
+
+Usage: python -m benchmarks.bench_sqlite [--profiles durable,fast,bulk-load] [--rows 10000] [--sizes 1000]
+                                         [--runs 10] [--output sqlite.json]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+
+from benchmarks import bench_cli
+from benchmarks.common import statistics, write
+from zenith.command.database import PROFILES, apply_profile, read_profile
+from zenith.models import Base, Task, TaskState
+
+
+def engine(directory: str, profile: str):
+    result = create_engine(f"sqlite:///{os.path.join(directory, 'zenith.db')}")
+    apply_profile(result, read_profile(name=profile))
+    Base.metadata.create_all(result)
+    return result
+
+
+def bench_insert(profile: str, rows: int, runs: int) -> dict:
+    """
+    Times the insert of rows tasks in one transaction, and of runs tasks in a transaction each.
+    """
+    bulk = list()
+    single = list()
+
+    with tempfile.TemporaryDirectory(prefix="zenith-bench-") as directory:
+        db_engine = engine(directory, profile)
+
+        for n in range(runs):
+            start = time.perf_counter()
+            with db_engine.begin() as connection:
+                connection.execute(insert(Task), [
+                    {"project_id": 1, "task_name": f"task {m}", "task_state": TaskState.NEW} for m in range(rows)])
+            bulk.append(time.perf_counter() - start)
+
+        for n in range(runs * 10):
+            start = time.perf_counter()
+            with db_engine.begin() as connection:
+                connection.execute(insert(Task),
+                                   {"project_id": 1, "task_name": f"task {n}", "task_state": TaskState.NEW})
+            single.append(time.perf_counter() - start)
+
+        db_engine.dispose()
+
+    return {
+        f"sqlite/{profile}/bulk insert/{rows}": statistics(bulk),
+        f"sqlite/{profile}/single insert": statistics(single),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_sqlite")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Profiles, comma separated")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per bulk insert")
+    parser.add_argument("--sizes", default="1000", help="Number of seeded tasks of the CLI, comma separated")
+    parser.add_argument("--runs", type=int, default=10, help="Samples per benchmark")
+    parser.add_argument("--output", help="JSON output file, default stdout")
+    args = parser.parse_args()
+
+    results = dict()
+    for profile in args.profiles.split(","):
+        results.update(bench_insert(profile, args.rows, args.runs))
+        for size in [int(size) for size in args.sizes.split(",")]:
+            results.update(bench_cli.bench_size(size, args.runs, profile))
+
+    write(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark helpers: timing, percentiles and JSON results.
+"""
+import datetime
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+
+
+def percentile(samples: list, percent: float) -> float:
+    """
+    Returns the percentile of the sorted samples, nearest-rank method.
+    """
+    rank = max(1, math.ceil(percent / 100.0 * len(samples)))
+    return samples[rank - 1]
+
+
+def statistics(samples: list) -> dict:
+    """
+    Summarizes the samples, in milliseconds.
+
+    :param samples: durations in seconds
+    :return: dict with the count, mean, min, max and the 50th, 90th, 95th and 99th percentiles
+    """
+    samples = sorted(sample * 1000.0 for sample in samples)
+
+    return {
+        "runs": len(samples),
+        "mean_ms": sum(samples) / len(samples),
+        "min_ms": samples[0],
+        "p50_ms": percentile(samples, 50),
+        "p90_ms": percentile(samples, 90),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": samples[-1],
+    }
+
+
+def measure(function, runs: int = 100, warmup: int = 3, number: int = 1) -> dict:
+    """
+    Times the function.
+
+    :param function: called without arguments
+    :param runs: number of samples
+    :param warmup: number of calls before sampling
+    :param number: number of calls per sample, the sample is the mean of these calls
+    :return: statistics of the samples
+    """
+    for n in range(warmup):
+        function()
+
+    samples = list()
+    for n in range(runs):
+        start = time.perf_counter()
+        for m in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+
+    return statistics(samples)
+
+
+def version() -> str:
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write(results: dict, filename: str = None) -> None:
+    """
+    Writes the results as JSON, to stdout when there is no filename.
+    """
+    document = {
+        "version": version(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if filename:
+        with open(filename, "wt") as file:
+            json.dump(document, file, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,56 @@
+"""
+Compares two benchmark result files.
+
+Usage: python -m benchmarks.compare baseline.json current.json [--metric p50_ms] [--threshold 10]
+
+Exits with status 1 when a benchmark regressed by more than the threshold, in percent.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, current: dict, metric: str, threshold: float) -> list:
+    """
+    :return: list of (name, baseline, current, change in percent, regressed)
+    """
+    rows = list()
+
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+
+        before = baseline["results"][name][metric]
+        after = result[metric]
+        change = (after - before) / before * 100.0 if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="compare")
+    parser.add_argument("baseline", help="Baseline JSON file")
+    parser.add_argument("current", help="Current JSON file")
+    parser.add_argument("--metric", default="p50_ms", help="Metric to compare, default p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent, default 10")
+    args = parser.parse_args()
+
+    with open(args.baseline, "rt") as file:
+        baseline = json.load(file)
+    with open(args.current, "rt") as file:
+        current = json.load(file)
+
+    print(f"{baseline['version']} -> {current['version']} ({args.metric})")
+
+    regressions = 0
+    for name, before, after, change, regressed in compare(baseline, current, args.metric, args.threshold):
+        mark = "!" if regressed else " "
+        print(f"{mark} {name:48} {before:12.3f} {after:12.3f} {change:+8.1f}%")
+        regressions += regressed
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from zenith.chain import Context, Command, CommandState
+from zenith.aiochain import AsyncCommand
 
 class DummyContect(Context):
     def __init__(self):
@@ -37,3 +38,33 @@ class DummyErrorCommand(DummySuccessCommand):
     def execute(self, context: DummyContect) -> bool:
         super().execute(context)
         raise DummyException("Dummy exception")
+
+
+class AsyncDummySuccessCommand(AsyncCommand):
+    counter = 0
+    post_counter = 0
+    executed = False
+    state = CommandState.UNKNOWN
+
+    async def execute(self, context: DummyContect) -> bool:
+        context.counter += 1
+        self.executed = True
+        self.counter = context.counter
+        return AsyncCommand.SUCCESS
+
+    async def post_execute(self, context: DummyContect, state: CommandState, error: Exception = None) -> None:
+        context.post_counter += 1
+        self.state = state
+        self.post_counter = context.post_counter
+
+
+class AsyncDummyFailureCommand(AsyncDummySuccessCommand):
+    async def execute(self, context: DummyContect) -> bool:
+        await super().execute(context)
+        return AsyncCommand.FAILURE
+
+
+class AsyncDummyErrorCommand(AsyncDummySuccessCommand):
+    async def execute(self, context: DummyContect) -> bool:
+        await super().execute(context)
+        raise DummyException("Dummy exception")
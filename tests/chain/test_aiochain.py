@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import unittest
+
+from tests.chain.dummy import *
+from zenith.aiochain import AsyncChain, AsyncProcessor, AsyncRunner
+
+
+class BarrierCommand(Command):
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+    def execute(self, context: DummyContect) -> bool:
+        self.barrier.wait(timeout=5)
+        return Command.SUCCESS
+
+
+class TestAsyncRunner(unittest.TestCase):
+    def test01(self):
+        aap = AsyncDummySuccessCommand()
+        noot = AsyncDummySuccessCommand()
+        mies = AsyncDummySuccessCommand()
+
+        runner = AsyncRunner()
+        runner.append(aap)
+        runner.append(noot)
+        runner.append(mies)
+
+        context = DummyContect()
+        self.assertTrue(asyncio.run(runner.execute(context)))
+
+        self.assertEqual(1, aap.counter)
+        self.assertEqual(3, mies.counter)
+        self.assertEqual(3, aap.post_counter)
+        self.assertEqual(1, mies.post_counter)
+        self.assertEqual(CommandState.SUCCESS, aap.state)
+
+    def test02(self):
+        aap = AsyncDummySuccessCommand()
+        noot = AsyncDummyFailureCommand()
+        mies = AsyncDummySuccessCommand()
+
+        runner = AsyncRunner()
+        runner.append(aap)
+        runner.append(noot)
+        runner.append(mies)
+
+        context = DummyContect()
+        self.assertFalse(asyncio.run(runner.execute(context)))
+
+        self.assertTrue(noot.executed)
+        self.assertFalse(mies.executed)
+        self.assertEqual(CommandState.FAILURE, mies.state)
+        self.assertEqual(CommandState.FAILURE, aap.state)
+
+    def test03(self):
+        aap = AsyncDummySuccessCommand()
+        noot = AsyncDummyErrorCommand()
+        mies = AsyncDummyFailureCommand()
+
+        runner = AsyncRunner()
+        runner.append(aap)
+        runner.append(noot)
+        runner.append(mies)
+
+        context = DummyContect()
+        with self.assertRaises(DummyException):
+            asyncio.run(runner.execute(context))
+
+        self.assertFalse(mies.executed)
+        self.assertEqual(CommandState.ERROR, mies.state)
+        self.assertEqual(CommandState.ERROR, aap.state)
+
+    def test04(self):
+        """ Synchronous commands are adapted. """
+        aap = DummySuccessCommand()
+        noot = AsyncDummySuccessCommand()
+        mies = DummyFailureCommand()
+
+        chain = AsyncChain()
+        chain.append(aap)
+        chain.append(noot)
+
+        runner = AsyncRunner()
+        runner.append(chain)
+        runner.append(mies)
+
+        context = DummyContect()
+        self.assertFalse(asyncio.run(runner.execute(context)))
+
+        self.assertEqual(1, aap.counter)
+        self.assertEqual(2, noot.counter)
+        self.assertEqual(3, mies.counter)
+        self.assertEqual(3, aap.post_counter)
+        self.assertEqual(1, mies.post_counter)
+        self.assertEqual(CommandState.FAILURE, aap.state)
+
+    def test05(self):
+        """ Processor phases run in order. """
+        commands = [AsyncDummySuccessCommand() for n in range(6)]
+
+        processor = AsyncProcessor()
+        processor.initialization.append(commands[0])
+        processor.reporting.append(commands[1])
+        processor.authentication.append(commands[2])
+        processor.authorization.append(commands[3])
+        processor.validating.append(commands[4])
+        processor.processing.append(commands[5])
+
+        context = DummyContect()
+        self.assertTrue(asyncio.run(processor.execute(context)))
+
+        for n in range(6):
+            self.assertEqual(n + 1, commands[n].counter)
+            self.assertEqual(6 - n, commands[n].post_counter)
+
+    def test06(self):
+        """ Blocking synchronous commands of concurrent runners overlap. """
+        barrier = threading.Barrier(2)
+
+        runner0 = AsyncRunner()
+        runner0.append(BarrierCommand(barrier))
+        runner1 = AsyncRunner()
+        runner1.append(BarrierCommand(barrier))
+
+        async def run():
+            return await asyncio.gather(runner0.execute(DummyContect()), runner1.execute(DummyContect()))
+
+        self.assertEqual([True, True], asyncio.run(run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+from zenith.chain import Context
+from zenith.command.database import DatabaseContext
+
+
+class TypedContext(Context):
+    __slots__ = ("aap", "noot")
+
+    aap: str
+    noot: int
+
+
+class TestContext(unittest.TestCase):
+    def test01(self):
+        """ Dict-style access. """
+        context = Context(aap=1)
+        context["noot"] = 2
+
+        self.assertEqual(1, context["aap"])
+        self.assertEqual(2, context.get("noot"))
+        self.assertEqual(None, context.get("mies"))
+        self.assertTrue("aap" in context)
+        self.assertFalse("mies" in context)
+        self.assertEqual({"aap": 1, "noot": 2}, dict(context))
+
+        del context["aap"]
+        self.assertFalse("aap" in context)
+        with self.assertRaises(KeyError):
+            context["aap"]
+
+    def test02(self):
+        """ Declared fields are stored in slots. """
+        self.assertEqual({"aap": str, "noot": int}, TypedContext.fields)
+
+        context = TypedContext()
+        self.assertFalse(hasattr(context, "__dict__"))
+        self.assertFalse("aap" in context)
+        self.assertEqual(0, len(context))
+        with self.assertRaises(KeyError):
+            context["aap"]
+
+        context["aap"] = "Aap"
+        context["mies"] = 3
+
+        self.assertEqual("Aap", context.aap)
+        self.assertEqual("Aap", context["aap"])
+        self.assertEqual(["aap", "mies"], list(context))
+        self.assertEqual(2, len(context))
+
+        context.noot = 2
+        self.assertEqual(2, context["noot"])
+
+        del context["noot"]
+        self.assertFalse("noot" in context)
+        self.assertEqual(None, context.get("noot"))
+
+    def test03(self):
+        """ A fork is a shallow copy. """
+        context = TypedContext(aap="Aap", mies=3)
+        fork = context.fork()
+
+        fork["aap"] = "Noot"
+        fork["wim"] = 4
+
+        self.assertEqual("Aap", context["aap"])
+        self.assertEqual("Noot", fork["aap"])
+        self.assertEqual(3, fork["mies"])
+        self.assertFalse("wim" in context)
+        self.assertIsInstance(fork, TypedContext)
+
+    def test04(self):
+        """ The session of a database context is a field. """
+        context = DatabaseContext()
+        session = object()
+        context["session"] = session
+
+        self.assertIs(session, context.session)
+        self.assertIn("session", DatabaseContext.fields)
+
+    def test05(self):
+        """ The keys of a plain context are also attributes. """
+        context = Context(aap=1)
+        context.noot = 2
+
+        self.assertEqual(1, context.aap)
+        self.assertEqual(2, context["noot"])
+        self.assertEqual({"aap": 1, "noot": 2}, dict(context))
+        with self.assertRaises(AttributeError):
+            context.mies
+
+        del context.aap
+        self.assertFalse("aap" in context)
+
+        fork = context.fork()
+        fork.mies = 3
+        self.assertFalse("mies" in context)
+        self.assertEqual(3, fork["mies"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from tests.chain.dummy import *
+from zenith.chain import Chain, ChainException, Processor, Runner
+
+
+class TestPlan(unittest.TestCase):
+    def test01(self):
+        """ Nested chains are flattened in order. """
+        commands = [DummySuccessCommand() for n in range(6)]
+
+        chain0 = Chain()
+        chain1 = Chain()
+        chain0.append(commands[0])
+        chain0.append(commands[1])
+        chain1.append(commands[2])
+        chain1.append(commands[3])
+
+        runner = Runner()
+        runner.append(chain0)
+        runner.append(chain1)
+        runner.append(commands[4])
+        runner.append(commands[5])
+
+        plan = runner.compile()
+
+        self.assertEqual(6, len(plan))
+        self.assertEqual(tuple(commands), plan.commands)
+
+    def test02(self):
+        """ A runner is not flattened. """
+        aap = DummySuccessCommand()
+        noot = Runner()
+        noot.append(DummySuccessCommand())
+
+        runner = Runner()
+        runner.append(aap)
+        runner.append(noot)
+
+        plan = runner.compile()
+
+        self.assertEqual((aap, noot), plan.commands)
+
+    def test03(self):
+        """ A compiled chain is frozen. """
+        chain = Chain()
+        runner = Runner()
+        runner.append(chain)
+        runner.compile()
+
+        with self.assertRaises(ChainException):
+            runner.append(DummySuccessCommand())
+
+        with self.assertRaises(ChainException):
+            chain.append(DummySuccessCommand())
+
+    def test04(self):
+        """ The plan is compiled once. """
+        runner = Runner()
+        runner.append(DummySuccessCommand())
+
+        self.assertIs(runner.compile(), runner.compile())
+
+    def test05(self):
+        """ Processor phases are compiled in order. """
+        commands = [DummySuccessCommand() for n in range(6)]
+
+        processor = Processor()
+        processor.initialization.append(commands[0])
+        processor.reporting.append(commands[1])
+        processor.authentication.append(commands[2])
+        processor.authorization.append(commands[3])
+        processor.validating.append(commands[4])
+        processor.processing.append(commands[5])
+
+        context = DummyContect()
+        self.assertTrue(processor.execute(context))
+
+        for n in range(6):
+            self.assertEqual(n + 1, commands[n].counter)
+            self.assertEqual(6 - n, commands[n].post_counter)
+            self.assertEqual(CommandState.SUCCESS, commands[n].state)
+
+    def test06(self):
+        """ Failure stops the plan, every command is unwound. """
+        commands = [DummySuccessCommand() for n in range(6)]
+        commands[4] = DummyFailureCommand()
+
+        processor = Processor()
+        processor.initialization.append(commands[0])
+        processor.reporting.append(commands[1])
+        processor.authentication.append(commands[2])
+        processor.authorization.append(commands[3])
+        processor.validating.append(commands[4])
+        processor.processing.append(commands[5])
+
+        context = DummyContect()
+        self.assertFalse(processor.execute(context))
+
+        self.assertFalse(commands[5].executed)
+        for n in range(6):
+            self.assertEqual(6 - n, commands[n].post_counter)
+            self.assertEqual(CommandState.FAILURE, commands[n].state)
+
+    def test07(self):
+        """ Error stops the plan, every command is unwound. """
+        commands = [DummySuccessCommand() for n in range(6)]
+        commands[2] = DummyErrorCommand()
+
+        processor = Processor()
+        processor.initialization.append(commands[0])
+        processor.reporting.append(commands[1])
+        processor.authentication.append(commands[2])
+        processor.authorization.append(commands[3])
+        processor.validating.append(commands[4])
+        processor.processing.append(commands[5])
+
+        context = DummyContect()
+        with self.assertRaises(DummyException):
+            processor.execute(context)
+
+        self.assertFalse(commands[3].executed)
+        for n in range(6):
+            self.assertEqual(6 - n, commands[n].post_counter)
+            self.assertEqual(CommandState.ERROR, commands[n].state)
+
+
+if __name__ == '__main__':
+    unittest.main()
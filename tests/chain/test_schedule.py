@@ -0,0 +1,161 @@
+import threading
+import unittest
+
+from tests.chain.dummy import *
+from zenith.chain import ContextKeyException, Processor, Runner, schedule
+
+
+class KeyCommand(DummySuccessCommand):
+    exclusive = False
+
+    def __init__(self, requires: tuple = (), provides: tuple = ()):
+        self.requires = requires
+        self.provides = provides
+
+    def execute(self, context: DummyContect) -> bool:
+        for key in self.requires:
+            assert key in context
+        for key in self.provides:
+            context[key] = True
+        return super().execute(context)
+
+
+class BarrierCommand(KeyCommand):
+    def __init__(self, barrier: threading.Barrier):
+        super().__init__()
+        self.barrier = barrier
+
+    def execute(self, context: DummyContect) -> bool:
+        self.barrier.wait(timeout=5)
+        return Command.SUCCESS
+
+
+class TestSchedule(unittest.TestCase):
+    def test01(self):
+        """ Independent commands share a stage. """
+        aap = KeyCommand(provides=("aap",))
+        noot = KeyCommand(provides=("noot",))
+        mies = KeyCommand(requires=("aap", "noot"))
+
+        self.assertEqual([(aap, noot), (mies,)], schedule([aap, noot, mies]))
+
+    def test02(self):
+        """ A command waits for the last provider of a key. """
+        aap = KeyCommand(provides=("aap",))
+        noot = KeyCommand(requires=("aap",), provides=("aap",))
+        mies = KeyCommand(requires=("aap",))
+        wim = KeyCommand()
+
+        self.assertEqual([(aap, wim), (noot,), (mies,)], schedule([aap, noot, mies, wim]))
+
+    def test03(self):
+        """ A provider waits for earlier readers of the key. """
+        aap = KeyCommand(requires=("aap",))
+        noot = KeyCommand(provides=("aap",))
+
+        self.assertEqual([(aap,), (noot,)], schedule([aap, noot]))
+
+    def test04(self):
+        """ Exclusive commands keep their order. """
+        aap = DummySuccessCommand()
+        noot = DummySuccessCommand()
+        mies = KeyCommand()
+
+        self.assertEqual([(aap, mies), (noot,)], schedule([aap, noot, mies]))
+
+    def test05(self):
+        """ An ordered command runs after the earlier commands and before the later ones. """
+        aap = KeyCommand(provides=("aap",))
+        noot = KeyCommand(provides=("noot",))
+        mies = KeyCommand(requires=("aap",))
+        mies.ordered = True
+        wim = KeyCommand(provides=("wim",))
+        zus = KeyCommand()
+
+        self.assertEqual([(aap, noot), (mies,), (wim, zus)], schedule([aap, noot, mies, wim, zus]))
+
+
+class TestParallelProcessor(unittest.TestCase):
+    def test01(self):
+        """ Missing keys are reported before anything executes. """
+        aap = KeyCommand(provides=("aap",))
+        noot = KeyCommand(requires=("aap", "noot"))
+
+        runner = Runner()
+        runner.append(aap)
+        runner.append(noot)
+
+        context = DummyContect()
+        with self.assertRaises(ContextKeyException):
+            runner.execute(context)
+
+        self.assertFalse(aap.executed)
+        self.assertEqual(CommandState.ERROR, aap.state)
+
+    def test02(self):
+        """ Independent commands run concurrently. """
+        barrier = threading.Barrier(3)
+
+        processor = Processor(parallel=True)
+        processor.initialization.append(BarrierCommand(barrier))
+        processor.initialization.append(BarrierCommand(barrier))
+        processor.initialization.append(BarrierCommand(barrier))
+
+        self.assertTrue(processor.execute(DummyContect()))
+
+    def test03(self):
+        """ Phases are not merged, declared dependencies are honoured. """
+        commands = [
+            KeyCommand(provides=("aap",)),
+            KeyCommand(requires=("aap",), provides=("noot",)),
+            KeyCommand(provides=("mies",)),
+            KeyCommand(requires=("noot", "mies")),
+        ]
+
+        processor = Processor(parallel=True)
+        processor.initialization.append(commands[0])
+        processor.initialization.append(commands[1])
+        processor.initialization.append(commands[2])
+        processor.processing.append(commands[3])
+
+        self.assertEqual(3, len(processor.compile().stages))
+        self.assertTrue(processor.execute(DummyContect()))
+
+        for command in commands:
+            self.assertTrue(command.executed)
+            self.assertEqual(CommandState.SUCCESS, command.state)
+
+    def test04(self):
+        """ A failure within a stage stops the next stages. """
+        aap = DummyFailureCommand()
+        aap.exclusive = False
+        noot = KeyCommand()
+        mies = KeyCommand()
+
+        processor = Processor(parallel=True)
+        processor.initialization.append(aap)
+        processor.initialization.append(noot)
+        processor.processing.append(mies)
+
+        self.assertFalse(processor.execute(DummyContect()))
+        self.assertFalse(mies.executed)
+        self.assertEqual(CommandState.FAILURE, mies.state)
+
+    def test05(self):
+        """ An error within a stage is raised. """
+        aap = DummyErrorCommand()
+        aap.exclusive = False
+        noot = KeyCommand()
+
+        processor = Processor(parallel=True)
+        processor.initialization.append(aap)
+        processor.initialization.append(noot)
+
+        with self.assertRaises(DummyException):
+            processor.execute(DummyContect())
+
+        self.assertEqual(CommandState.ERROR, noot.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
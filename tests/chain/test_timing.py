@@ -0,0 +1,70 @@
+import unittest
+
+from tests.chain.dummy import *
+from zenith.chain import Processor, Runner
+
+
+class TestTiming(unittest.TestCase):
+    def test01(self):
+        """ A runner is not timed by default. """
+        runner = Runner()
+        runner.append(DummySuccessCommand())
+
+        context = DummyContect()
+        self.assertTrue(runner.execute(context))
+        self.assertFalse("timings" in context)
+
+    def test02(self):
+        """ Every command and its unwind is timed. """
+        runner = Runner(timed=True)
+        runner.append(DummySuccessCommand())
+        runner.append(DummySuccessCommand())
+
+        context = DummyContect()
+        self.assertTrue(runner.execute(context))
+
+        timings = context["timings"]
+        self.assertEqual(["execute", "execute", "unwind", "unwind"],
+                         [command["phase"] for command in timings["commands"]])
+        self.assertEqual({"execute", "unwind"}, set(timings["phases"]))
+        for command in timings["commands"]:
+            self.assertEqual("DummySuccessCommand", command["command"])
+            self.assertGreaterEqual(command["wall_ms"], 0.0)
+            self.assertGreaterEqual(command["cpu_ms"], 0.0)
+        self.assertGreaterEqual(timings["total"]["wall_ms"], timings["phases"]["unwind"]["wall_ms"])
+
+    def test03(self):
+        """ Processor phases are timed, also when parallel. """
+        for parallel in (False, True):
+            processor = Processor(parallel=parallel, timed=True)
+            processor.initialization.append(DummySuccessCommand())
+            processor.reporting.append(DummySuccessCommand())
+            processor.authentication.append(DummySuccessCommand())
+            processor.authorization.append(DummySuccessCommand())
+            processor.validating.append(DummySuccessCommand())
+            processor.processing.append(DummySuccessCommand())
+
+            context = DummyContect()
+            self.assertTrue(processor.execute(context))
+
+            self.assertEqual(["initialization", "reporting", "authentication", "authorization", "validating",
+                              "processing", "unwind"], list(context["timings"]["phases"]))
+            self.assertEqual(12, len(context["timings"]["commands"]))
+
+    def test04(self):
+        """ Timings are recorded on error. """
+        processor = Processor(timed=True)
+        processor.initialization.append(DummySuccessCommand())
+        processor.validating.append(DummyErrorCommand())
+        processor.processing.append(DummySuccessCommand())
+
+        context = DummyContect()
+        with self.assertRaises(DummyException):
+            processor.execute(context)
+
+        self.assertEqual(["initialization", "validating", "unwind"], list(context["timings"]["phases"]))
+        self.assertEqual(5, len(context["timings"]["commands"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
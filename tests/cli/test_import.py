@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# Budgets of the cold start of the CLI and of a subcommand, in ms: timed only when ZENITH_BUDGET_TESTS is set, a
+# loaded machine misses them
+BUDGET_MS = float(os.environ.get("ZENITH_IMPORT_BUDGET_MS", "150"))
+SUBCOMMAND_BUDGET_MS = float(os.environ.get("ZENITH_SUBCOMMAND_BUDGET_MS", "800"))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def importtime(*args) -> dict:
+    """
+    Runs python -X importtime.
+
+    :return: the cumulative import time in us per module, only top-level imports have no leading spaces
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT
+    env["ZENITH_NO_SERVE"] = "1"
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+
+    modules = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.rstrip()] = int(cumulative)
+
+    return modules
+
+
+class TestImport(unittest.TestCase):
+    def test_help01(self):
+        """ --help does not import SQLAlchemy, the models or the commands """
+
+        modules = [name.strip() for name in importtime("-m", "zenith", "--help")]
+
+        self.assertNotIn("sqlalchemy", modules)
+        self.assertNotIn("zenith.models", modules)
+        self.assertNotIn("readline", modules)
+        self.assertFalse([name for name in modules if name.startswith("zenith.command")])
+
+    @unittest.skipUnless(os.environ.get("ZENITH_BUDGET_TESTS"), "wall-clock budget, set ZENITH_BUDGET_TESTS to run")
+    def test_budget01(self):
+        """ The import of the CLI stays within budget """
+
+        modules = importtime("-c", "import zenith.cli.__main__")
+        cumulative_ms = sum(us for name, us in modules.items() if name.startswith("zenith")) / 1000.0
+
+        self.assertLess(cumulative_ms, BUDGET_MS, f"zenith.cli imports in {cumulative_ms:0.1f} ms")
+
+    @unittest.skipUnless(os.environ.get("ZENITH_BUDGET_TESTS"), "wall-clock budget, set ZENITH_BUDGET_TESTS to run")
+    def test_budget02(self):
+        """ The import of a subcommand stays within budget """
+
+        modules = importtime("-c", "import zenith.cli.task")
+        cumulative_ms = sum(us for name, us in modules.items() if name.startswith("zenith")) / 1000.0
+
+        self.assertLess(cumulative_ms, SUBCOMMAND_BUDGET_MS, f"zenith.cli.task imports in {cumulative_ms:0.1f} ms")
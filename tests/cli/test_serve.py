@@ -0,0 +1,101 @@
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sqlalchemy import create_engine
+
+from zenith.cli.remote import forward, forwardable, request
+from zenith.cli.serve import ServeProcessor
+from zenith.models import Base
+from zenith.paths import socket_filename
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        zenith_dir = os.path.join(self.directory, ".zenith")
+        os.makedirs(os.path.join(zenith_dir, "var", "db"))
+        Base.metadata.create_all(create_engine(f"sqlite:///{os.path.join(zenith_dir, 'var', 'db', 'zenith.db')}"))
+
+        self.filename = socket_filename(zenith_dir)
+        self.thread = threading.Thread(target=ServeProcessor().serve, args=(self.directory,))
+        self.thread.start()
+
+        for n in range(100):
+            if ServeProcessor.running(self.filename):
+                break
+            time.sleep(0.05)
+
+    def tearDown(self) -> None:
+        ServeProcessor().stop(self.directory)
+        self.thread.join(5)
+        self.tmp.cleanup()
+
+    def forward(self, *argv) -> tuple:
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = forward(list(argv), self.directory)
+        return status, stdout.getvalue()
+
+    def test_forwardable01(self):
+        """ init, serve and update run in-process """
+
+        self.assertFalse(forwardable([]))
+        self.assertFalse(forwardable(["init"]))
+        self.assertFalse(forwardable(["-d", "serve", "--stop"]))
+        self.assertFalse(forwardable(["client", "update", "acme"]))
+        self.assertTrue(forwardable(["-v", "client", "list"]))
+
+    def test_forward01(self):
+        """ Commands run in the daemon """
+
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEqual(0o600, os.stat(self.filename).st_mode & 0o777)
+
+        self.assertEqual((0, ""), self.forward("client", "create", "acme"))
+
+        status, output = self.forward("client", "list")
+        self.assertEqual(0, status)
+        self.assertIn("acme", output)
+
+    def test_forward02(self):
+        """ No daemon: the command runs in-process """
+
+        ServeProcessor().stop(self.directory)
+        self.thread.join(5)
+
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertIsNone(forward(["client", "list"], self.directory))
+
+    def test_forward03(self):
+        """ Invalid arguments return the exit status of argparse """
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status, output = self.forward("task", "start", "x")
+
+        self.assertEqual(2, status)
+        self.assertIn("invalid int value", stderr.getvalue())
+
+    def test_forward04(self):
+        """ The warnings are in the response at the level of the request, logging is not set up again """
+
+        handlers = list(logging.getLogger().handlers)
+
+        response = request(self.filename, {"argv": ["-d", "client", "read", "acme"], "tty": True})
+        self.assertEqual(1, response["stderr"].count("Client[client_name = acme] - does not exist"))
+
+        response = request(self.filename, {"argv": ["-v", "client", "read", "acme"], "tty": True})
+        self.assertEqual(1, response["stderr"].count("Client[client_name = acme] - does not exist"))
+        self.assertNotIn("DEBUG", response["stderr"])
+
+        response = request(self.filename, {"argv": ["-v", "client", "read", "acme"], "tty": False})
+        self.assertEqual("", response["stderr"])
+
+        self.assertEqual(handlers, logging.getLogger().handlers)
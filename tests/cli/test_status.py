@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from zenith import snapshot
+from zenith.paths import db_filename, snapshot_filename
+
+# Budget of the imports of `zenith status --prompt`, in ms: timed only when ZENITH_BUDGET_TESTS is set
+STATUS_BUDGET_MS = float(os.environ.get("ZENITH_STATUS_BUDGET_MS", "5"))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "status.bin")
+        self.database = os.path.join(self.tmp.name, "zenith.db")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_snapshot01(self):
+        """ The snapshot is read as written, long names are truncated to whole characters """
+        snapshot.write(self.filename, (1, "acme"), (2, "é" * 40), (3, None), 1628000000.5)
+
+        self.assertEqual(snapshot.LAYOUT.size, os.path.getsize(self.filename))
+        self.assertEqual({"client_id": 1, "client_name": "acme", "project_id": 2, "project_name": "é" * 32,
+                          "task_id": 3, "task_name": "", "start": 1628000000.5}, snapshot.read(self.filename))
+
+    def test_snapshot02(self):
+        """ No active client, a missing or foreign file """
+        snapshot.write(self.filename)
+        self.assertEqual("", snapshot.prompt(snapshot.read(self.filename)))
+
+        with open(self.filename, "wb") as file:
+            file.write(b"ZNTH")
+        self.assertIsNone(snapshot.read(self.filename))
+        self.assertIsNone(snapshot.read(os.path.join(self.tmp.name, "missing.bin")))
+
+    def test_stale01(self):
+        """ The snapshot is stale when the database was written after it, or its log has frames """
+        self.assertTrue(snapshot.stale(self.filename, self.database))
+
+        snapshot.write(self.filename, (1, "acme"))
+        open(self.database, "wb").close()
+        written = os.stat(self.filename).st_mtime_ns
+
+        os.utime(self.database, ns=(written - 1000, written - 1000))
+        self.assertFalse(snapshot.stale(self.filename, self.database))
+
+        # An empty log, created anew by a reader
+        open(f"{self.database}-wal", "wb").close()
+        os.utime(f"{self.database}-wal", ns=(written + 1000, written + 1000))
+        self.assertFalse(snapshot.stale(self.filename, self.database))
+
+        with open(f"{self.database}-wal", "wb") as file:
+            file.write(b"\0" * 32)
+        self.assertTrue(snapshot.stale(self.filename, self.database))
+
+        os.remove(f"{self.database}-wal")
+        os.utime(self.database, ns=(written + 1000, written + 1000))
+        self.assertTrue(snapshot.stale(self.filename, self.database))
+
+    def test_prompt01(self):
+        """ One line for a shell prompt """
+        current = {"client_name": "acme", "project_name": "web", "task_id": 7, "start": time.time() - 3725}
+
+        self.assertEqual("acme/web #7 1:02:05", snapshot.prompt(current))
+
+
+class TestStatus(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.zenith_dir = os.path.join(cls.tmp.name, ".zenith")
+
+        for argv in (["init"], ["client", "create", "acme"], ["client", "activate", "acme"],
+                     ["project", "create", "web"], ["project", "activate", "web"], ["task", "new"],
+                     ["task", "start", "1"]):
+            cls.zenith(*argv)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    @classmethod
+    def zenith(cls, *argv, importtime: bool = False, cwd: str = None, check: bool = True) \
+            -> subprocess.CompletedProcess:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = ROOT
+        env["ZENITH_NO_SERVE"] = "1"
+        # A shell prompt runs from the compiled modules
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        options = ["-X", "importtime"] if importtime else []
+        return subprocess.run([sys.executable, *options, "-m", "zenith", *argv], cwd=cwd or cls.tmp.name, env=env,
+                              check=check, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+    def test_status01(self):
+        """ The mutating commands write the snapshot after the commit """
+        filename = snapshot_filename(self.zenith_dir)
+
+        self.assertFalse(snapshot.stale(filename, db_filename(self.zenith_dir)))
+        self.assertRegex(self.zenith("status", "--prompt").stdout, r"^acme/web #1 0:00:\d\d\n$")
+
+    def test_status02(self):
+        """ A stale snapshot is rewritten from the database """
+        time.sleep(0.01)
+        with sqlite3.connect(db_filename(self.zenith_dir)) as connection:
+            connection.execute("UPDATE tasks SET task_name = 'deploy' WHERE task_id = 1")
+        self.assertTrue(snapshot.stale(snapshot_filename(self.zenith_dir), db_filename(self.zenith_dir)))
+
+        self.assertIn("Task:        1 deploy", self.zenith("status").stdout)
+        self.assertFalse(snapshot.stale(snapshot_filename(self.zenith_dir), db_filename(self.zenith_dir)))
+
+    def test_status04(self):
+        """ A command that only reads the database leaves the snapshot fresh, also while the log is kept open """
+        # Written by a mutating command
+        self.zenith("client", "activate", "acme")
+        self.assertFalse(snapshot.stale(snapshot_filename(self.zenith_dir), db_filename(self.zenith_dir)))
+
+        # As the pooled connections of `zenith serve`
+        connection = sqlite3.connect(db_filename(self.zenith_dir))
+        try:
+            for argv in (["task", "list"], ["client", "list"], ["report"], ["status"]):
+                time.sleep(0.01)
+                self.zenith(*argv)
+                connection.execute("SELECT count(*) FROM tasks").fetchall()
+                self.assertFalse(snapshot.stale(snapshot_filename(self.zenith_dir), db_filename(self.zenith_dir)),
+                                 argv)
+        finally:
+            connection.close()
+
+    def test_status03(self):
+        """ Outside of a Zenith tree the prompt is empty, the status is an error without a traceback """
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual("\n", self.zenith("status", "--prompt", cwd=directory).stdout)
+
+            process = self.zenith("status", cwd=directory, check=False)
+            self.assertEqual((1, "No .zenith directory found\n", ""),
+                             (process.returncode, process.stdout, process.stderr))
+
+    def importtime(self) -> dict:
+        """
+        Runs `zenith status --prompt` from the compiled modules.
+
+        :return: the cumulative import time in us per module, only top-level imports have no leading spaces
+        """
+        self.zenith("status", "--prompt")
+
+        modules = dict()
+        for line in self.zenith("status", "--prompt", importtime=True).stderr.splitlines():
+            if line.startswith("import time:") and "cumulative" not in line:
+                _, cumulative, name = line[len("import time:"):].split("|")
+                modules[name.rstrip()] = int(cumulative)
+        return modules
+
+    def test_import01(self):
+        """ `zenith status --prompt` does not import SQLAlchemy nor the CLI """
+        modules = [name.strip() for name in self.importtime()]
+
+        self.assertNotIn("sqlalchemy", modules)
+        self.assertFalse([name for name in modules if name.startswith("zenith.cli")])
+
+    @unittest.skipUnless(os.environ.get("ZENITH_BUDGET_TESTS"), "wall-clock budget, set ZENITH_BUDGET_TESTS to run")
+    def test_budget01(self):
+        """ `zenith status --prompt` stays within budget """
+        cumulative_ms = sum(us for name, us in self.importtime().items() if name.startswith("zenith")) / 1000.0
+
+        self.assertLess(cumulative_ms, STATUS_BUDGET_MS, f"zenith status imports in {cumulative_ms:0.1f} ms")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from zenith.command.database import migrate
+from zenith.models import Client, Project, Task, TaskState
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    A migrated database in a temporary directory per test, with a session and the SELECT statements executed.
+    """
+
+    # Objects displayed after a commit are not reloaded, as in zenith.command.database.register()
+    expire_on_commit = False
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'zenith.db')}")
+        migrate(self.engine)
+
+        self.session = sessionmaker(bind=self.engine, expire_on_commit=self.expire_on_commit)()
+        self.statements = list()
+        event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+
+    def tearDown(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        self.session.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def seed(self, clients: int = 1, projects: int = 1, tasks: int = 0, state: TaskState = TaskState.NEW,
+             active: bool = False) -> None:
+        """
+        Commits clients with their projects, and tasks of the first project.
+
+        :param active: the first client, project and task are active
+        """
+        self.clients = [Client(client_name=f"client {n}", client_active=active and n == 0) for n in range(clients)]
+        self.projects = [Project(client=client, project_name=f"project {n}",
+                                 project_active=active and client is self.clients[0] and n == 0)
+                         for client in self.clients for n in range(projects)]
+        self.tasks = [Task(project=self.projects[0], task_state=state, task_active=active and n == 0)
+                      for n in range(tasks)]
+        self.client = self.clients[0]
+        self.project = self.projects[0]
+
+        self.session.add_all(self.clients + self.projects + self.tasks)
+        self.session.commit()
+        self.statements.clear()
+
+    def plan(self, statement: str, parameters) -> str:
+        """
+        Returns the query plan of the statement, one line per step.
+        """
+        with self.engine.connect() as connection:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return " | ".join(row[-1] for row in rows)
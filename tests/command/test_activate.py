@@ -0,0 +1,105 @@
+from sqlalchemy.exc import IntegrityError
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.client import ClientActivateCommand
+from zenith.command.database import DatabaseContext, MIGRATIONS, migrate
+from zenith.command.project import ProjectActivateCommand
+from zenith.command.task import TaskStartCommand
+from zenith.models import Client, Project, Task
+
+
+class TestActivate(DatabaseTestCase):
+    expire_on_commit = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(clients=3, projects=2, tasks=3)
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("UPDATE"):
+            self.statements.append((statement, parameters))
+
+    def execute(self, command, **values) -> bool:
+        context = DatabaseContext()
+        context.session = self.session
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        result = runner.execute(context)
+        self.session.commit()
+
+        return result
+
+    def active(self, model, column) -> list:
+        self.session.expire_all()
+        return self.session.query(model).filter(column == True).all()
+
+    def test_client01(self):
+        """ One active client, the deactivation searches the partial index """
+        self.assertTrue(self.execute(ClientActivateCommand(), client_name="client 0"))
+        self.assertTrue(self.execute(ClientActivateCommand(), client_name="client 1"))
+
+        self.assertEqual(["client 1"], [client.client_name for client in self.active(Client, Client.client_active)])
+        self.assertIn("USING INDEX ix_clients_active", self.plan(*self.statements[-2]))
+
+    def test_client02(self):
+        """ Unknown client """
+        self.assertFalse(self.execute(ClientActivateCommand(), client_name="unknown"))
+
+    def test_client03(self):
+        """ The database enforces one active client """
+        self.clients[0].client_active = True
+        self.clients[1].client_active = True
+
+        with self.assertRaises(IntegrityError):
+            self.session.commit()
+
+    def test_project01(self):
+        """ One active project per client """
+        self.assertTrue(self.execute(ProjectActivateCommand(), client=self.clients[0], project_name="project 0"))
+        self.assertTrue(self.execute(ProjectActivateCommand(), client=self.clients[1], project_name="project 0"))
+        self.assertTrue(self.execute(ProjectActivateCommand(), client=self.clients[1], project_name="project 1"))
+
+        self.assertEqual([(0, "project 0"), (1, "project 1")],
+                         sorted((self.clients.index(project.client), project.project_name)
+                                for project in self.active(Project, Project.project_active)))
+        self.assertIn("USING INDEX ix_projects_active", self.plan(*self.statements[-2]))
+
+    def test_project02(self):
+        """ Project of another client """
+        self.session.delete(self.projects[3])
+        self.session.commit()
+
+        self.assertFalse(self.execute(ProjectActivateCommand(), client=self.clients[1], project_name="project 1"))
+
+    def test_task01(self):
+        """ One active task """
+        project = self.projects[0]
+        self.assertTrue(self.execute(TaskStartCommand(), project=project, task_id=self.tasks[0].task_id))
+        self.assertTrue(self.execute(TaskStartCommand(), project=project, task_id=self.tasks[1].task_id))
+
+        self.assertEqual([self.tasks[1].task_id], [task.task_id for task in self.active(Task, Task.task_active)])
+        self.assertIn("USING INDEX ix_tasks_active_unique", self.plan(*self.statements[-2]))
+
+    def test_migrate01(self):
+        """ Duplicate active rows are deactivated, the last one stays active """
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_clients_active")
+            connection.exec_driver_sql("DROP INDEX ix_projects_active")
+            connection.exec_driver_sql("DROP INDEX ix_tasks_active_unique")
+            connection.exec_driver_sql("UPDATE clients SET client_active = 1")
+            connection.exec_driver_sql("UPDATE projects SET project_active = 1")
+            connection.exec_driver_sql("UPDATE tasks SET task_active = 1")
+            connection.exec_driver_sql("DELETE FROM schema_version WHERE version >= 3")
+            connection.exec_driver_sql("PRAGMA user_version = 2")
+
+        self.assertEqual([version for version, name, function in MIGRATIONS if version >= 3], migrate(self.engine))
+
+        self.assertEqual([self.clients[2].client_id],
+                         [client.client_id for client in self.active(Client, Client.client_active)])
+        self.assertEqual(sorted(project.project_id for project in self.projects[1::2]),
+                         sorted(project.project_id for project in self.active(Project, Project.project_active)))
+        self.assertEqual([self.tasks[2].task_id], [task.task_id for task in self.active(Task, Task.task_active)])
@@ -0,0 +1,88 @@
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.active import ActiveCommand
+from zenith.command.client import ClientActiveCommand
+from zenith.command.database import DatabaseContext
+
+
+class TestActive(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(clients=2, projects=2, tasks=2, active=True)
+        # The active command loads into an empty identity map
+        self.session.expunge_all()
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append((statement, parameters))
+
+    def execute(self, command) -> DatabaseContext:
+        context = DatabaseContext()
+        context.session = self.session
+
+        runner = Runner()
+        runner.append(command)
+        context["result"] = runner.execute(context)
+
+        return context
+
+    def deactivate(self, sql: str) -> None:
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(sql)
+        self.statements.clear()
+
+    def test_active01(self):
+        """ Client, project and task in one statement """
+        context = self.execute(ActiveCommand(task=True))
+
+        self.assertTrue(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual(self.client.client_id, context["client"].client_id)
+        self.assertEqual(self.project.project_id, context["project"].project_id)
+        self.assertEqual(self.tasks[0].task_id, context["task"].task_id)
+
+        # Resolved from the identity map
+        self.assertIs(context["client"], context["task"].project.client)
+        self.assertEqual(1, len(self.statements))
+
+    def test_active02(self):
+        """ Client and project """
+        context = self.execute(ActiveCommand())
+
+        self.assertTrue(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertIn("project", context)
+        self.assertNotIn("task", context)
+
+    def test_active03(self):
+        """ Client only """
+        context = self.execute(ActiveCommand(project=False))
+
+        self.assertTrue(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertNotIn("project", context)
+
+    def test_active04(self):
+        """ No active task """
+        self.deactivate("UPDATE tasks SET task_active = 0")
+        context = self.execute(ActiveCommand(task=True))
+
+        self.assertFalse(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertIn("project", context)
+        self.assertNotIn("task", context)
+
+    def test_active05(self):
+        """ No active project """
+        self.deactivate("UPDATE projects SET project_active = 0")
+        context = self.execute(ActiveCommand(task=True))
+
+        self.assertFalse(context["result"])
+        self.assertIn("client", context)
+        self.assertNotIn("project", context)
+
+    def test_active06(self):
+        """ No active client """
+        self.deactivate("UPDATE clients SET client_active = 0")
+
+        self.assertFalse(self.execute(ActiveCommand())["result"])
+        self.assertFalse(self.execute(ClientActiveCommand())["result"])
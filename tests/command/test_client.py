@@ -4,13 +4,13 @@ import pathlib
 import unittest
 
 from sqlalchemy import create_engine
-from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import sessionmaker
 
-from zenith.chain import Runner
+from zenith.chain import ContextKeyException, Runner
 from zenith.command.client import *
 from zenith.command.database import DatabaseContext, DatabaseCreateCommand, DatabaseDropCommand, DatabaseSetupCommand, DatabaseSessionCommand
-from zenith.models import Base
+from zenith.models import Base, Project
 
 # Reduce logging
 rootLogger = logging.getLogger()
@@ -105,8 +105,8 @@ class TestClient(unittest.TestCase):
         context["db_filename"] = self.db_filename
         context["client_name"] = "aap"
 
-        with self.assertRaises(IntegrityError):
-            runner.execute(context)
+        self.assertFalse(runner.execute(context))
+        self.assertNotIn("client_id", context)
 
     def test_create05(self):
         """ Success: commit() """
@@ -152,6 +152,23 @@ class TestClient(unittest.TestCase):
 
         self.assertEqual(0, count)
 
+    def test_create07(self):
+        """ The ID of the new client """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseSessionCommand())
+        runner.append(ClientCreateCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        context["client_name"] = "aap"
+
+        self.assertTrue(runner.execute(context))
+
+        tmp = sessionmaker(create_engine(f"sqlite:///{self.db_filename}"))()
+        self.assertEqual("aap", tmp.get(Client, context["client_id"]).client_name)
+        tmp.commit()
+
     def test_read01(self):
         """ client_name exists """
         engine = create_engine(f"sqlite:///{self.db_filename}")
@@ -226,8 +243,7 @@ class TestClient(unittest.TestCase):
         context["client_name"] = "aap"
         context["client_description"] = "Een aap"
 
-        with self.assertRaises(NoResultFound):
-            runner.execute(context)
+        self.assertFalse(runner.execute(context))
 
     def test_update02(self):
         """ client_name does exists """
@@ -361,8 +377,7 @@ class TestClient(unittest.TestCase):
         context["db_filename"] = self.db_filename
         context["client_name"] = "aap"
 
-        with self.assertRaises(NoResultFound):
-            runner.execute(context)
+        self.assertFalse(runner.execute(context))
 
     def test_delete02(self):
         """ client exists """
@@ -463,6 +478,31 @@ class TestClient(unittest.TestCase):
         self.assertEqual(1, tmp.query(Client).filter(Client.client_name == "aap").count())
         tmp.commit()
 
+    def test_delete06(self):
+        """ client has projects """
+        engine = create_engine(f"sqlite:///{self.db_filename}")
+        Session = sessionmaker(engine)
+        tmp = Session()
+        aap = Client(client_name="aap")
+        tmp.add(aap)
+        tmp.add(Project(client=aap, project_name="noot"))
+        tmp.commit()
+
+        runner = Runner()
+        runner.append((DatabaseSetupCommand()))
+        runner.append(DatabaseSessionCommand())
+        runner.append(ClientDeleteCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        context["client_name"] = "aap"
+
+        self.assertFalse(runner.execute(context))
+
+        tmp = Session()
+        self.assertEqual(1, tmp.query(Client).filter(Client.client_name == "aap").count())
+        tmp.commit()
+
     def test_list01(self):
         """ Empty list """
         runner = Runner()
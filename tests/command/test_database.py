@@ -3,11 +3,14 @@ import pathlib
 import tempfile
 import unittest
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select
 
-from zenith.chain import Context, ContextKeyException, Runner
+from zenith.chain import CommandState, Context, ContextKeyException, Runner
 
-from zenith.command.database import DatabaseContext, DatabaseCreateCommand, DatabaseSetupCommand
+from zenith.command.database import DatabaseContext, DatabaseCreateCommand, DatabaseSessionCommand, DatabaseSetupCommand, \
+    DatabaseMigrateCommand, MIGRATIONS, SCHEMA_VERSION, config_filename, dispose, engines, migrate, register, \
+    schema_version, BASELINE
+from zenith.models import Base, SchemaVersion, Task
 
 class TestDatabase(unittest.TestCase):
     @classmethod
@@ -25,6 +28,9 @@ class TestDatabase(unittest.TestCase):
     def test_setup01(self):
         """ db_filename does not exist in the context """
 
+        # Pooled connections keep a removed file open
+        dispose(self.db_filename)
+
         if os.path.isfile(self.db_filename):
             os.remove(self.db_filename)
 
@@ -38,5 +44,253 @@ class TestDatabase(unittest.TestCase):
         self.assertTrue(runner.execute(context))
         self.assertTrue(os.path.isfile(self.db_filename))
 
+    def test_session01(self):
+        """ A runner is reused, every run has its own session """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseCreateCommand())
+        runner.append(DatabaseSessionCommand())
+
+        context0 = DatabaseContext()
+        context0["db_filename"] = self.db_filename
+        context1 = DatabaseContext()
+        context1["db_filename"] = self.db_filename
+
+        self.assertTrue(runner.execute(context0))
+        self.assertTrue(runner.execute(context1))
+        self.assertIsNot(context0.session, context1.session)
+
+    def test_session02(self):
+        """ Without a session there is nothing to commit or roll back """
+        for state in (CommandState.SUCCESS, CommandState.FAILURE):
+            DatabaseSessionCommand().post_execute(DatabaseContext(), state)
+
+    def test_register01(self):
+        """ One engine and sessionmaker per database file and profile """
+        engine0, sessionmaker0 = register(self.db_filename)
+        engine1, sessionmaker1 = register(os.path.join(os.path.dirname(self.db_filename), ".", "zenith-test.db"))
+
+        self.assertIs(engine0, engine1)
+        self.assertIs(sessionmaker0, sessionmaker1)
+
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseSessionCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+
+        self.assertTrue(runner.execute(context))
+        self.assertIs(engine0, context["db_engine"])
+        self.assertIs(sessionmaker0, context["db_sessionmaker"])
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        context["db_profile"] = "durable"
+
+        self.assertTrue(runner.execute(context))
+        self.assertIsNot(engine0, context["db_engine"])
+
+    def test_dispose01(self):
+        """ Disposed engines are recreated """
+        engine0, _ = register(self.db_filename)
+        dispose(self.db_filename)
+
+        self.assertFalse([key for key in engines if key[0] == os.path.realpath(self.db_filename)])
+        self.assertIsNot(engine0, register(self.db_filename)[0])
+
+    def pragmas(self, context: DatabaseContext) -> tuple:
+        with context["db_engine"].connect() as connection:
+            return tuple(connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                         for pragma in ("journal_mode", "synchronous", "mmap_size", "temp_store"))
+
+    def test_profile01(self):
+        """ Default profile: fast """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+
+        self.assertTrue(runner.execute(context))
+        self.assertEqual(("wal", 1, 64 * 1024 * 1024, 2), self.pragmas(context))
+
+    def test_profile02(self):
+        """ Profile and overrides from var/etc/zenith.ini """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+
+        with tempfile.TemporaryDirectory() as etc_dir:
+            with open(config_filename(etc_dir), "wt") as file:
+                file.write("[database]\nprofile = durable\ntemp_store = MEMORY\n")
+
+            context = DatabaseContext()
+            context["db_filename"] = self.db_filename
+            context["etc_dir"] = etc_dir
+
+            self.assertTrue(runner.execute(context))
+            self.assertEqual(("wal", 2, 0, 2), self.pragmas(context))
+
+    def test_profile03(self):
+        """ Unknown profile """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        context["db_profile"] = "unknown"
+
+        self.assertFalse(runner.execute(context))
+        self.assertNotIn("db_engine", context)
+
+
+class TestMigration(unittest.TestCase):
+    tasks = 100000
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp.name, "zenith.db")
+        self.engine = create_engine(f"sqlite:///{self.db_filename}")
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def seed(self) -> None:
+        """ A database of before the schema version, with a large task table """
+        Base.metadata.create_all(self.engine)
+
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+                "INSERT INTO tasks (project_id, task_uuid, task_name, task_active, task_state, task_duration, "
+                "created_on, updated_on) SELECT 1, 'uuid-' || i, 'task ' || i, 0, 'NEW', 0, datetime('now'), "
+                "datetime('now') FROM n", (self.tasks,))
+
+    def count(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(Task)).scalar()
+
+    def test_migrate01(self):
+        """ New database """
+        versions = [version for version, name, function in MIGRATIONS]
+        self.assertEqual(versions, migrate(self.engine))
+
+        with self.engine.connect() as connection:
+            self.assertEqual(SCHEMA_VERSION, schema_version(connection))
+            self.assertEqual(versions, connection.execute(select(SchemaVersion.version)).scalars().all())
+
+        self.assertEqual([], migrate(self.engine))
+
+    def test_migrate02(self):
+        """ Database created without a schema version """
+        self.seed()
+
+        self.assertEqual([version for version, name, function in MIGRATIONS], migrate(self.engine))
+        self.assertEqual(self.tasks, self.count())
+
+    def test_migrate03(self):
+        """ Incremental migration of a large task table """
+        self.seed()
+        migrate(self.engine)
+
+        def add_column(connection) -> None:
+            connection.exec_driver_sql("ALTER TABLE tasks ADD COLUMN task_test INTEGER NOT NULL DEFAULT 0")
+            connection.exec_driver_sql("UPDATE tasks SET task_test = task_id % 7")
+
+        migrations = MIGRATIONS + ((SCHEMA_VERSION + 1, "add column", add_column),)
+        self.assertEqual([SCHEMA_VERSION + 1], migrate(self.engine, migrations))
+
+        with self.engine.connect() as connection:
+            self.assertEqual(SCHEMA_VERSION + 1, schema_version(connection))
+            self.assertEqual(self.tasks // 7, connection.exec_driver_sql(
+                "SELECT COUNT(*) FROM tasks WHERE task_test = 0").scalar())
+
+    def test_migrate04(self):
+        """ A failing migration rolls back all migrations """
+        self.seed()
+
+        def add_column(connection) -> None:
+            connection.exec_driver_sql("ALTER TABLE tasks ADD COLUMN task_test INTEGER")
+            connection.exec_driver_sql("DELETE FROM tasks")
+
+        def fail(connection) -> None:
+            raise RuntimeError("fail")
+
+        migrations = MIGRATIONS + ((SCHEMA_VERSION + 1, "add column", add_column), (SCHEMA_VERSION + 2, "fail", fail))
+        with self.assertRaises(RuntimeError):
+            migrate(self.engine, migrations)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(0, schema_version(connection))
+            self.assertEqual(0, connection.exec_driver_sql(
+                "SELECT COUNT(*) FROM pragma_table_info('tasks') WHERE name = 'task_test'").scalar())
+        self.assertEqual(self.tasks, self.count())
+
+    def test_migrate05(self):
+        """ A first release database with duplicate active rows: the last one created stays active """
+        with self.engine.begin() as connection:
+            for statement in BASELINE:
+                connection.exec_driver_sql(statement)
+            for n in (1, 2):
+                connection.exec_driver_sql(
+                    f"INSERT INTO clients VALUES ({n}, 'c{n}', 'client {n}', 1, NULL, NULL, datetime('now'), "
+                    f"datetime('now'))")
+                connection.exec_driver_sql(
+                    f"INSERT INTO projects VALUES (2, {n}, 'p{n}', 'project {n}', 1, NULL, NULL, datetime('now'), "
+                    f"datetime('now'))")
+                connection.exec_driver_sql(
+                    f"INSERT INTO tasks VALUES ({n}, {n}, 't{n}', NULL, 1, 'NEW', NULL, NULL, 0, NULL, NULL, "
+                    f"datetime('now'), datetime('now'))")
+
+        self.assertEqual([version for version, name, function in MIGRATIONS], migrate(self.engine))
+
+        with self.engine.connect() as connection:
+            self.assertEqual([(2,)], connection.exec_driver_sql(
+                "SELECT client_id FROM clients WHERE client_active = 1").all())
+            self.assertEqual([(2,)], connection.exec_driver_sql(
+                "SELECT project_id FROM projects WHERE project_active = 1").all())
+            self.assertEqual([(2,)], connection.exec_driver_sql(
+                "SELECT task_id FROM tasks WHERE task_active = 1").all())
+            self.assertEqual(3, connection.exec_driver_sql(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND sql LIKE 'CREATE UNIQUE INDEX %' "
+                "AND name IN ('ix_clients_active', 'ix_projects_active', 'ix_tasks_active_unique')").scalar())
+
+    def test_schema01(self):
+        """ The migrations create the schema of the models """
+        def schema(engine) -> dict:
+            with engine.connect() as connection:
+                tables = [row[0] for row in connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'periods_rtree%'")]
+                return {table: (connection.exec_driver_sql(f"PRAGMA table_info('{table}')").all(),
+                                sorted((row[1], row[2], row[4], connection.exec_driver_sql(
+                                    f"PRAGMA index_info('{row[1]}')").all())
+                                       for row in connection.exec_driver_sql(f"PRAGMA index_list('{table}')")))
+                        for table in tables}
+
+        models = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'models.db')}")
+        Base.metadata.create_all(models)
+        migrate(self.engine)
+
+        self.assertEqual(schema(models), schema(self.engine))
+        models.dispose()
+
+    def test_command01(self):
+        """ Startup migrates once, a newer database fails """
+        runner = Runner()
+        runner.append(DatabaseMigrateCommand())
+
+        context = DatabaseContext()
+        context["db_engine"] = self.engine
+
+        self.assertTrue(runner.execute(context))
+        self.assertTrue(runner.execute(context))
+
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+
+        self.assertFalse(runner.execute(context))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,202 @@
+import csv
+import datetime
+import json
+import os
+
+from sqlalchemy import create_engine, event, func, insert, select
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext, migrate
+from zenith.command.exchange import ExportCommand, ImportCommand, progress_filename
+from zenith.models import Client, DailyTotal, Period, Project, Task, TaskState
+
+
+class TestExchange(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.commits = 0
+        event.listen(self.engine, "commit", self.commit)
+
+    def tearDown(self) -> None:
+        event.remove(self.engine, "commit", self.commit)
+        super().tearDown()
+
+    def commit(self, connection) -> None:
+        self.commits += 1
+
+    def filename(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name: str, count: int) -> str:
+        with open(self.filename(name), "wt") as file:
+            file.write(json.dumps({"client_name": "empty", "project_name": "empty"}) + "\n")
+            for n in range(count):
+                file.write(json.dumps({"client_name": f"client {n % 2}", "project_name": f"project {n % 3}",
+                                       "task_name": f"task {n}", "task_start": "2021-08-01T09:00:00",
+                                       "task_finish": "2021-08-01T10:30:00", "task_duration": 5400}) + "\n")
+        return self.filename(name)
+
+    def execute(self, command, **values) -> DatabaseContext:
+        context = DatabaseContext()
+        context["db_engine"] = self.engine
+        context["tmp_dir"] = self.tmp.name
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        self.assertTrue(runner.execute(context))
+
+        return context
+
+    def count(self, model) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(model)).scalar()
+
+    def test_import01(self):
+        """ Chunked import, names resolved once """
+        filename = self.write("tasks.jsonl", 100)
+        context = self.execute(ImportCommand(), import_filename=filename, import_chunk=25)
+
+        self.assertEqual(101, context["imported"])
+        self.assertEqual(100, self.count(Task))
+        self.assertEqual(100, self.count(Period))
+        self.assertEqual(3, self.count(Client))
+        self.assertEqual(7, self.count(Project))
+        self.assertEqual(5, self.commits)
+        self.assertFalse(os.path.exists(progress_filename(self.tmp.name, filename)))
+
+        with self.engine.connect() as connection:
+            task = connection.execute(select(Task).where(Task.task_name == "task 7")).one()
+        self.assertEqual(TaskState.STOPPED, task.task_state)
+        self.assertEqual(5400, task.task_duration)
+
+    def test_import02(self):
+        """ A re-import inserts no duplicates """
+        filename = self.write("tasks.jsonl", 10)
+        self.execute(ImportCommand(), import_filename=filename)
+        self.execute(ImportCommand(), import_filename=filename)
+
+        self.assertEqual(10, self.count(Task))
+        self.assertEqual(10, self.count(Period))
+        self.assertEqual(7, self.count(Project))
+
+    def test_import03(self):
+        """ An interrupted import resumes after the last commit """
+        filename = self.write("tasks.jsonl", 100)
+        stat = os.stat(filename)
+        with open(progress_filename(self.tmp.name, filename), "wt") as file:
+            json.dump({"filename": os.path.abspath(filename), "size": stat.st_size, "mtime": stat.st_mtime,
+                       "records": 51}, file)
+
+        context = self.execute(ImportCommand(), import_filename=filename)
+
+        self.assertEqual(50, context["imported"])
+        self.assertEqual(50, self.count(Task))
+
+    def test_import04(self):
+        """ Only the imported periods are added to the daily totals """
+        with self.engine.begin() as connection:
+            client_id = connection.execute(insert(Client).values(client_name="acme")).inserted_primary_key[0]
+            project_id = connection.execute(
+                insert(Project).values(client_id=client_id, project_name="web")).inserted_primary_key[0]
+            # Not rebuilt from the periods, of which there are none
+            connection.execute(insert(DailyTotal).values(total_date=datetime.date(2021, 8, 1), client_id=client_id,
+                                                         project_id=project_id, total_duration=123))
+
+        self.execute(ImportCommand(), import_filename=self.write("tasks.jsonl", 10), import_chunk=4)
+        self.execute(ImportCommand(), import_filename=self.filename("tasks.jsonl"), import_restart=True)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(123, connection.execute(
+                select(DailyTotal.total_duration).where(DailyTotal.project_id == project_id)).scalar())
+            self.assertEqual(10 * 5400, connection.execute(
+                select(func.sum(DailyTotal.total_duration)).where(DailyTotal.project_id != project_id)).scalar())
+
+    def test_export01(self):
+        """ Export and import, JSONL and CSV """
+        self.execute(ImportCommand(), import_filename=self.write("tasks.jsonl", 20))
+
+        for name in ("export.jsonl", "export.csv"):
+            context = self.execute(ExportCommand(), export_filename=self.filename(name), export_chunk=7)
+            self.assertEqual(21, context["exported"])
+
+        with open(self.filename("export.csv"), "rt", newline="") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(21, len(rows))
+        self.assertEqual(("empty", ""), (rows[0]["client_name"], rows[0]["task_start"]))
+        self.assertEqual("2021-08-01T09:00:00", rows[1]["task_start"])
+        self.assertEqual("STOPPED", rows[1]["task_state"])
+
+        for name in ("export.jsonl", "export.csv"):
+            engine = self.engine
+            self.engine = create_engine(f"sqlite:///{self.filename(name)}.db")
+            migrate(self.engine)
+
+            self.execute(ImportCommand(), import_filename=self.filename(name))
+            self.assertEqual(20, self.count(Task))
+            self.assertEqual(7, self.count(Project))
+
+            self.engine.dispose()
+            self.engine = engine
+
+    def test_export02(self):
+        """ A resumed task keeps its periods through export and import, JSONL and CSV """
+        def at(value: str) -> datetime.datetime:
+            return datetime.datetime.fromisoformat(value)
+
+        with self.engine.begin() as connection:
+            client_id = connection.execute(insert(Client).values(client_name="acme")).inserted_primary_key[0]
+            project_id = connection.execute(
+                insert(Project).values(client_id=client_id, project_name="web")).inserted_primary_key[0]
+            task_id = connection.execute(insert(Task).values(
+                project_id=project_id, task_state=TaskState.STOPPED, task_start=at("2021-08-02 09:00"),
+                task_finish=at("2021-08-02 17:00"), task_duration=7200)).inserted_primary_key[0]
+            connection.execute(insert(Period), [
+                {"task_id": task_id, "period_start": at("2021-08-02 09:00"), "period_finish": at("2021-08-02 10:00")},
+                {"task_id": task_id, "period_start": at("2021-08-02 16:00"), "period_finish": at("2021-08-02 17:00")}])
+
+        for name in ("export.jsonl", "export.csv"):
+            context = self.execute(ExportCommand(), export_filename=self.filename(name), export_chunk=1)
+            self.assertEqual(1 if name.endswith("jsonl") else 2, context["exported"])
+
+            engine = self.engine
+            self.engine = create_engine(f"sqlite:///{self.filename(name)}.db")
+            migrate(self.engine)
+
+            self.execute(ImportCommand(), import_filename=self.filename(name), import_chunk=1)
+            self.execute(ImportCommand(), import_filename=self.filename(name), import_restart=True)
+            with self.engine.connect() as connection:
+                self.assertEqual([(at("2021-08-02 09:00"), at("2021-08-02 10:00")),
+                                  (at("2021-08-02 16:00"), at("2021-08-02 17:00"))], connection.execute(
+                    select(Period.period_start, Period.period_finish).order_by(Period.period_start)).all())
+                self.assertAlmostEqual(7200, connection.execute(
+                    select(func.sum(DailyTotal.total_duration))).scalar(), delta=1)
+
+            self.engine.dispose()
+            self.engine = engine
+
+    def test_export03(self):
+        """ A client without projects and a project without tasks are exported and imported, JSONL and CSV """
+        with self.engine.begin() as connection:
+            client_id = connection.execute(insert(Client).values(client_name="acme")).inserted_primary_key[0]
+            connection.execute(insert(Project).values(client_id=client_id, project_name="web"))
+            connection.execute(insert(Client).values(client_name="empty"))
+
+        for name in ("export.jsonl", "export.csv"):
+            context = self.execute(ExportCommand(), export_filename=self.filename(name))
+            self.assertEqual(2, context["exported"])
+
+            engine = self.engine
+            self.engine = create_engine(f"sqlite:///{self.filename(name)}.db")
+            migrate(self.engine)
+
+            self.execute(ImportCommand(), import_filename=self.filename(name))
+            with self.engine.connect() as connection:
+                self.assertEqual(["acme", "empty"], connection.execute(
+                    select(Client.client_name).order_by(Client.client_name)).scalars().all())
+                self.assertEqual(["web"], connection.execute(select(Project.project_name)).scalars().all())
+
+            self.engine.dispose()
+            self.engine = engine
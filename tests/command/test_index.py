@@ -0,0 +1,62 @@
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.client import ClientActiveCommand
+from zenith.command.database import DatabaseContext
+from zenith.command.project import ProjectActiveCommand
+from zenith.command.task import TaskActiveCommand, TaskListCommand, TaskReadCommand
+
+
+class TestIndex(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(tasks=1, active=True)
+
+    def explain(self, command, **values) -> str:
+        """
+        Runs the command and returns the query plan of its statement.
+        """
+        context = DatabaseContext()
+        context.session = self.session
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        self.assertTrue(runner.execute(context))
+        # A list is a query, executed when it is iterated
+        list(context.get("tasks", ()))
+
+        self.assertEqual(1, len(self.statements))
+        return self.plan(*self.statements[0])
+
+    def test_client01(self):
+        """ ClientActiveCommand: partial index """
+        plan = self.explain(ClientActiveCommand())
+        self.assertIn("USING INDEX ix_clients_active", plan)
+
+    def test_project01(self):
+        """ ProjectActiveCommand: partial index """
+        plan = self.explain(ProjectActiveCommand(), client=self.client)
+        self.assertIn("USING INDEX ix_projects_active", plan)
+
+    def test_task01(self):
+        """ TaskActiveCommand: partial index """
+        plan = self.explain(TaskActiveCommand(), project=self.project)
+        self.assertIn("USING INDEX ix_tasks_active", plan)
+
+    def test_task02(self):
+        """ TaskReadCommand: primary key """
+        plan = self.explain(TaskReadCommand(), project=self.project, task_id=1)
+        self.assertIn("USING INTEGER PRIMARY KEY", plan)
+
+    def test_task03(self):
+        """ TaskListCommand: composite index, no sort """
+        plan = self.explain(TaskListCommand(), project=self.project)
+        self.assertIn("USING INDEX ix_tasks_project_task", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_task04(self):
+        """ TaskListCommand filtered by state: composite index, no sort """
+        plan = self.explain(TaskListCommand(), project=self.project, task_state="NEW", task_after=0)
+        self.assertIn("USING INDEX ix_tasks_project_state", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
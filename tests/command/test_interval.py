@@ -0,0 +1,113 @@
+import datetime
+import unittest
+
+from sqlalchemy import delete, select, update
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext, has_rtree
+from zenith.command.task import TaskConflictCommand, TaskListCommand
+from zenith.models import Period, Task, TaskState, epoch, periods_rtree
+
+
+def at(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+class TestInterval(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(tasks=4, state=TaskState.STOPPED)
+
+        self.session.add_all([
+            Period(task=self.tasks[0], period_start=at("2021-08-02 09:00"), period_finish=at("2021-08-02 10:00")),
+            Period(task=self.tasks[1], period_start=at("2021-08-02 09:30"), period_finish=at("2021-08-02 11:00")),
+            Period(task=self.tasks[2], period_start=at("2021-08-02 11:00"), period_finish=at("2021-08-02 12:00")),
+            Period(task=self.tasks[3], period_start=at("2021-08-03 09:00"), period_finish=None),
+        ])
+        self.session.commit()
+        self.statements.clear()
+
+    def execute(self, command, **values) -> DatabaseContext:
+        context = DatabaseContext()
+        context.session = self.session
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        self.assertTrue(runner.execute(context))
+
+        return context
+
+    def overlapping(self, start: str, finish: str, rtree: bool = True) -> list:
+        return [self.tasks.index(task) for task in self.session.execute(
+            select(Task).where(Task.overlapping(at(start), at(finish), rtree)).order_by(Task.task_id)).scalars()]
+
+    def test_overlap01(self):
+        """ Tasks with a period overlapping the range, an open period lasts until now """
+        for rtree in (True, False):
+            self.assertEqual([0, 1], self.overlapping("2021-08-02 09:45", "2021-08-02 10:15", rtree))
+            self.assertEqual([0], self.overlapping("2021-08-02 08:00", "2021-08-02 09:30", rtree))
+            self.assertEqual([1, 2], self.overlapping("2021-08-02 10:30", "2021-08-02 11:30", rtree))
+            self.assertEqual([], self.overlapping("2021-08-02 12:00", "2021-08-02 13:00", rtree))
+            self.assertEqual([3], self.overlapping("2030-01-01 00:00", "2030-01-02 00:00", rtree))
+
+    def test_plan01(self):
+        """ The candidates are searched in the R*Tree """
+        self.assertTrue(has_rtree(self.session))
+        self.statements.clear()
+        self.overlapping("2021-08-02 09:45", "2021-08-02 10:15")
+
+        self.assertIn("VIRTUAL TABLE INDEX", self.plan(*self.statements[-1]))
+
+    def test_trigger01(self):
+        """ The R*Tree follows the inserts, updates and deletes of the periods """
+        def bounds() -> dict:
+            return {row[0]: (row[1], row[2]) for row in self.session.execute(select(periods_rtree))}
+
+        periods = self.session.execute(select(Period).order_by(Period.period_id)).scalars().all()
+        self.assertEqual(len(periods), len(bounds()))
+        self.assertAlmostEqual(epoch(at("2021-08-02 09:00")), bounds()[periods[0].period_id][0], delta=256)
+
+        self.session.execute(update(Period).where(Period.period_id == periods[3].period_id)
+                             .values(period_finish=at("2021-08-03 10:00")))
+        self.session.execute(delete(Period).where(Period.period_id == periods[2].period_id))
+        self.session.commit()
+
+        self.assertEqual(len(periods) - 1, len(bounds()))
+        self.assertAlmostEqual(epoch(at("2021-08-03 10:00")), bounds()[periods[3].period_id][1], delta=256)
+        self.assertEqual([], self.overlapping("2030-01-01 00:00", "2030-01-02 00:00"))
+
+    def test_list01(self):
+        """ The tasks of the project worked on between two times """
+        context = self.execute(TaskListCommand(), project=self.project,
+                               task_between=(at("2021-08-02 10:30"), at("2021-08-02 11:30")))
+
+        self.assertEqual([self.tasks[1].task_id, self.tasks[2].task_id], [task.task_id for task in context["tasks"]])
+
+    def test_conflict01(self):
+        """ Overlapping periods of different tasks, with and without the R*Tree """
+        for rtree in (True, False):
+            if not rtree:
+                with self.engine.begin() as connection:
+                    connection.exec_driver_sql("DROP TABLE periods_rtree")
+                self.assertFalse(has_rtree(self.session))
+
+            context = self.execute(TaskConflictCommand())
+            self.assertEqual([(self.tasks[0].task_id, self.tasks[1].task_id)],
+                             [(row[0], row[3]) for row in context["conflicts"]])
+
+            context = self.execute(TaskConflictCommand(), task_between=(at("2021-08-03"), at("2021-08-04")))
+            self.assertEqual([], context["conflicts"])
+
+    def test_conflict02(self):
+        """ Every period is joined through the R*Tree """
+        self.statements.clear()
+        self.execute(TaskConflictCommand())
+
+        self.assertIn("VIRTUAL TABLE INDEX", self.plan(*self.statements[-1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import event
+
+from zenith.chain import Runner
+from zenith.command.active import ActiveCommand
+from zenith.command.client import ClientListCommand
+from zenith.command.database import DatabaseContext, DatabaseSessionCommand, DatabaseSetupCommand, dispose, \
+    migrate, register
+from zenith.command.project import ProjectListCommand, ProjectReadCommand
+from zenith.command.task import TaskListCommand, TaskReadCommand
+from zenith.models import Client, Project, Task, TaskState
+
+
+class TestLoading(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp.name, "zenith.db")
+        self.engine, Session = register(self.db_filename)
+        migrate(self.engine)
+
+        self.session = Session()
+        self.client = Client(client_name="client", client_active=True)
+        self.project = Project(client=self.client, project_name="project", project_active=True)
+        self.session.add_all([self.client, self.project])
+        self.session.commit()
+
+        self.statements = 0
+        event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+
+    def tearDown(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        self.session.close()
+        dispose(self.db_filename)
+        self.tmp.cleanup()
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements += 1
+
+    def seed(self, count: int) -> None:
+        n = self.session.query(Project).count()
+        for m in range(count):
+            client = Client(client_name=f"client {n + m}")
+            self.session.add_all([client, Project(client=self.client, project_name=f"project {n + m}"),
+                                  Task(project=self.project)])
+        self.session.commit()
+
+    def execute(self, command, **values) -> DatabaseContext:
+        """
+        Runs the command and the display of its result, after the commit.
+
+        :return: the context
+        """
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseSessionCommand())
+        runner.append(ActiveCommand())
+        runner.append(command)
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        for key, value in values.items():
+            context[key] = value
+
+        self.statements = 0
+        self.assertTrue(runner.execute(context))
+
+        for client in context.get("clients", []):
+            (client.client_name, client.client_uuid, client.client_active)
+        for project in context.get("projects", []):
+            (project.client.client_name, project.project_name, project.project_uuid, project.project_active)
+        for task in context.get("tasks", []):
+            (task.project.client.client_name, task.project.project_name, task.task_name, task.task_state)
+        if "task" in context and "tasks" not in context:
+            task = context["task"]
+            (task.project.client.client_name, task.task_description, task.task_remark)
+
+        return context
+
+    def test_list01(self):
+        """ A constant number of statements, whatever the number of rows """
+        for command in (ClientListCommand, ProjectListCommand, TaskListCommand):
+            self.seed(5)
+            self.execute(command())
+            statements = self.statements
+
+            self.seed(50)
+            self.execute(command())
+
+            self.assertEqual(statements, self.statements, command.__name__)
+            self.assertEqual(2, self.statements, command.__name__)
+
+    def test_list02(self):
+        """ The large columns are deferred in the list """
+        self.seed(5)
+        context = self.execute(TaskListCommand())
+
+        self.assertNotIn("task_description", context["tasks"][0].__dict__)
+        self.assertNotIn("task_remark", context["tasks"][0].__dict__)
+
+    def test_list03(self):
+        """ The list is streamed: the query runs when it is iterated, in batches of yield_per """
+        self.seed(25)
+        command = TaskListCommand()
+        command.yield_per = 10
+
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseSessionCommand())
+        runner.append(ActiveCommand())
+        runner.append(command)
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+        self.statements = 0
+        self.assertTrue(runner.execute(context))
+
+        # The active lookup only
+        self.assertEqual(1, self.statements)
+        tasks = iter(context["tasks"])
+        self.assertEqual(2, self.statements)
+        self.assertEqual(1, next(tasks).task_id)
+        self.assertEqual(2, self.statements)
+        self.assertEqual(24, len(list(tasks)))
+        self.assertEqual(2, self.statements)
+
+    def test_list04(self):
+        """ Keyset pagination and filters in SQL """
+        self.seed(25)
+        self.session.query(Task).filter(Task.task_id.in_([3, 5, 7])).update({Task.task_state: TaskState.STOPPED})
+        self.session.commit()
+
+        context = self.execute(TaskListCommand(), task_after=4, task_limit=5)
+        self.assertEqual([5, 6, 7, 8, 9], [task.task_id for task in context["tasks"]])
+
+        context = self.execute(TaskListCommand(), task_state="STOPPED", task_after=3)
+        self.assertEqual([5, 7], [task.task_id for task in context["tasks"]])
+
+        context = self.execute(ProjectListCommand(), project_after="project 10", project_limit=3)
+        self.assertEqual(["project 11", "project 12", "project 13"],
+                         [project.project_name for project in context["projects"]])
+
+    def test_read01(self):
+        """ The project and client are loaded with the task, the display costs no statements """
+        self.seed(5)
+        self.execute(TaskReadCommand(), task_id=1)
+        self.assertEqual(2, self.statements)
+
+        self.execute(ProjectReadCommand(), project_name="project 1")
+        self.assertEqual(2, self.statements)
@@ -0,0 +1,111 @@
+import unittest
+
+from sqlalchemy import select
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext
+from zenith.command.project import ProjectCreateCommand, ProjectDeleteCommand, ProjectUpdateCommand
+from zenith.command.task import TaskCreateCommand, TaskDeleteCommand, TaskNewCommand, TaskUpdateCommand
+from zenith.models import Project, Task, TaskState
+
+
+class TestMutate(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(projects=2, tasks=1)
+        self.task = self.tasks[0]
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def execute(self, command, **values) -> DatabaseContext:
+        context = DatabaseContext()
+        context.session = self.session
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        context["result"] = runner.execute(context)
+        self.session.commit()
+        self.statements = [statement for statement in self.statements if statement.split()[0] != "COMMIT"]
+
+        return context
+
+    def names(self) -> list:
+        return self.session.execute(select(Project.project_name).order_by(Project.project_name)).scalars().all()
+
+    def test_project01(self):
+        """ Create: one statement, a duplicate is a failure. """
+        context = self.execute(ProjectCreateCommand(), client=self.client, project_name="project 2")
+        self.assertTrue(context["result"])
+        self.assertIsNotNone(context["project_id"])
+        self.assertEqual(1, len(self.statements))
+
+        self.statements.clear()
+        context = self.execute(ProjectCreateCommand(), client=self.client, project_name="project 2")
+        self.assertFalse(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual(["project 0", "project 1", "project 2"], self.names())
+
+    def test_project02(self):
+        """ Update: one statement, a missing project is a failure. """
+        context = self.execute(ProjectUpdateCommand(), client=self.client, project_name="project 1",
+                               project_description="description")
+        self.assertTrue(context["result"])
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual("description", self.session.execute(
+            select(Project.project_description).where(Project.project_name == "project 1")).scalar_one())
+
+        context = self.execute(ProjectUpdateCommand(), client=self.client, project_name="project 9",
+                               project_description="description")
+        self.assertFalse(context["result"])
+
+    def test_project03(self):
+        """ Delete: one statement, a project with tasks is kept. """
+        context = self.execute(ProjectDeleteCommand(), client=self.client, project_name="project 0")
+        self.assertFalse(context["result"])
+        self.assertEqual(1, len(self.statements))
+
+        context = self.execute(ProjectDeleteCommand(), client=self.client, project_name="project 1")
+        self.assertTrue(context["result"])
+        self.assertEqual(["project 0"], self.names())
+
+        context = self.execute(ProjectDeleteCommand(), client=self.client, project_name="project 1")
+        self.assertFalse(context["result"])
+
+    def test_task01(self):
+        """ New and create: one statement, the task ID is returned. """
+        context = self.execute(TaskNewCommand(), project=self.projects[1])
+        self.assertTrue(context["result"])
+        self.assertEqual(1, len(self.statements))
+        task = self.session.get(Task, context["task_id"])
+        self.assertEqual(TaskState.NEW, task.task_state)
+        self.assertEqual(self.projects[1].project_id, task.project_id)
+
+        context = self.execute(TaskCreateCommand(), project=self.projects[1])
+        self.assertTrue(context["result"])
+        self.assertNotEqual(task.task_id, context["task_id"])
+
+    def test_task02(self):
+        """ Update and delete: one statement, a task of another project is a failure. """
+        context = self.execute(TaskUpdateCommand(), project=self.projects[1], task_id=self.task.task_id,
+                               task_name="name")
+        self.assertFalse(context["result"])
+        self.assertEqual(1, len(self.statements))
+
+        context = self.execute(TaskUpdateCommand(), project=self.projects[0], task_id=self.task.task_id,
+                               task_name="name")
+        self.assertTrue(context["result"])
+
+        context = self.execute(TaskDeleteCommand(), project=self.projects[1], task_id=self.task.task_id)
+        self.assertFalse(context["result"])
+
+        context = self.execute(TaskDeleteCommand(), project=self.projects[0], task_id=self.task.task_id)
+        self.assertTrue(context["result"])
+        self.assertIsNone(self.session.execute(select(Task).where(Task.task_id == self.task.task_id)).scalar())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import datetime
+import unittest
+
+from sqlalchemy import select
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext, MIGRATIONS, migrate
+from zenith.command.report import ReportTotalsCommand
+from zenith.command.task import TaskDeleteCommand, TaskStartCommand, TaskStopCommand
+from zenith.models import Period, TaskState
+
+
+class TestPeriod(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(tasks=1)
+        self.task = self.tasks[0]
+
+    def execute(self, command, **values) -> bool:
+        context = DatabaseContext()
+        context.session = self.session
+        context["project"] = self.project
+        context["task_id"] = self.task.task_id
+        for key, value in values.items():
+            context[key] = value
+
+        runner = Runner()
+        runner.append(command)
+        result = runner.execute(context)
+        self.session.commit()
+
+        return result
+
+    def periods(self) -> list:
+        return self.session.execute(select(Period).where(Period.task_id == self.task.task_id)
+                                    .order_by(Period.period_start)
+                                    .execution_options(populate_existing=True)).scalars().all()
+
+    def test_start01(self):
+        """ Start appends an open period, a started task is not started again """
+        self.assertTrue(self.execute(TaskStartCommand()))
+        self.assertFalse(self.execute(TaskStartCommand()))
+
+        periods = self.periods()
+        self.assertEqual(1, len(periods))
+        self.assertIsNone(periods[0].period_finish)
+        self.assertEqual(self.task.task_start, periods[0].period_start)
+
+    def test_stop01(self):
+        """ Stop closes the open period, a stopped task is not stopped again """
+        self.assertFalse(self.execute(TaskStopCommand()))
+        self.assertTrue(self.execute(TaskStartCommand()))
+        self.assertTrue(self.execute(TaskStopCommand()))
+        self.assertFalse(self.execute(TaskStopCommand()))
+
+        periods = self.periods()
+        self.assertEqual(1, len(periods))
+        self.assertEqual(self.task.task_finish, periods[0].period_finish)
+
+    def test_resume01(self):
+        """ A stopped task is resumed, task_duration is the sum of the periods """
+        for n in range(3):
+            self.assertTrue(self.execute(TaskStartCommand()))
+            period = self.periods()[-1]
+            period.period_start = period.period_start - datetime.timedelta(minutes=10 * (n + 1))
+            self.session.commit()
+            self.assertTrue(self.execute(TaskStopCommand()))
+
+        periods = self.periods()
+        self.assertEqual(3, len(periods))
+        self.assertEqual(TaskState.STOPPED, self.task.task_state)
+        self.assertEqual(round(sum((period.period_finish - period.period_start).total_seconds() for period in periods)),
+                         self.task.task_duration)
+        self.assertAlmostEqual(3600, self.task.task_duration, delta=2)
+
+    def test_resume02(self):
+        """ The fractions of the periods add up in task_duration, as in the report """
+        for n in range(5):
+            self.assertTrue(self.execute(TaskStartCommand()))
+            period = self.periods()[-1]
+            period.period_start = period.period_start - datetime.timedelta(milliseconds=640)
+            self.session.commit()
+            self.assertTrue(self.execute(TaskStopCommand()))
+
+        context = DatabaseContext()
+        context.session = self.session
+        context["report_from"] = datetime.date.today() - datetime.timedelta(days=1)
+        context["report_to"] = datetime.date.today()
+        context["report_by"] = "task"
+        runner = Runner()
+        runner.append(ReportTotalsCommand())
+        self.assertTrue(runner.execute(context))
+
+        self.assertEqual(3, self.task.task_duration)
+        self.assertEqual(self.task.task_duration, sum(row["duration"] for row in context["report_rows"]))
+
+    def test_stop02(self):
+        """ Stop finds the open period through the index """
+        self.assertTrue(self.execute(TaskStartCommand()))
+        self.statements.clear()
+        self.assertTrue(self.execute(TaskStopCommand()))
+
+        statement, parameters = [(statement, parameters) for statement, parameters in self.statements
+                                 if "periods" in statement][0]
+
+        self.assertIn("ix_periods_open", self.plan(statement, parameters))
+
+    def test_delete01(self):
+        """ Delete removes the periods of the task """
+        self.assertTrue(self.execute(TaskStartCommand()))
+        self.assertTrue(self.execute(TaskStopCommand()))
+        self.assertTrue(self.execute(TaskDeleteCommand()))
+
+        self.assertEqual([], self.periods())
+
+    def test_migrate01(self):
+        """ Every started task gets one period """
+        version = [number for number, name, function in MIGRATIONS if name == "periods"][0]
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE periods")
+            connection.exec_driver_sql("UPDATE tasks SET task_state = 'STOPPED', task_start = '2021-08-01 09:00:00', "
+                                       "task_finish = '2021-08-01 10:30:00', task_duration = 5400")
+            connection.exec_driver_sql("INSERT INTO tasks (project_id, task_uuid, task_active, task_state, "
+                                       "task_duration, created_on, updated_on) VALUES "
+                                       "(1, 'new', 0, 'NEW', 0, '2021-08-01', '2021-08-01')")
+            connection.exec_driver_sql(f"PRAGMA user_version = {version - 1}")
+            connection.exec_driver_sql(f"DELETE FROM schema_version WHERE version >= {version}")
+
+        self.assertEqual([version], migrate(self.engine, MIGRATIONS[:version]))
+
+        periods = self.session.execute(select(Period)).scalars().all()
+        self.assertEqual(1, len(periods))
+        self.assertEqual((self.task.task_id, datetime.datetime(2021, 8, 1, 9), datetime.datetime(2021, 8, 1, 10, 30)),
+                         (periods[0].task_id, periods[0].period_start, periods[0].period_finish))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import datetime
+import os
+import time
+import unittest
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext
+from zenith.command.report import ReportTotalsCommand
+from zenith.command.rollup import rebuild_rollups, split_days
+from zenith.models import Client, Period, Project, Task, TaskState
+
+# Budget of a report over years of periods, in milliseconds: timed only when ZENITH_BUDGET_TESTS is set
+REPORT_BUDGET_MS = float(os.environ.get("ZENITH_REPORT_BUDGET_MS", 1000))
+
+
+class TestReport(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        clients = [Client(client_name="aap"), Client(client_name="noot")]
+        projects = [Project(client=clients[0], project_name="one"), Project(client=clients[1], project_name="two")]
+        self.tasks = [Task(project=projects[0], task_state=TaskState.STOPPED),
+                      Task(project=projects[0], task_state=TaskState.STOPPED),
+                      Task(project=projects[1], task_state=TaskState.STARTED)]
+        self.session.add_all(clients + projects + self.tasks)
+        self.session.flush()
+
+        self.session.add_all([
+            # Within one day
+            self.period(0, "2021-08-02 09:00", "2021-08-02 10:30"),
+            self.period(1, "2021-08-02 11:00", "2021-08-02 11:15"),
+            self.period(0, "2021-08-03 09:00", "2021-08-03 09:30"),
+            # Across midnight
+            self.period(1, "2021-08-08 23:00", "2021-08-09 01:00"),
+            # Across the start of the range
+            self.period(0, "2021-07-31 23:30", "2021-08-01 00:30"),
+            # Outside the range
+            self.period(0, "2021-07-30 09:00", "2021-07-30 10:00"),
+            self.period(0, "2021-09-01 09:00", "2021-09-01 10:00"),
+            # Open
+            self.period(2, "2021-08-31 22:00", None),
+        ])
+        self.session.commit()
+        rebuild_rollups(self.session)
+        self.session.commit()
+        self.statements.clear()
+
+    def period(self, task: int, start: str, finish: str = None) -> Period:
+        return Period(task=self.tasks[task], period_start=datetime.datetime.fromisoformat(start),
+                      period_finish=datetime.datetime.fromisoformat(finish) if finish else None)
+
+    def execute(self, by: str = None, period: str = None, date_from: str = "2021-08-01",
+                date_to: str = "2021-08-31") -> list:
+        context = DatabaseContext()
+        context.session = self.session
+        context["report_from"] = datetime.date.fromisoformat(date_from)
+        context["report_to"] = datetime.date.fromisoformat(date_to)
+        context["report_by"] = by
+        context["report_period"] = period
+
+        runner = Runner()
+        runner.append(ReportTotalsCommand())
+        self.assertTrue(runner.execute(context))
+
+        return [tuple(row.values()) for row in context["report_rows"]]
+
+    def test_split01(self):
+        """ Spans are split at midnight """
+        self.assertEqual([(datetime.date(2021, 8, 1), 3600.0)],
+                         list(split_days(datetime.datetime(2021, 8, 1, 9), datetime.datetime(2021, 8, 1, 10))))
+        self.assertEqual([(datetime.date(2021, 8, 1), 1800.0), (datetime.date(2021, 8, 2), 86400.0),
+                          (datetime.date(2021, 8, 3), 900.0)],
+                         list(split_days(datetime.datetime(2021, 8, 1, 23, 30), datetime.datetime(2021, 8, 3, 0, 15))))
+
+    def test_day01(self):
+        """ Per project and day """
+        self.assertEqual([("2021-08-01", "aap", "one", 1800),
+                          ("2021-08-02", "aap", "one", 6300),
+                          ("2021-08-03", "aap", "one", 1800),
+                          ("2021-08-08", "aap", "one", 3600),
+                          ("2021-08-09", "aap", "one", 3600),
+                          ("2021-08-31", "noot", "two", 7200)], self.execute())
+
+    def test_task01(self):
+        """ Per task and day """
+        rows = self.execute(by="task", date_from="2021-08-02", date_to="2021-08-02")
+        self.assertEqual([("2021-08-02", "aap", "one", self.tasks[0].task_id, None, 5400),
+                          ("2021-08-02", "aap", "one", self.tasks[1].task_id, None, 900)], rows)
+
+    def test_week01(self):
+        """ Per client and ISO week """
+        self.assertEqual([("2021-W30", "aap", 1800),
+                          ("2021-W31", "aap", 11700),
+                          ("2021-W32", "aap", 3600),
+                          ("2021-W35", "noot", 7200)], self.execute(by="client", period="week"))
+
+    def test_month01(self):
+        """ Per client and month, the open period is clipped to the range """
+        self.assertEqual([("2021-08", "aap", 17100), ("2021-08", "noot", 7200)],
+                         self.execute(by="client", period="month"))
+
+    def test_plan01(self):
+        """ Per task: the periods within one day are read through the index, and grouped by SQL """
+        self.execute(by="task")
+
+        statement, parameters = self.statements[0]
+        self.assertIn("GROUP BY", statement)
+        self.assertIn("ix_periods_start_finish", self.plan(statement, parameters))
+
+    def test_plan02(self):
+        """ Per project: the daily totals are read through the primary key, the open periods through the index """
+        self.execute()
+
+        statement, parameters = self.statements[0]
+        self.assertIn("FROM daily_totals", statement)
+        self.assertIn("sqlite_autoindex_daily_totals_1", self.plan(statement, parameters))
+        self.assertIn("ix_periods_open", self.plan(*self.statements[1]))
+
+    def test_rollup01(self):
+        """ The daily totals are the totals of the periods """
+        for by in ("client", "project"):
+            for period in ("day", "week", "month"):
+                self.execute(by=by, period=period, date_from="2021-07-01", date_to="2021-09-30")
+                rollup = self.execute(by=by, period=period, date_from="2021-07-01", date_to="2021-09-30")
+                tasks = self.execute(by="task", period=period, date_from="2021-07-01", date_to="2021-09-30")
+                totals = dict()
+                for row in tasks:
+                    key = row[:2] if by == "client" else row[:3]
+                    totals[key] = totals.get(key, 0) + row[-1]
+                self.assertEqual(totals, {row[:-1]: row[-1] for row in rollup})
+
+    @unittest.skipUnless(os.environ.get("ZENITH_BUDGET_TESTS"), "wall-clock budget, set ZENITH_BUDGET_TESTS to run")
+    def test_budget01(self):
+        """ Four years of periods of hundreds of projects """
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 300) "
+                "INSERT INTO projects (client_id, project_uuid, project_name, project_active, created_on, updated_on) "
+                "SELECT 1, 'uuid-' || i, 'project ' || i, 0, datetime('now'), datetime('now') FROM n")
+            connection.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3000) "
+                "INSERT INTO tasks (project_id, task_uuid, task_active, task_state, task_duration, created_on, "
+                "updated_on) SELECT 3 + i % 300, 'uuid-' || i, 0, 'STOPPED', 0, datetime('now'), datetime('now') "
+                "FROM n")
+            connection.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50000) "
+                "INSERT INTO periods (task_id, period_start, period_finish, created_on, updated_on) "
+                "SELECT 4 + i % 3000, "
+                "strftime('%Y-%m-%d %H:%M:%f', '2018-01-01', '+' || (i * 40) || ' minutes') || '000', "
+                "strftime('%Y-%m-%d %H:%M:%f', '2018-01-01', '+' || (i * 40 + 30) || ' minutes') || '000', "
+                "datetime('now'), datetime('now') FROM n")
+            rebuild_rollups(connection)
+
+        start = time.perf_counter()
+        rows = self.execute(period="month", date_from="2018-01-01", date_to="2021-12-31")
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+        self.assertEqual(50000 * 1800, sum(row[-1] for row in rows if row[2].startswith("project")))
+        self.assertLess(elapsed_ms, REPORT_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
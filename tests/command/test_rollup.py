@@ -0,0 +1,115 @@
+import datetime
+import unittest
+
+from sqlalchemy import select, update
+
+from tests.command.database import DatabaseTestCase
+from zenith.chain import Runner
+from zenith.command.database import DatabaseContext, MIGRATIONS, migrate
+from zenith.command.rollup import RollupRebuildCommand, add_period
+from zenith.command.task import TaskDeleteCommand, TaskStartCommand, TaskStopCommand
+from zenith.models import DailyTotal, Period
+
+
+class TestRollup(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed(tasks=2)
+
+    def execute(self, command, task: int = 0) -> bool:
+        context = DatabaseContext()
+        context.session = self.session
+        context["project"] = self.project
+        context["task_id"] = self.tasks[task].task_id
+
+        runner = Runner()
+        runner.append(command)
+        result = runner.execute(context)
+        self.session.commit()
+
+        return result
+
+    def closed_period(self, task: int, start: str, finish: str) -> None:
+        """ A closed period of the past, added to the daily totals as by the stop """
+        period = Period(task=self.tasks[task], period_start=datetime.datetime.fromisoformat(start),
+                        period_finish=datetime.datetime.fromisoformat(finish))
+        self.session.add(period)
+        add_period(self.session, self.client.client_id, self.project.project_id, period.period_start,
+                   period.period_finish)
+        self.session.commit()
+
+    def totals(self) -> dict:
+        return {total_date.isoformat(): round(total_duration) for total_date, total_duration in self.session.execute(
+            select(DailyTotal.total_date, DailyTotal.total_duration).order_by(DailyTotal.total_date))}
+
+    def test_stop01(self):
+        """ Stop adds the closed period to the daily totals """
+        self.assertTrue(self.execute(TaskStartCommand()))
+        self.assertEqual({}, self.totals())
+        self.assertTrue(self.execute(TaskStopCommand()))
+
+        self.assertEqual([datetime.date.today().isoformat()], list(self.totals()))
+
+    def test_stop02(self):
+        """ A period across midnight is split """
+        self.closed_period(0, "2021-08-01 23:00", "2021-08-02 00:30")
+        self.closed_period(1, "2021-08-02 09:00", "2021-08-02 10:00")
+
+        self.assertEqual({"2021-08-01": 3600, "2021-08-02": 5400}, self.totals())
+
+    def test_delete01(self):
+        """ Delete subtracts the periods of the task, empty days are removed """
+        self.closed_period(0, "2021-08-01 23:00", "2021-08-02 00:30")
+        self.closed_period(1, "2021-08-02 09:00", "2021-08-02 10:00")
+        self.assertTrue(self.execute(TaskDeleteCommand(), 0))
+
+        self.assertEqual({"2021-08-02": 3600}, self.totals())
+
+    def test_rebuild01(self):
+        """ The rebuild recomputes the daily totals kept by stop and delete """
+        self.closed_period(0, "2021-08-01 23:00", "2021-08-02 00:30")
+        self.closed_period(1, "2021-08-02 09:00", "2021-08-02 10:00")
+        self.closed_period(1, "2021-08-03 09:00", "2021-08-03 09:15")
+        totals = self.totals()
+
+        self.session.execute(update(DailyTotal).values(total_duration=0))
+        self.session.commit()
+        self.assertTrue(self.execute(RollupRebuildCommand()))
+
+        self.assertEqual({"2021-08-01": 3600, "2021-08-02": 5400, "2021-08-03": 900}, totals)
+        self.assertEqual(totals, self.totals())
+
+    def test_migrate01(self):
+        """ The migration computes the daily totals of the periods """
+        self.closed_period(0, "2021-08-01 23:00", "2021-08-02 00:30")
+        version = [number for number, name, function in MIGRATIONS if name == "daily totals"][0]
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE daily_totals")
+            connection.exec_driver_sql(f"PRAGMA user_version = {version - 1}")
+            connection.exec_driver_sql(f"DELETE FROM schema_version WHERE version >= {version}")
+
+        self.assertEqual([version], migrate(self.engine, MIGRATIONS[:version]))
+        self.assertEqual({"2021-08-01": 3600, "2021-08-02": 1800}, self.totals())
+
+    def test_migrate02(self):
+        """ The migration splits the periods at midnight as the rebuild of the daily totals """
+        self.closed_period(0, "2021-08-01 09:00", "2021-08-01 10:30")
+        self.closed_period(0, "2021-08-01 11:00", "2021-08-01 11:00")
+        self.closed_period(1, "2021-08-02 22:00", "2021-08-05 00:00")
+        self.closed_period(1, "2021-08-05 23:59:59.250000", "2021-08-06 00:00:00.250000")
+        version = [number for number, name, function in MIGRATIONS if name == "daily totals"][0]
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE daily_totals")
+            connection.exec_driver_sql(f"PRAGMA user_version = {version - 1}")
+            connection.exec_driver_sql(f"DELETE FROM schema_version WHERE version >= {version}")
+        migrate(self.engine, MIGRATIONS[:version])
+        migrated = self.totals()
+
+        self.assertTrue(self.execute(RollupRebuildCommand()))
+        self.assertEqual(self.totals(), migrated)
+        self.assertEqual({"2021-08-01": 5400, "2021-08-02": 7200, "2021-08-03": 86400, "2021-08-04": 86400,
+                          "2021-08-05": 1, "2021-08-06": 0}, migrated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import logging
+import os
+import unittest
+
+from zenith.chain import ChainException, schedule
+from zenith.command.common import LoggingCommand, ReportCommand
+from zenith.factory.client import ClientFactory
+from zenith.factory.project import ProjectFactory
+from zenith.factory.task import TaskFactory
+
+
+class TestFactory(unittest.TestCase):
+    def test01(self):
+        """ A template is created once per factory method and log level. """
+        self.assertIs(TaskFactory.create_start(logging.ERROR), TaskFactory.create_start(logging.ERROR))
+        self.assertIsNot(TaskFactory.create_start(logging.ERROR), TaskFactory.create_start(logging.DEBUG))
+        self.assertIsNot(TaskFactory.create_start(logging.ERROR), TaskFactory.create_stop(logging.ERROR))
+        self.assertIsNot(ClientFactory.create_read(logging.ERROR), ProjectFactory.create_read(logging.ERROR))
+
+    def test02(self):
+        """ A template is compiled and frozen. """
+        processor = TaskFactory.create_list(logging.ERROR)
+
+        self.assertIsNotNone(processor.plan)
+        with self.assertRaises(ChainException):
+            processor.processing.append(ReportCommand())
+
+    def test03(self):
+        """ create_default still returns a new processor. """
+        self.assertIsNot(TaskFactory.create_default(logging.ERROR), TaskFactory.create_default(logging.ERROR))
+
+    def test04(self):
+        """ Logging is set up before the database commands of the initialization. """
+        stages = schedule(TaskFactory.create_default(logging.ERROR).initialization.commands)
+        stage = [n for n, commands in enumerate(stages) if any(isinstance(c, LoggingCommand) for c in commands)][0]
+
+        self.assertEqual(1, len(stages[stage]))
+        self.assertIn("DatabaseSetupCommand", [type(c).__name__ for c in stages[stage + 1]])
+
+    @unittest.skipIf(os.environ.get("ZENITH_PARALLEL") or os.environ.get("ZENITH_TIMED"), "opted in")
+    def test05(self):
+        """ A processor runs its commands in the calling thread and is not timed, unless opted in. """
+        processor = TaskFactory.create_default(logging.ERROR)
+
+        self.assertFalse(processor.parallel)
+        self.assertFalse(processor.timed)
+
+
+if __name__ == '__main__':
+    unittest.main()
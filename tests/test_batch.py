@@ -0,0 +1,120 @@
+import logging
+import os
+import pathlib
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from zenith.batch import BatchProcessor
+from zenith.chain import Command, CommandState, Processor, Runner
+from zenith.command.client import ClientCreateCommand
+from zenith.command.database import DatabaseContext, DatabaseCreateCommand, DatabaseDropCommand, \
+    DatabaseSessionCommand, DatabaseSetupCommand
+from zenith.models import Client
+
+# Reduce logging
+rootLogger = logging.getLogger()
+rootLogger.setLevel(logging.ERROR)
+
+
+class FailureCommand(Command):
+    requires = ("client_name",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        return context["client_name"] != "fail"
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        base_dir = pathlib.Path(__file__).parent.parent.parent.absolute()
+        db_dir = os.path.join(base_dir, "var", "db")
+        db_filename = os.path.join(db_dir, "zenith-test.db")
+
+        if not os.path.isdir(db_dir):
+            os.makedirs(db_dir)
+
+        cls.db_filename = db_filename
+
+    def setUp(self) -> None:
+        runner = Runner()
+        runner.append(DatabaseSetupCommand())
+        runner.append(DatabaseDropCommand())
+        runner.append(DatabaseCreateCommand())
+
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+
+        runner.execute(context)
+
+        self.commits = 0
+        event.listen(Engine, "commit", self.after_commit)
+
+    def tearDown(self) -> None:
+        event.remove(Engine, "commit", self.after_commit)
+
+    def after_commit(self, connection) -> None:
+        self.commits += 1
+
+    def create_batch(self, commit_every: int) -> BatchProcessor:
+        processor = Processor()
+        processor.initialization.append(DatabaseSetupCommand())
+        processor.initialization.append(DatabaseSessionCommand())
+        processor.validating.append(FailureCommand())
+        processor.processing.append(ClientCreateCommand())
+
+        return BatchProcessor(processor, commit_every)
+
+    def client_names(self) -> list:
+        engine = create_engine(f"sqlite:///{self.db_filename}")
+        tmp = sessionmaker(engine)()
+        names = [client.client_name for client in tmp.query(Client).order_by(Client.client_id)]
+        tmp.close()
+        engine.dispose()
+        return names
+
+    def test01(self):
+        """ Every item is executed. """
+        batch = self.create_batch(1)
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+
+        results = batch.execute(context, [{"client_name": name} for name in ("aap", "noot", "mies")])
+
+        self.assertEqual([(CommandState.SUCCESS, None)] * 3, results)
+        self.assertEqual(["aap", "noot", "mies"], self.client_names())
+        self.assertFalse("client_name" in context)
+
+    def test02(self):
+        """ Failing items are rolled back, the other items are kept. """
+        batch = self.create_batch(0)
+        context = DatabaseContext()
+        context["db_filename"] = self.db_filename
+
+        items = [{"client_name": name} for name in ("aap", "fail", "noot", "aap", "mies")]
+        results = batch.execute(context, items)
+
+        self.assertEqual([CommandState.SUCCESS, CommandState.FAILURE, CommandState.SUCCESS, CommandState.FAILURE,
+                          CommandState.SUCCESS], [state for state, error in results])
+        self.assertEqual(["aap", "noot", "mies"], self.client_names())
+
+    def test03(self):
+        """ Commit granularity. """
+        total = 0
+        for commit_every, commits in ((1, 6), (2, 3), (4, 2), (0, 1)):
+            self.commits = 0
+            batch = self.create_batch(commit_every)
+            context = DatabaseContext()
+            context["db_filename"] = self.db_filename
+
+            batch.execute(context, [{"client_name": f"client{commit_every}-{n}"} for n in range(6)])
+            total += 6
+
+            self.assertEqual(commits, self.commits, f"commit_every = {commit_every}")
+            self.assertEqual(total, len(self.client_names()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,20 @@
-from zenith.cli.__main__ import main
+import sys
 
 if __name__ == "__main__":
+    # The status is read from the snapshot, without importing the CLI or asking `zenith serve`
+    if sys.argv[1:2] == ["status"]:
+        from zenith import snapshot
+
+        status = snapshot.status(sys.argv[2:])
+        if status is not None:
+            sys.exit(status)
+
+    # A running `zenith serve` executes the command, without importing the CLI
+    from zenith.cli.remote import forward
+
+    status = forward(sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+    from zenith.cli.__main__ import main
     main()
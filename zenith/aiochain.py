@@ -0,0 +1,114 @@
+"""
+Chain of Command, asyncio
+"""
+import asyncio
+import concurrent.futures
+import functools
+
+from zenith.chain import ChainException, Command, CommandState, Context
+
+
+class AsyncCommand(object):
+    FAILURE = False
+    SUCCESS = True
+
+    async def execute(self, context: Context) -> bool:
+        return AsyncCommand.SUCCESS
+
+    async def post_execute(self, context: Context, state: CommandState, error: Exception = None) -> None:
+        pass
+
+
+class SyncCommand(AsyncCommand):
+    """
+    SyncCommand: Runs a synchronous command in an executor.
+    """
+
+    def __init__(self, command: Command, executor: concurrent.futures.Executor = None):
+        self.command = command
+        self.executor = executor
+
+    async def execute(self, context: Context) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.command.execute, context)
+
+    async def post_execute(self, context: Context, state: CommandState, error: Exception = None) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, functools.partial(self.command.post_execute, context, state, error))
+
+
+class AsyncChain(AsyncCommand):
+    def __init__(self, executor: concurrent.futures.Executor = None):
+        self.commands = list()
+        self.executor = executor
+
+    def append(self, command) -> None:
+        """
+        Appends a command, a synchronous command is adapted with SyncCommand.
+        """
+        if isinstance(command, Command):
+            command = SyncCommand(command, self.executor)
+
+        self.commands.append(command)
+
+    async def execute(self, context: Context) -> bool:
+        success = True
+        for command in self.commands:
+            success = await command.execute(context)
+            if not success:
+                break
+
+        return success
+
+    async def post_execute(self, context: Context, state: CommandState, error: Exception = None) -> None:
+        for command in self.commands[::-1]:
+            await command.post_execute(context, state, error)
+
+
+class AsyncRunner(AsyncChain):
+    async def execute(self, context: Context) -> bool:
+        exception = Exception("No exception")
+        state = CommandState.UNKNOWN
+
+        try:
+            if await super().execute(context):
+                state = CommandState.SUCCESS
+            else:
+                state = CommandState.FAILURE
+        except Exception as err:
+            exception = err
+            state = CommandState.ERROR
+        finally:
+            await super().post_execute(context, state, exception)
+
+        if state == CommandState.ERROR:
+            raise exception
+        elif state == CommandState.FAILURE:
+            return AsyncCommand.FAILURE
+        elif state == CommandState.SUCCESS:
+            return AsyncCommand.SUCCESS
+        else:
+            # Huh, How did this happen?
+            return AsyncCommand.FAILURE
+
+
+class AsyncProcessor(AsyncRunner):
+    def __init__(self, executor: concurrent.futures.Executor = None):
+        super().__init__(executor)
+
+        self.reporting = AsyncChain(executor)
+        self.initialization = AsyncChain(executor)
+        self.authentication = AsyncChain(executor)
+        self.authorization = AsyncChain(executor)
+        self.validating = AsyncChain(executor)
+        self.processing = AsyncChain(executor)
+
+        super().append(self.initialization)
+        super().append(self.reporting)
+        super().append(self.authentication)
+        super().append(self.authorization)
+        super().append(self.validating)
+        super().append(self.processing)
+
+    def append(self, command) -> None:
+        raise ChainException("Do not use!")
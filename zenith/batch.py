@@ -0,0 +1,119 @@
+"""
+Batch execution: many contexts through one processor and one session.
+"""
+import logging
+from typing import Iterable, Iterator
+
+from zenith.chain import CommandState, Processor
+from zenith.command.database import DatabaseContext
+
+
+class BatchProcessor(object):
+    """
+    BatchProcessor: Runs the initialization, reporting, authentication and authorization phases of a processor once,
+    then streams the item contexts through its validating and processing phases.
+
+    Every item runs in a savepoint: a failing item is rolled back, the other items are kept. The session is
+    committed every commit_every successful items, or once at the end when commit_every is 0.
+    """
+
+    def __init__(self, processor: Processor, commit_every: int = 1):
+        self.setup = processor.compile_phases([processor.initialization, processor.reporting,
+                                               processor.authentication, processor.authorization])
+        self.item = processor.compile_phases([processor.validating, processor.processing])
+        self.commit_every = commit_every
+
+    def execute(self, context: DatabaseContext, items: Iterable[dict]) -> list:
+        """
+        Executes the items.
+
+        :param context: the base context, every item context is forked from it after the setup
+        :param items: the keys of each item
+        :return: list of (CommandState, Exception or None), per item
+        """
+        return list(self.stream(context, items))
+
+    def stream(self, context: DatabaseContext, items: Iterable[dict]) -> Iterator:
+        """
+        Executes the items lazily, yields (CommandState, Exception or None) per item.
+        """
+        logger = logging.getLogger(__name__)
+        exception = Exception("No exception")
+        state = CommandState.UNKNOWN
+
+        try:
+            self.setup.check(context)
+            if not self.setup.execute(context):
+                state = CommandState.FAILURE
+                return
+
+            session = context.session
+            pending = 0
+            count = 0
+
+            for item in items:
+                self.begin(session)
+                item_state, item_error = self.execute_item(context, item)
+
+                count += 1
+                if item_state == CommandState.SUCCESS:
+                    pending += 1
+                else:
+                    logger.warning(f"Batch item {count} - {item_state.name}: {item_error or ''}")
+
+                if self.commit_every and pending >= self.commit_every:
+                    session.commit()
+                    pending = 0
+
+                yield item_state, item_error
+
+            logger.info(f"Batch - {count} items")
+            state = CommandState.SUCCESS
+        except Exception as err:
+            exception = err
+            state = CommandState.ERROR
+        finally:
+            # DatabaseSessionCommand commits the remaining items
+            self.setup.post_execute(context, state, exception)
+
+        if state == CommandState.ERROR:
+            raise exception
+
+    def execute_item(self, context: DatabaseContext, item: dict) -> tuple:
+        item_context = context.fork()
+        item_context.update(item)
+        savepoint = context.session.begin_nested()
+        error = None
+
+        try:
+            self.item.check(item_context)
+            if self.item.execute(item_context):
+                # Flush, so a constraint violation is an error of this item
+                context.session.flush()
+                state = CommandState.SUCCESS
+            else:
+                state = CommandState.FAILURE
+        except Exception as err:
+            error = err
+            state = CommandState.ERROR
+        finally:
+            self.item.post_execute(item_context, state, error)
+
+        if state == CommandState.SUCCESS:
+            savepoint.commit()
+        else:
+            savepoint.rollback()
+
+        return state, error
+
+    @staticmethod
+    def begin(session) -> None:
+        """
+        Begins the transaction of the session, when needed.
+
+        pysqlite begins a transaction only before a DML statement: a savepoint without a transaction would
+        commit on release.
+        """
+        connection = session.connection().connection
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
@@ -1,7 +1,12 @@
 """
 Chain of Command
 """
+import collections.abc
+import concurrent.futures
 import enum
+import json
+import logging
+import time
 
 
 class CommandState(enum.Enum):
@@ -11,8 +16,127 @@ class CommandState(enum.Enum):
     SUCCESS = 3
 
 
-class Context(dict):
-    pass
+class Context(collections.abc.MutableMapping):
+    """
+    Context: The keys shared by the commands.
+
+    A subclass declares its fields in __slots__, these are stored in the slots and still accessed as keys.
+    Other keys are stored in a dict, and can also be accessed as attributes.
+    """
+    __slots__ = ("_items",)
+
+    # Declared fields, in declaration order
+    fields: dict = dict()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        fields = dict()
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get("__slots__", ()):
+                if not name.startswith("_"):
+                    fields[name] = klass.__annotations__.get(name) if "__annotations__" in klass.__dict__ else None
+        cls.fields = fields
+
+    def __new__(cls, *args, **kwargs):
+        context = super().__new__(cls)
+        object.__setattr__(context, "_items", dict())
+        return context
+
+    def __init__(self, *args, **kwargs):
+        self.update(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Only called when the attribute is not found: not a field, a method or a class attribute
+        if name in self.fields or name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            return self._items[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(type(self), name) or name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            self._items[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        if hasattr(type(self), name) or name.startswith("_"):
+            object.__delattr__(self, name)
+        else:
+            try:
+                del self._items[name]
+            except KeyError:
+                raise AttributeError(name) from None
+
+    def __getitem__(self, key: str):
+        if key in self.fields:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+
+        return self._items[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in self.fields:
+            setattr(self, key, value)
+        else:
+            self._items[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.fields:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            del self._items[key]
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.fields:
+            return hasattr(self, key)
+
+        return key in self._items
+
+    def __iter__(self):
+        for key in self.fields:
+            if hasattr(self, key):
+                yield key
+
+        yield from self._items
+
+    def __len__(self) -> int:
+        return sum(1 for key in self.fields if hasattr(self, key)) + len(self._items)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def get(self, key: str, default=None):
+        if key in self.fields:
+            return getattr(self, key, default)
+
+        return self._items.get(key, default)
+
+    def fork(self) -> "Context":
+        """
+        Returns a shallow copy, e.g. for a parallel branch.
+        """
+        context = type(self).__new__(type(self))
+        context._items.update(self._items)
+
+        for key in self.fields:
+            if hasattr(self, key):
+                setattr(context, key, getattr(self, key))
+
+        if hasattr(self, "__dict__"):
+            context.__dict__.update(self.__dict__)
+
+        return context
+
+    copy = fork
 
 
 class ChainException(Exception):
@@ -31,6 +155,14 @@ class Command(object):
     FAILURE = False
     SUCCESS = True
 
+    # Context keys read by execute() and written by execute()
+    requires: tuple = ()
+    provides: tuple = ()
+    # An exclusive command never runs concurrently with another exclusive command
+    exclusive: bool = True
+    # An ordered command runs after every command declared before it, and before every command declared after it
+    ordered: bool = False
+
     def execute(self, context: Context) -> bool:
         return Command.SUCCESS
 
@@ -38,11 +170,249 @@ class Command(object):
         pass
 
 
+_executor = None
+
+
+def executor() -> concurrent.futures.Executor:
+    """
+    Returns the thread pool shared by the parallel plans.
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="zenith")
+
+    return _executor
+
+
+def schedule(commands: list) -> list:
+    """
+    Groups the commands into stages from their declared context keys.
+
+    A command is scheduled after the last command providing a key it requires, after the commands requiring or
+    providing a key it provides and, when exclusive, after the previous exclusive command. An ordered command is
+    scheduled after every earlier command, and every later command after it. The commands within a stage are
+    independent of each other.
+
+    :param commands: the commands, in declared order
+    :return: list of stages, each a tuple of commands
+    """
+    levels = list()
+    providers = dict()
+    readers = dict()
+    last_exclusive = None
+    last_ordered = None
+
+    for index, command in enumerate(commands):
+        depends = set()
+
+        if command.ordered:
+            depends.update(range(index))
+        elif last_ordered is not None:
+            depends.add(last_ordered)
+
+        for key in command.requires:
+            if key in providers:
+                depends.add(providers[key])
+
+        for key in command.provides:
+            if key in providers:
+                depends.add(providers[key])
+            depends.update(readers.get(key, ()))
+
+        if command.exclusive and last_exclusive is not None:
+            depends.add(last_exclusive)
+
+        levels.append(max((levels[n] + 1 for n in depends), default=0))
+
+        for key in command.requires:
+            readers.setdefault(key, list()).append(index)
+
+        for key in command.provides:
+            providers[key] = index
+            readers[key] = list()
+
+        if command.exclusive:
+            last_exclusive = index
+        if command.ordered:
+            last_ordered = index
+
+    stages = [list() for n in range(max(levels, default=-1) + 1)]
+    for level, command in zip(levels, commands):
+        stages[level].append(command)
+
+    return [tuple(stage) for stage in stages]
+
+
+class Timing(object):
+    """
+    Timing: Wall and CPU time of a single execute() or post_execute() call.
+    """
+    __slots__ = ("index", "unwind", "start", "finish", "cpu")
+
+    def __init__(self, index: int, unwind: bool, start: float, finish: float, cpu: float):
+        self.index = index
+        self.unwind = unwind
+        self.start = start
+        self.finish = finish
+        self.cpu = cpu
+
+
+class Plan(object):
+    """
+    Plan: A compiled chain, flattened into bound execute and post_execute callables.
+    """
+    __slots__ = ("commands", "executes", "post_executes", "phases", "requires", "stages", "executor")
+
+    def __init__(self, commands: tuple, phases: tuple = None, stages: tuple = None,
+                 executor: concurrent.futures.Executor = None):
+        self.commands = tuple(commands)
+        self.executes = tuple(command.execute for command in self.commands)
+        self.post_executes = tuple(command.post_execute for command in reversed(self.commands))
+        self.phases = tuple(phases) if phases else (None,) * len(self.commands)
+        self.executor = executor
+
+        # Stages hold the indexes of their commands
+        if stages is None:
+            self.stages = None
+        else:
+            position = {id(command): index for index, command in enumerate(self.commands)}
+            self.stages = tuple(tuple(position[id(command)] for command in stage) for stage in stages)
+
+        # Keys required by a command and not provided by an earlier one
+        requires = list()
+        provided = set()
+        for command in self.commands:
+            for key in command.requires:
+                if key not in provided and key not in requires:
+                    requires.append(key)
+            provided.update(command.provides)
+        self.requires = tuple(requires)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def check(self, context: Context) -> None:
+        """
+        Checks the keys the plan needs from the context, before anything is executed.
+
+        :raises ContextKeyException: a required key is missing
+        """
+        for key in self.requires:
+            if key not in context:
+                raise ContextKeyException(key)
+
+    def execute(self, context: Context, timings: list = None) -> bool:
+        if self.stages is not None:
+            return self.execute_stages(context, timings)
+
+        if timings is not None:
+            for index, execute in enumerate(self.executes):
+                if not self.measure(timings, index, False, execute, context):
+                    return Command.FAILURE
+
+            return Command.SUCCESS
+
+        for execute in self.executes:
+            if not execute(context):
+                return Command.FAILURE
+
+        return Command.SUCCESS
+
+    def execute_stages(self, context: Context, timings: list = None) -> bool:
+        for stage in self.stages:
+            if timings is None:
+                calls = [(self.executes[index], context) for index in stage]
+            else:
+                calls = [(self.measure, timings, index, False, self.executes[index], context) for index in stage]
+
+            if len(calls) == 1:
+                if not calls[0][0](*calls[0][1:]):
+                    return Command.FAILURE
+            else:
+                futures = [self.executor.submit(*call) for call in calls]
+                concurrent.futures.wait(futures)
+
+                # result() raises the error of the first failing command
+                if not all([future.result() for future in futures]):
+                    return Command.FAILURE
+
+        return Command.SUCCESS
+
+    def post_execute(self, context: Context, state: CommandState, error: Exception = None,
+                     timings: list = None) -> None:
+        if timings is not None:
+            last = len(self.commands) - 1
+            for index, post_execute in enumerate(self.post_executes):
+                self.measure(timings, last - index, True, post_execute, context, state, error)
+            return
+
+        for post_execute in self.post_executes:
+            post_execute(context, state, error)
+
+    @staticmethod
+    def measure(timings: list, index: int, unwind: bool, function, *args):
+        start = time.perf_counter()
+        cpu = time.thread_time()
+
+        try:
+            return function(*args)
+        finally:
+            timings.append(Timing(index, unwind, start, time.perf_counter(), time.thread_time() - cpu))
+
+    def summarize(self, timings: list) -> dict:
+        """
+        Summarizes the timings of a run, per command and per phase.
+
+        :param timings: the timings recorded by execute() and post_execute()
+        :return: dict with the commands, phases and total, times in milliseconds
+        """
+        commands = list()
+        phases = dict()
+
+        for timing in sorted(timings, key=lambda item: item.start):
+            phase = "unwind" if timing.unwind else self.phases[timing.index] or "execute"
+            wall_ms = (timing.finish - timing.start) * 1000.0
+            cpu_ms = timing.cpu * 1000.0
+
+            commands.append({
+                "phase": phase,
+                "command": type(self.commands[timing.index]).__name__,
+                "wall_ms": round(wall_ms, 3),
+                "cpu_ms": round(cpu_ms, 3),
+            })
+
+            if phase in phases:
+                start, finish, cpu = phases[phase]
+                phases[phase] = (min(start, timing.start), max(finish, timing.finish), cpu + timing.cpu)
+            else:
+                phases[phase] = (timing.start, timing.finish, timing.cpu)
+
+        if timings:
+            start = min(timing.start for timing in timings)
+            finish = max(timing.finish for timing in timings)
+        else:
+            start = finish = 0.0
+
+        return {
+            "commands": commands,
+            "phases": {phase: {"wall_ms": round((finish - start) * 1000.0, 3), "cpu_ms": round(cpu * 1000.0, 3)}
+                       for phase, (start, finish, cpu) in phases.items()},
+            "total": {"wall_ms": round((finish - start) * 1000.0, 3),
+                      "cpu_ms": round(sum(timing.cpu for timing in timings) * 1000.0, 3)},
+        }
+
+
 class Chain(Command):
-    def __init__(self):
+    def __init__(self, name: str = None):
+        self.name = name
         self.commands = list()
+        self.frozen = False
 
     def append(self, command: Command) -> None:
+        if self.frozen:
+            raise ChainException("Chain is compiled")
+
         self.commands.append(command)
 
     def execute(self, context: Context) -> bool:
@@ -58,14 +428,63 @@ class Chain(Command):
         for command in self.commands[::-1]:
             command.post_execute(context, state, error)
 
+    def flatten(self) -> list:
+        """
+        Returns the commands of this chain, with nested chains expanded in place.
+
+        Only plain chains are expanded; a subclass which overrides execute() or post_execute() is kept as is.
+        """
+        commands = list()
+
+        for command in self.commands:
+            if isinstance(command, Chain) and type(command).execute is Chain.execute \
+                    and type(command).post_execute is Chain.post_execute:
+                commands.extend(command.flatten())
+            else:
+                commands.append(command)
+
+        return commands
+
+    def freeze(self) -> None:
+        self.frozen = True
+
+        for command in self.commands:
+            if isinstance(command, Chain):
+                command.freeze()
+
+    def compile(self) -> Plan:
+        """
+        Compiles the chain into a plan and freezes it, including the nested chains.
+
+        :return: the compiled plan
+        """
+        plan = Plan(self.flatten())
+        self.freeze()
+
+        return plan
+
 
 class Runner(Chain):
+    def __init__(self, timed: bool = False):
+        super().__init__()
+        self.plan = None
+        self.timed = timed
+
+    def compile(self) -> Plan:
+        if self.plan is None:
+            self.plan = super().compile()
+
+        return self.plan
+
     def execute(self, context: Context) -> bool:
+        plan = self.plan or self.compile()
+        timings = list() if self.timed else None
         exception = Exception("No exception")
         state = CommandState.UNKNOWN
 
         try:
-            if super().execute(context):
+            plan.check(context)
+            if plan.execute(context, timings):
                 state = CommandState.SUCCESS
             else:
                 state = CommandState.FAILURE
@@ -73,7 +492,12 @@ class Runner(Chain):
             exception = err
             state = CommandState.ERROR
         finally:
-            super().post_execute(context, state, exception)
+            plan.post_execute(context, state, exception, timings)
+
+            if timings is not None:
+                summary = plan.summarize(timings)
+                context["timings"] = summary
+                logging.getLogger(__name__).info(f"timings: {json.dumps(summary)}")
 
         if state == CommandState.ERROR:
             raise exception
@@ -87,15 +511,16 @@ class Runner(Chain):
 
 
 class Processor(Runner):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, parallel: bool = False, timed: bool = False):
+        super().__init__(timed)
+        self.parallel = parallel
 
-        self.reporting = Chain()
-        self.initialization = Chain()
-        self.authentication = Chain()
-        self.authorization = Chain()
-        self.validating = Chain()
-        self.processing = Chain()
+        self.reporting = Chain("reporting")
+        self.initialization = Chain("initialization")
+        self.authentication = Chain("authentication")
+        self.authorization = Chain("authorization")
+        self.validating = Chain("validating")
+        self.processing = Chain("processing")
 
         super().append(self.initialization)
         super().append(self.reporting)
@@ -104,5 +529,38 @@ class Processor(Runner):
         super().append(self.validating)
         super().append(self.processing)
 
+    def compile(self) -> Plan:
+        """
+        Compiles the processor, a parallel processor schedules the commands of each phase in stages.
+        """
+        if self.plan is None:
+            self.plan = self.compile_phases(self.commands)
+
+        return self.plan
+
+    def compile_phases(self, chains: list) -> Plan:
+        """
+        Compiles some phases of the processor into a plan, and freezes the processor.
+
+        :param chains: the phases, e.g. [processor.validating, processor.processing]
+        :return: the compiled plan
+        """
+        commands = list()
+        phases = list()
+        stages = list()
+        for phase in chains:
+            flat = phase.flatten()
+            commands.extend(flat)
+            phases.extend([phase.name] * len(flat))
+            if self.parallel:
+                stages.extend(schedule(flat))
+
+        self.freeze()
+
+        if self.parallel:
+            return Plan(commands, phases, stages, executor())
+        else:
+            return Plan(commands, phases)
+
     def append(self, command: Command) -> None:
         raise ChainException("Do not use!")
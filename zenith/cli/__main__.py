@@ -1,12 +1,34 @@
 import argparse
-import logging
-
-from zenith.cli.init import InitProcessor
-from zenith.cli.client import ClientProcessor
-from zenith.cli.task import TaskProcessor
-from zenith.cli.project import ProjectProcessor
-
-def main():
+import importlib
+
+# Processors per subcommand, imported when the subcommand is chosen
+PROCESSORS = {
+    "init": "zenith.cli.init.InitProcessor",
+    "serve": "zenith.cli.serve.ServeProcessor",
+    "client": "zenith.cli.client.ClientProcessor",
+    "project": "zenith.cli.project.ProjectProcessor",
+    "task": "zenith.cli.task.TaskProcessor",
+    "import": "zenith.cli.exchange.ExchangeProcessor",
+    "export": "zenith.cli.exchange.ExchangeProcessor",
+    "report": "zenith.cli.report.ReportProcessor",
+    "status": "zenith.cli.status.StatusProcessor",
+    "db": "zenith.cli.database.DatabaseProcessor",
+}
+
+
+def load(process: str) -> type:
+    """
+    Imports the processor of the subcommand.
+    """
+    module_name, class_name = PROCESSORS[process].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def main(argv: list = None, context = None):
+    """
+    :param argv: the arguments, default sys.argv[1:]
+    :param context: the base context of the commands, set by `zenith serve`
+    """
     parser = argparse.ArgumentParser(prog="zenith")
     parser.add_argument("-d", "--debug", dest="debug", default=False, action="store_true", help="Print debug information")
     parser.add_argument("-v", "--verbose", dest="verbose", default=False, action="store_true", help="Print verbose information")
@@ -16,6 +38,35 @@ def main():
     init = subparser.add_parser("init", help="Initialize Zenith")
     init.add_argument("dir", nargs="?", help="Directory, default current directory")
 
+    serve = subparser.add_parser("serve", help="Serves the commands of the .zenith directory")
+    serve.add_argument("dir", nargs="?", help="Directory, default current directory")
+    serve.add_argument("--stop", dest="stop", default=False, action="store_true", help="Stops serving")
+
+    import_ = subparser.add_parser("import", help="Imports clients, projects and tasks")
+    import_.add_argument("filename", help="CSV or JSONL file")
+    import_.add_argument("--format", choices=("csv", "jsonl"), help="Format, default by the extension of the file")
+    import_.add_argument("--chunk", type=int, help="Records per transaction, default 10000")
+    import_.add_argument("--restart", default=False, action="store_true", help="Ignores the progress of before")
+
+    export = subparser.add_parser("export", help="Exports clients, projects and tasks")
+    export.add_argument("filename", help="CSV or JSONL file, - for stdout")
+    export.add_argument("--format", choices=("csv", "jsonl"), help="Format, default by the extension of the file")
+    export.add_argument("--chunk", type=int, help="Rows fetched per batch, default 10000")
+
+    report = subparser.add_parser("report", help="Reports the durations per client, project or task")
+    report.add_argument("--from", dest="date_from", help="First day, YYYY-MM-DD, default first day of the month")
+    report.add_argument("--to", dest="date_to", help="Last day, YYYY-MM-DD, default today")
+    report.add_argument("--by", choices=("client", "project", "task"), default="project", help="Group by, default project")
+    report.add_argument("--period", choices=("day", "week", "month"), default="day", help="Period, default day")
+    report.add_argument("--format", choices=("text", "csv", "json"), default="text", help="Output, default text")
+
+    status = subparser.add_parser("status", help="Prints the active client, project and task")
+    status.add_argument("--prompt", default=False, action="store_true", help="One line, for a shell prompt")
+
+    db = subparser.add_parser("db", help="Database commands")
+    db_subparser = db.add_subparsers(dest="command")
+    db_rebuild_rollups = db_subparser.add_parser("rebuild-rollups", help="Recomputes the daily totals of the report")
+
     client = subparser.add_parser("client", help="Client commands")
     client_subparser = client.add_subparsers(dest="command")
     client_activate = client_subparser.add_parser("activate", help="Activates a client")
@@ -43,6 +94,8 @@ def main():
     project_delete = project_subparser.add_parser("delete", help="Deletes a project")
     project_delete.add_argument("name", help="Name of the project")
     project_list = project_subparser.add_parser("list", help="Lists all projects")
+    project_list.add_argument("--limit", type=int, help="Maximum number of projects")
+    project_list.add_argument("--after", help="Lists the projects after this name")
 
     task = subparser.add_parser("task", help="Task commands")
     task_subparser = task.add_subparsers(dest="command")
@@ -58,8 +111,18 @@ def main():
     task_delete = task_subparser.add_parser("delete", help="Deletes the task")
     task_delete.add_argument("id", type=int, help="ID of the task")
     task_list = task_subparser.add_parser("list", help="Lists all tasks")
+    task_list.add_argument("--limit", type=int, help="Maximum number of tasks")
+    task_list.add_argument("--after", type=int, help="Lists the tasks after this ID")
+    task_list.add_argument("--state", choices=("NEW", "STARTED", "STOPPED"), help="Lists the tasks in this state")
+    task_list.add_argument("--between", nargs=2, metavar=("FROM", "TO"),
+                           help="Lists the tasks worked on between FROM and TO, ISO dates or datetimes")
+    task_conflicts = task_subparser.add_parser("conflicts", help="Lists the overlapping periods of different tasks")
+    task_conflicts.add_argument("--between", nargs=2, metavar=("FROM", "TO"),
+                                help="Only the periods between FROM and TO, ISO dates or datetimes")
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    import logging
 
     if args.debug:
         level = logging.DEBUG
@@ -69,10 +132,36 @@ def main():
         level = logging.ERROR
 
     if "init" == args.process:
-        processor = InitProcessor(level)
+        processor = load("init")(level)
         processor.init(args.dir)
+    elif "serve" == args.process:
+        processor = load("serve")(level)
+
+        if args.stop:
+            processor.stop(args.dir)
+        else:
+            processor.serve(args.dir)
+    elif "import" == args.process:
+        processor = load("import")(level, context)
+        processor.import_file(args.filename, args.format, args.chunk, args.restart)
+    elif "export" == args.process:
+        processor = load("export")(level, context)
+        processor.export_file(args.filename, args.format, args.chunk)
+    elif "report" == args.process:
+        processor = load("report")(level, context)
+        processor.totals(args.date_from, args.date_to, args.by, args.period, args.format)
+    elif "status" == args.process:
+        processor = load("status")(level, context)
+        processor.status(args.prompt)
+    elif "db" == args.process:
+        processor = load("db")(level, context)
+
+        if args.command == "rebuild-rollups":
+            processor.rebuild_rollups()
+        else:
+            db.print_help()
     elif "client" == args.process:
-        processor = ClientProcessor(level)
+        processor = load("client")(level, context)
 
         if args.command == "activate":
             processor.activate(args.name)
@@ -89,7 +178,7 @@ def main():
         else:
             client.print_help()
     elif "project" == args.process:
-        processor = ProjectProcessor(level)
+        processor = load("project")(level, context)
 
         if args.command == "activate":
             processor.activate(args.name)
@@ -102,11 +191,11 @@ def main():
         elif args.command == "delete":
             processor.delete(args.name)
         elif args.command == "list":
-            processor.list()
+            processor.list(args.limit, args.after)
         else:
             project.print_help()
     elif "task" == args.process:
-        processor = TaskProcessor(level)
+        processor = load("task")(level, context)
 
         if args.command == "new":
             processor.new()
@@ -121,7 +210,9 @@ def main():
         elif args.command == "delete":
             processor.delete(args.id)
         elif args.command == "list":
-            processor.list()
+            processor.list(args.limit, args.after, args.state, args.between)
+        elif args.command == "conflicts":
+            processor.conflicts(args.between)
         else:
             task.print_help()
 
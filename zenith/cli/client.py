@@ -6,21 +6,21 @@ from zenith.factory.client import ClientFactory
 
 class ClientProcessor(DefaultProcessor):
     def activate(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["client_name"] = name
 
         runner = ClientFactory.create_activate(self.log_level)
         runner.execute(context)
 
     def create(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["client_name"] = name
 
         runner = ClientFactory.create_create(self.log_level)
         runner.execute(context)
 
     def read(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["client_name"] = name
 
         runner = ClientFactory.create_read(self.log_level)
@@ -29,7 +29,7 @@ class ClientProcessor(DefaultProcessor):
         self.display(context)
 
     def update(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["client_name"] = name
 
         runner = ClientFactory.create_read(self.log_level)
@@ -42,20 +42,20 @@ class ClientProcessor(DefaultProcessor):
         runner = ClientFactory.create_update(self.log_level)
         runner.execute(context)
 
-        runner = ClientFactory.create_client_read(self.log_level)
+        runner = ClientFactory.create_read(self.log_level)
         runner.execute(context)
 
         self.display(context)
 
     def delete(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["client_name"] = name
 
         runner = ClientFactory.create_delete(self.log_level)
         runner.execute(context)
 
     def list(self) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
 
         runner = ClientFactory.create_list(self.log_level)
         runner.execute(context)
@@ -0,0 +1,10 @@
+from zenith.cli.default import DefaultProcessor
+from zenith.factory.database import DatabaseFactory
+
+
+class DatabaseProcessor(DefaultProcessor):
+    def rebuild_rollups(self) -> None:
+        context = self.create_context()
+
+        runner = DatabaseFactory.create_rebuild_rollups(self.log_level)
+        runner.execute(context)
@@ -1,15 +1,25 @@
 import logging
 import readline
 
+from zenith.command.database import DatabaseContext
 from zenith.factory.default import DefaultFactory
 
 
 class DefaultProcessor(object):
-    def __init__(self, level = logging.ERROR):
+    def __init__(self, level = logging.ERROR, context: DatabaseContext = None):
         self.log_level = level
+        self.base_context = context
 
         # Setup GNU Readline support
 
+    def create_context(self) -> DatabaseContext:
+        """
+        Creates the context of a command, forked from the base context of a long running process.
+        """
+        if self.base_context is None:
+            return DatabaseContext()
+
+        return self.base_context.fork()
 
     def input(self, prompt: str, value: str = "") -> str:
         readline.set_startup_hook(lambda: readline.insert_text(value))
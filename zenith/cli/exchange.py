@@ -0,0 +1,26 @@
+from zenith.cli.default import DefaultProcessor
+from zenith.factory.exchange import ExchangeFactory
+
+
+class ExchangeProcessor(DefaultProcessor):
+    def import_file(self, filename: str, file_format: str = None, chunk: int = None, restart: bool = False) -> None:
+        context = self.create_context()
+        context["import_filename"] = filename
+        context["import_format"] = file_format
+        context["import_chunk"] = chunk
+        context["import_restart"] = restart
+        # No syncs: an interrupted import resumes after its last commit
+        context["db_profile"] = "bulk-load"
+
+        runner = ExchangeFactory.create_import(self.log_level)
+        if runner.execute(context):
+            print(f"Imported: {context['imported']} records")
+
+    def export_file(self, filename: str, file_format: str = None, chunk: int = None) -> None:
+        context = self.create_context()
+        context["export_filename"] = filename
+        context["export_format"] = file_format
+        context["export_chunk"] = chunk
+
+        runner = ExchangeFactory.create_export(self.log_level)
+        runner.execute(context)
@@ -2,7 +2,6 @@ import os
 import pathlib
 
 from zenith.cli.default import DefaultProcessor
-from zenith.command.database import DatabaseContext
 from zenith.factory.init import InitFactory
 
 
@@ -15,7 +14,7 @@ class InitProcessor(DefaultProcessor):
         else:
             zenith_dir = os.path.join(pathlib.Path(direcory).absolute(), ".zenith")
 
-        context = DatabaseContext()
+        context = self.create_context()
         context["zenith_dir"] = zenith_dir
         context["logfile"] = False
 
@@ -5,21 +5,21 @@ from zenith.factory.project import ProjectFactory
 
 class ProjectProcessor(DefaultProcessor):
     def activate(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["project_name"] = name
 
         runner = ProjectFactory.create_activate(self.log_level)
         runner.execute(context)
 
     def create(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["project_name"] = name
 
         runner = ProjectFactory.create_create(self.log_level)
         runner.execute(context)
 
     def read(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["project_name"] = name
 
         runner = ProjectFactory.create_read(self.log_level)
@@ -28,7 +28,7 @@ class ProjectProcessor(DefaultProcessor):
         self.display(context)
 
     def update(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["project_name"] = name
 
         runner = ProjectFactory.create_read(self.log_level)
@@ -47,14 +47,16 @@ class ProjectProcessor(DefaultProcessor):
         self.display(context)
 
     def delete(self, name: str) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["project_name"] = name
 
         runner = ProjectFactory.create_delete(self.log_level)
         runner.execute(context)
 
-    def list(self) -> None:
-        context = DatabaseContext()
+    def list(self, limit: int = None, after: str = None) -> None:
+        context = self.create_context()
+        context["project_limit"] = limit
+        context["project_after"] = after
 
         runner = ProjectFactory.create_list(self.log_level)
         runner.execute(context)
@@ -75,10 +77,10 @@ Description: {project.project_description or ''}
 
 {project.project_remark or ''}""")
         elif "projects" in context:
-            projects = context["projects"]
-            if len(projects):
-                print(f"Client: {projects[0].client.client_name}")
-            for project in projects:
+            # Streamed: every project is printed when it is fetched
+            for n, project in enumerate(context["projects"]):
+                if n == 0:
+                    print(f"Client: {project.client.client_name}")
                 if project.project_active:
                     msg = f"+ {project.project_id} + {project.project_name} + {project.project_uuid}"
                 else:
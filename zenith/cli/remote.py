@@ -0,0 +1,76 @@
+"""
+Thin client of `zenith serve`: forwards a command line over the Unix domain socket.
+
+Only the standard library is imported, so forwarding does not pay the start up of SQLAlchemy.
+"""
+import json
+import os
+import socket
+import sys
+
+from zenith.paths import find_zenith_dir, socket_filename
+
+# Commands which are never forwarded: they are interactive, manage the daemon itself or use local files
+LOCAL_PROCESSES = ("init", "serve", "import", "export")
+LOCAL_COMMANDS = ("update",)
+
+
+def forwardable(argv: list) -> bool:
+    words = [arg for arg in argv if not arg.startswith("-")]
+
+    if not words or words[0] in LOCAL_PROCESSES:
+        return False
+
+    return not (len(words) > 1 and words[1] in LOCAL_COMMANDS)
+
+
+def request(filename: str, message: dict) -> dict:
+    """
+    Sends a request to the daemon and returns its response.
+
+    :raises OSError: the daemon is not running
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(filename)
+        connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        connection.shutdown(socket.SHUT_WR)
+
+        chunks = list()
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def forward(argv: list, directory: str = None):
+    """
+    Forwards the command line to the daemon of the .zenith directory, when it is running.
+
+    :param argv: the arguments, without the program name
+    :param directory: the current directory, default os.getcwd()
+    :return: the exit status, or None when the command must run in-process
+    """
+    if os.environ.get("ZENITH_NO_SERVE") or not forwardable(argv):
+        return None
+
+    zenith_dir = find_zenith_dir(directory or os.getcwd())
+    if zenith_dir is None:
+        return None
+
+    filename = socket_filename(zenith_dir)
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        response = request(filename, {"argv": argv, "tty": sys.stdout.isatty()})
+    except (OSError, ValueError):
+        # Not running or gone: fall back to in-process execution
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    return response["status"]
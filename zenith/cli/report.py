@@ -0,0 +1,59 @@
+import csv
+import datetime
+import json
+import sys
+
+from zenith.cli.default import DefaultProcessor
+from zenith.command.database import DatabaseContext
+from zenith.factory.report import ReportFactory
+
+
+class ReportProcessor(DefaultProcessor):
+    def totals(self, date_from: str = None, date_to: str = None, by: str = None, period: str = None,
+               output: str = None) -> None:
+        today = datetime.date.today()
+
+        context = self.create_context()
+        context["report_from"] = datetime.date.fromisoformat(date_from) if date_from else today.replace(day=1)
+        context["report_to"] = datetime.date.fromisoformat(date_to) if date_to else today
+        context["report_by"] = by
+        context["report_period"] = period
+
+        runner = ReportFactory.create_totals(self.log_level)
+        if runner.execute(context):
+            self.display(context, output)
+
+    def display(self, context: DatabaseContext, output: str = None) -> None:
+        rows = context["report_rows"]
+
+        if output == "json":
+            print(json.dumps(rows, indent=2))
+        elif output == "csv":
+            if rows:
+                writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            self.table(rows)
+
+    @staticmethod
+    def table(rows: list) -> None:
+        if not rows:
+            return
+
+        names = list(rows[0])
+        lines = [[name.replace("_", " ").capitalize() for name in names]]
+        for row in rows:
+            line = ["" if row[name] is None else str(row[name]) for name in names[:-1]]
+            hours, seconds = divmod(row["duration"], 3600)
+            line.append(f"{hours}:{seconds // 60:02d}:{seconds % 60:02d}")
+            lines.append(line)
+
+        total = sum(row["duration"] for row in rows)
+        hours, seconds = divmod(total, 3600)
+        lines.append(["Total"] + [""] * (len(names) - 2) + [f"{hours}:{seconds // 60:02d}:{seconds % 60:02d}"])
+
+        widths = [max(len(line[n]) for line in lines) for n in range(len(names))]
+        for line in lines:
+            print("  ".join(value.rjust(width) if n == len(names) - 1 else value.ljust(width)
+                            for n, (value, width) in enumerate(zip(line, widths))).rstrip())
@@ -0,0 +1,175 @@
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import traceback
+
+from zenith.chain import Runner
+from zenith.cli.default import DefaultProcessor
+from zenith.cli.remote import request
+from zenith.command.common import LoggingCommand, ZenithCommand, ZenithDirectoryCommand
+from zenith.command.database import DatabaseContext, DatabaseSetupCommand, dispose
+from zenith.paths import find_zenith_dir, socket_filename
+
+
+class ServeHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # A probe of ServeProcessor.running()
+            return
+
+        message = json.loads(line.decode("utf-8"))
+
+        if message.get("stop"):
+            self.server.stopped = True
+            response = {"status": 0, "stdout": "", "stderr": ""}
+        else:
+            response = self.server.processor.run(message["argv"], message.get("tty", False))
+
+        self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class ServeProcessor(DefaultProcessor):
+    """
+    ServeProcessor: Keeps the engine, logging and processors of a .zenith directory warm,
+    and runs the command lines forwarded over its Unix domain socket.
+    """
+
+    def serve(self, directory: str = None) -> None:
+        logger = logging.getLogger(__name__)
+
+        zenith_dir = find_zenith_dir(os.path.abspath(directory or os.getcwd()))
+        if zenith_dir is None:
+            print("No .zenith directory found")
+            return
+
+        filename = socket_filename(zenith_dir)
+        if self.running(filename):
+            print(f"Already serving: {filename}")
+            return
+
+        self.base_context = self.setup(zenith_dir)
+
+        # The socket is created private: no other user can connect before a chmod
+        umask = os.umask(0o177)
+        try:
+            server = socketserver.UnixStreamServer(filename, ServeHandler)
+        finally:
+            os.umask(umask)
+        server.processor = self
+        server.stopped = False
+
+        if threading.current_thread() is threading.main_thread():
+            # SIGTERM stops the loop through the finally clause
+            signal.signal(signal.SIGTERM, self.terminate)
+
+        logger.info(f"Serving: {filename}")
+        try:
+            while not server.stopped:
+                server.handle_request()
+        finally:
+            server.server_close()
+            os.remove(filename)
+            dispose()
+            logger.info(f"Stopped: {filename}")
+
+    def stop(self, directory: str = None) -> None:
+        zenith_dir = find_zenith_dir(os.path.abspath(directory or os.getcwd()))
+        if zenith_dir is None or not self.running(socket_filename(zenith_dir)):
+            print("Not serving")
+            return
+
+        request(socket_filename(zenith_dir), {"stop": True})
+
+    def setup(self, zenith_dir: str) -> DatabaseContext:
+        """
+        Runs the initialization shared by all requests, and returns the base context of the requests.
+        """
+        runner = Runner()
+        runner.append(ZenithCommand())
+        runner.append(ZenithDirectoryCommand())
+        runner.append(LoggingCommand(self.log_level))
+        runner.append(DatabaseSetupCommand())
+
+        context = DatabaseContext()
+        context["zenith_dir"] = zenith_dir
+        runner.execute(context)
+
+        return context
+
+    def run(self, argv: list, tty: bool = False) -> dict:
+        """
+        Runs a command line, with its output captured.
+
+        Logging is set up once by the daemon, the messages for the user are written to the stderr of the
+        response, at the level of the command line.
+
+        :param tty: the output of the client is a terminal
+        :return: the response, with the exit status, stdout and stderr
+        """
+        from zenith.cli.__main__ import main
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = 0
+
+        console = LoggingCommand.console(stderr, self.request_level(argv), tty)
+        root = logging.getLogger()
+        root.addHandler(console)
+
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                main(argv, self.base_context)
+            except SystemExit as err:
+                if isinstance(err.code, int):
+                    status = err.code
+                else:
+                    status = 0 if err.code is None else 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+            finally:
+                root.removeHandler(console)
+
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    @staticmethod
+    def request_level(argv: list) -> int:
+        """
+        Returns the log level of the options before the subcommand, as main() sets it.
+        """
+        options = list(itertools.takewhile(lambda arg: arg.startswith("-"), argv))
+
+        if "-d" in options or "--debug" in options:
+            return logging.DEBUG
+        if "-v" in options or "--verbose" in options:
+            return logging.INFO
+
+        return logging.ERROR
+
+    @staticmethod
+    def terminate(signum, frame) -> None:
+        raise SystemExit(0)
+
+    @staticmethod
+    def running(filename: str) -> bool:
+        """
+        Checks whether a daemon listens on the socket, a stale socket file is removed.
+        """
+        if not os.path.exists(filename):
+            return False
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            try:
+                connection.connect(filename)
+                return True
+            except OSError:
+                os.remove(filename)
+                return False
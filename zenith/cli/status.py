@@ -0,0 +1,18 @@
+from zenith import snapshot
+from zenith.cli.default import DefaultProcessor
+from zenith.factory.status import StatusFactory
+from zenith.paths import snapshot_filename
+
+
+class StatusProcessor(DefaultProcessor):
+    def status(self, prompt: bool = False) -> None:
+        """
+        Prints the status from the database, the snapshot was stale or missing.
+        """
+        context = self.create_context()
+
+        runner = StatusFactory.create_status(self.log_level)
+        if runner.execute(context):
+            current = snapshot.read(snapshot_filename(context["zenith_dir"]))
+            if current is not None:
+                print(snapshot.prompt(current) if prompt else snapshot.display(current))
@@ -1,3 +1,5 @@
+import datetime
+
 from zenith.command.database import DatabaseContext
 from zenith.cli.default import DefaultProcessor
 from zenith.factory.task import TaskFactory
@@ -5,15 +7,16 @@ from zenith.factory.task import TaskFactory
 
 class TaskProcessor(DefaultProcessor):
     def new(self) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
 
         runner = TaskFactory.create_new(self.log_level)
         runner.execute(context)
 
-        self.display(context)
+        if "task_id" in context:
+            print(f"ID:          {context['task_id']}")
 
     def start(self, id: int) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["task_id"] = id
 
         runner = TaskFactory.create_start(self.log_level)
@@ -22,7 +25,7 @@ class TaskProcessor(DefaultProcessor):
         self.display(context)
 
     def stop(self, id: int) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["task_id"] = id
 
         runner = TaskFactory.create_stop(self.log_level)
@@ -31,7 +34,7 @@ class TaskProcessor(DefaultProcessor):
         self.display(context)
 
     def read(self, id: int) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["task_id"] = id
 
         runner = TaskFactory.create_read(self.log_level)
@@ -40,7 +43,7 @@ class TaskProcessor(DefaultProcessor):
         self.display(context)
 
     def update(self, id: int) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["task_id"] = id
 
         runner = TaskFactory.create_read(self.log_level)
@@ -60,20 +63,51 @@ class TaskProcessor(DefaultProcessor):
         self.display(context)
 
     def delete(self, id: int) -> None:
-        context = DatabaseContext()
+        context = self.create_context()
         context["task_id"] = id
 
         runner = TaskFactory.create_delete(self.log_level)
         runner.execute(context)
 
-    def list(self) -> None:
-        context = DatabaseContext()
+    def list(self, limit: int = None, after: int = None, state: str = None, between: list = None) -> None:
+        context = self.create_context()
+        context["task_limit"] = limit
+        context["task_after"] = after
+        context["task_state"] = state
+        context["task_between"] = self.between(between)
 
         runner = TaskFactory.create_list(self.log_level)
         runner.execute(context)
 
         self.display(context)
 
+    def conflicts(self, between: list = None) -> None:
+        context = self.create_context()
+        context["task_between"] = self.between(between)
+
+        runner = TaskFactory.create_conflicts(self.log_level)
+        if runner.execute(context):
+            for task_id, start, finish, other_id, other_start, other_finish in context["conflicts"]:
+                print(f"{task_id} {start:%Y-%m-%d %H:%M:%S} - {self.time(finish)} overlaps "
+                      f"{other_id} {other_start:%Y-%m-%d %H:%M:%S} - {self.time(other_finish)}")
+
+    @staticmethod
+    def between(values: list = None):
+        """
+        Returns (start, finish) of two ISO dates or datetimes, a date finish is included.
+        """
+        if not values:
+            return None
+
+        start, finish = (datetime.datetime.fromisoformat(value) for value in values)
+        if len(values[1]) == 10:
+            finish = finish + datetime.timedelta(days=1)
+        return start, finish
+
+    @staticmethod
+    def time(value) -> str:
+        return f"{value:%Y-%m-%d %H:%M:%S}" if value else "-"
+
     def display(self, context: DatabaseContext) -> None:
         if "task" in context:
             task = context["task"]
@@ -103,11 +137,11 @@ Description: {task.task_description or ''}
 
 {task.task_remark or ''}""")
         elif "tasks" in context:
-            tasks = context["tasks"]
-            if len(tasks):
-                print(f"Client: {tasks[0].project.client.client_name}")
-                print(f"Project: {tasks[0].project.project_name}")
-            for task in tasks:
+            # Streamed: every task is printed when it is fetched
+            for n, task in enumerate(context["tasks"]):
+                if n == 0:
+                    print(f"Client: {task.project.client.client_name}")
+                    print(f"Project: {task.project.project_name}")
                 if task.task_active:
                     msg = f"+ {task.task_id} + {task.task_name} + {task.task_uuid} + {task.task_state}"
                 else:
@@ -0,0 +1,67 @@
+import logging
+
+from sqlalchemy import and_, true
+
+from zenith.chain import Command
+from zenith.command.database import DatabaseContext
+from zenith.models import Client, Project, Task
+
+
+class ActiveCommand(Command):
+    """
+    ActiveCommand: Resolves the active client, project and task in one joined query.
+
+    The project and task of a client are loaded in the same statement, so project.client and task.project are
+    found in the identity map of the session without another query.
+    """
+
+    requires = ("session",)
+
+    def __init__(self, project: bool = True, task: bool = False):
+        super().__init__()
+        self.project = project or task
+        self.task = task
+
+        provides = ["client"]
+        if self.project:
+            provides.append("project")
+        if self.task:
+            provides.append("task")
+        self.provides = tuple(provides)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("active.execute() - Start")
+
+        query = context.session.query(Client)
+
+        if self.project:
+            query = query.outerjoin(Project, and_(Project.client_id == Client.client_id,
+                                                  Project.project_active == true())).add_entity(Project)
+        if self.task:
+            query = query.outerjoin(Task, and_(Task.project_id == Project.project_id,
+                                               Task.task_active == true())).add_entity(Task)
+
+        row = query.filter(Client.client_active == true()).first()
+        if row is not None and not self.project:
+            row = (row,)
+
+        if row is None:
+            logger.warning("No active client found")
+            return Command.FAILURE
+        context["client"] = row[0]
+
+        if self.project:
+            if row[1] is None:
+                logger.warning("No active project found")
+                return Command.FAILURE
+            context["project"] = row[1]
+
+        if self.task:
+            if row[2] is None:
+                logger.warning("No active task found")
+                return Command.FAILURE
+            context["task"] = row[2]
+
+        logger.debug("active.execute() - Finish")
+        return Command.SUCCESS
@@ -1,27 +1,35 @@
 import logging
 
-from sqlalchemy import true
+from sqlalchemy import delete, exists, select, true, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import defer
 
-from zenith.chain import Command, ContextKeyException
+from zenith.chain import Command
 from zenith.command.database import DatabaseContext
-from zenith.models import Client
+from zenith.models import Client, Project
+
+# Core statements on the table: no identity map, no synchronization of loaded objects
+clients = Client.__table__
 
 
 class ClientActivateCommand(Command):
+    requires = ("session", "client_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("activate.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         client_name = context["client_name"]
 
-        for client in context.session.query(Client).filter(Client.client_active == true()).all():
-            client.client_active = False
+        # Through the partial indexes: the cost does not depend on the number of clients
+        context.session.execute(update(Client).where(Client.client_active == true(),
+                                                     Client.client_name != client_name).values(client_active=False))
+        result = context.session.execute(update(Client).where(Client.client_name == client_name)
+                                         .values(client_active=True))
 
-        client = context.session.query(Client).filter(Client.client_name == client_name).one()
-        client.client_active = True
+        if result.rowcount == 0:
+            logger.warning(f"Client[client_name = {client_name}] - does not exist")
+            return Command.FAILURE
 
         logger.info(f"Client[client_name = {client_name}] - activated")
         logger.debug("activate.execute() - Finish")
@@ -29,13 +37,16 @@ class ClientActivateCommand(Command):
 
 
 class ClientActiveCommand(Command):
+    requires = ("session",)
+    provides = ("client",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("active.execute() - Start")
 
         client = context.session.query(Client).filter(Client.client_active == true()).first()
 
-        if client.client_active:
+        if client:
             context["client"] = client
             found = True
         else:
@@ -47,17 +58,22 @@ class ClientActiveCommand(Command):
 
 
 class ClientCreateCommand(Command):
+    requires = ("session", "client_name")
+    provides = ("client_id",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("create.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         client_name = context["client_name"]
 
-        client = Client(client_name=client_name)
-        context.session.add(client)
+        result = context.session.execute(insert(clients).values(client_name=client_name).on_conflict_do_nothing())
+
+        if result.rowcount == 0:
+            logger.warning(f"Client[client_name = {client_name}] - does exist")
+            return Command.FAILURE
+
+        context["client_id"] = result.inserted_primary_key[0]
 
         logger.info(f"Client[client_name = {client_name}] - created")
         logger.debug("create.execute() - Finish")
@@ -65,13 +81,13 @@ class ClientCreateCommand(Command):
 
 
 class ClientReadCommand(Command):
+    requires = ("session", "client_name")
+    provides = ("client",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("read.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         client_name = context["client_name"]
 
         client = context.session.query(Client).filter(Client.client_name == client_name).one()
@@ -83,51 +99,48 @@ class ClientReadCommand(Command):
 
 
 class ClientUpdateCommand(Command):
+    requires = ("session", "client_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("update.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
-        updated = False
         client_name = context["client_name"]
+        values = {key: context[key] for key in ("client_active", "client_description", "client_remark")
+                  if key in context}
 
-        client = context.session.query(Client).filter(Client.client_name == client_name).one()
-
-        if "client_active" in context:
-            client.client_active = context["client_active"]
-            updated = True
-
-        if "client_description" in context:
-            client.client_description = context["client_description"]
-            updated = True
+        if not values:
+            logger.warning(f"Client[client_name = {client_name}] - not updated")
+            return Command.FAILURE
 
-        if "client_remark" in context:
-            client.client_remark = context["client_remark"]
-            updated = True
+        result = context.session.execute(update(clients).where(clients.c.client_name == client_name).values(values))
 
-        if updated:
-            logger.info(f"Client[client_name = {client_name}] - updated")
-        else:
-            logger.warning(f"Client[client_name = {client_name}] - not updated")
+        if result.rowcount == 0:
+            logger.warning(f"Client[client_name = {client_name}] - does not exist")
+            return Command.FAILURE
 
+        logger.info(f"Client[client_name = {client_name}] - updated")
         logger.debug("update.execute() - Finish")
-        return updated
+        return Command.SUCCESS
 
 
 class ClientDeleteCommand(Command):
+    requires = ("session", "client_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("delete.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         client_name = context["client_name"]
 
-        client = context.session.query(Client).filter(Client.client_name == client_name).one()
-        context.session.delete(client)
+        # A client with projects is kept
+        result = context.session.execute(delete(clients).where(
+            clients.c.client_name == client_name,
+            ~exists(select(Project.project_id).where(Project.client_id == clients.c.client_id))))
+
+        if result.rowcount == 0:
+            logger.warning(f"Client[client_name = {client_name}] - does not exist or has projects")
+            return Command.FAILURE
 
         logger.info(f"Client[client_name = {client_name}] - deleted")
         logger.debug("delete.execute() - Finish")
@@ -135,11 +148,22 @@ class ClientDeleteCommand(Command):
 
 
 class ClientListCommand(Command):
+    requires = ("session",)
+    provides = ("clients",)
+
+    # Loader options of the query: the large columns are not displayed
+    options = (defer(Client.client_description), defer(Client.client_remark))
+
+    def __init__(self, options: tuple = None):
+        super().__init__()
+        if options is not None:
+            self.options = options
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("list.execute() - Start")
 
-        clients = context.session.query(Client).order_by(Client.client_name).all()
+        clients = context.session.query(Client).options(*self.options).order_by(Client.client_name).all()
         context["clients"] = clients
 
         logger.debug("list.execute() - Finish")
@@ -147,13 +171,12 @@ class ClientListCommand(Command):
 
 
 class ClientExistCommand(Command):
+    requires = ("session", "client_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("exist.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         exists = True
         client_name = context["client_name"]
 
@@ -166,13 +189,12 @@ class ClientExistCommand(Command):
 
 
 class ClientNotExistCommand(Command):
+    requires = ("session", "client_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("not_exist.execute() - Start")
 
-        if "client_name" not in context:
-            raise ContextKeyException("client_name")
-
         not_exist = True
         client_name = context["client_name"]
 
@@ -1,13 +1,16 @@
 import datetime
+import functools
 import getpass
 import logging
 import logging.handlers
 import os
-import pathlib
 import readline
 import sys
+import threading
+import time
 
-from zenith.chain import Command, CommandState, Context, ContextKeyException
+from zenith.chain import Command, CommandState, Context
+from zenith.paths import db_filename, find_zenith_dir, tmp_dir
 
 
 class ZenithCommand(Command):
@@ -15,31 +18,22 @@ class ZenithCommand(Command):
     InitializeCommand: Sets defaults in the context.
     """
 
+    provides = ("zenith_dir", "db_dir", "db_filename", "etc_dir", "log_dir", "tmp_dir")
+    exclusive = False
+
     def execute(self, context: Context) -> bool:
         if "zenith_dir" not in context:
-            current_dir = os.getcwd()
-            zenith_dir = None
-
-            while zenith_dir is None:
-                tmp = os.path.join(current_dir, '.zenith')
-
-                if os.path.isdir(tmp):
-                    zenith_dir = tmp
-                else:
-                    if current_dir == pathlib.Path(current_dir).parent:
-                        break
-                    else:
-                        current_dir = pathlib.Path(current_dir).parent
+            zenith_dir = find_zenith_dir(os.getcwd())
 
             if zenith_dir:
                 context["zenith_dir"] = zenith_dir
 
         zenith_dir = context["zenith_dir"]
         context["db_dir"] = os.path.join(zenith_dir, "var", "db")
-        context["db_filename"] = os.path.join(zenith_dir, "var", "db", "zenith.db")
+        context["db_filename"] = db_filename(zenith_dir)
         context["etc_dir"] = os.path.join(zenith_dir, "var", "etc")
         context["log_dir"] = os.path.join(zenith_dir, "var", "log")
-        context["tmp_dir"] = os.path.join(zenith_dir, "var", "tmp")
+        context["tmp_dir"] = tmp_dir(zenith_dir)
 
         return Command.SUCCESS
 
@@ -49,19 +43,11 @@ class ZenithDirectoryCommand(Command):
     ProcessingCommand: Creates Zenith directories.
     """
 
-    def execute(self, context: Context) -> bool:
-        if "zenith_dir" not in context:
-            raise ContextKeyException("zenith_dir")
-
-        if "db_dir" not in context:
-            raise ContextKeyException("db_dir")
-
-        if "log_dir" not in context:
-            raise ContextKeyException("log_dir")
-
-        if "tmp_dir" not in context:
-            raise ContextKeyException("tmp_dir")
+    requires = ("zenith_dir", "db_dir", "log_dir", "tmp_dir")
+    provides = ("db_dir", "log_dir", "tmp_dir")
+    exclusive = False
 
+    def execute(self, context: Context) -> bool:
         if not os.path.isdir(context["db_dir"]):
             os.makedirs(context["db_dir"])
         if not os.path.isdir(context["log_dir"]):
@@ -77,51 +63,68 @@ class LoggingCommand(Command):
     InitializingCommand: Initializes logging.
     """
 
+    requires = ("log_dir",)
+    exclusive = False
+    # The commands after it log to the log file
+    ordered = True
+
+    # Handlers installed on the root logger, per log directory, application and log file: a process sets up
+    # logging once, the level of a later run does not add handlers
+    installed = set()
+    lock = threading.Lock()
+
     def __init__(self, level = logging.ERROR):
         super().__init__()
         self.level = level
-        self.log_dir = ""
-        self.app_name = ""
 
-    def daily_log_filename(self):
+    @staticmethod
+    def daily_log_filename(log_dir: str, app_name: str, default_name: str = None) -> str:
         now = datetime.datetime.now()
-        name = f"{self.app_name}-{now.strftime('%Y%m%d')}.log"
-        filename = os.path.join(self.log_dir, name)
+        name = f"{app_name}-{now.strftime('%Y%m%d')}.log"
+        filename = os.path.join(log_dir, name)
         return filename
 
-    def execute(self, context: Context) -> bool:
-        if "log_dir" not in context:
-            raise ContextKeyException("log_dir")
+    @staticmethod
+    def console(stream, level: int, tty: bool) -> logging.Handler:
+        """
+        Returns the handler of the messages for the user, only when the output is a terminal.
+        """
+        console = logging.StreamHandler(stream)
+        console.setFormatter(logging.Formatter('%(asctime)s.%(msecs)03d %(name)s %(levelname)s - %(message)s',
+                                               datefmt='%H:%M:%S'))
+        console.setLevel(level if tty else logging.FATAL)
+        return console
 
-        self.log_dir = context["log_dir"]
+    def execute(self, context: Context) -> bool:
+        log_dir = context["log_dir"]
 
         if "app_name" in context:
-            self.app_name = context["app_name"]
+            app_name = context["app_name"]
         else:
-            self.app_name = "zenith"
+            app_name = "zenith"
 
         if "logfile" in context:
             logfile = context["logfile"]
         else:
             logfile = True
 
+        # A reused processor sets up logging only once
+        key = (log_dir, app_name, bool(logfile))
+        with LoggingCommand.lock:
+            if key in LoggingCommand.installed:
+                return Command.SUCCESS
+            LoggingCommand.installed.add(key)
+
         root = logging.getLogger()
         root.setLevel(logging.DEBUG)
-        format0 = logging.Formatter('%(asctime)s.%(msecs)03d %(name)s %(levelname)s - %(message)s', datefmt='%H:%M:%S')
-        console = logging.StreamHandler()
-        console.setFormatter(format0)
-        root.addHandler(console)
-
-        if sys.stdout.isatty():
-            console.setLevel(self.level)
-        else:
-            console.setLevel(logging.FATAL)
+        root.addHandler(self.console(sys.stderr, self.level, sys.stdout.isatty()))
 
         if logfile:
             format1 = logging.Formatter('%(asctime)s.%(msecs)03d %(name)s %(levelname)s - %(message)s',
                                         datefmt='%Y-%m-%d %H:%M:%S')
-            fh = logging.handlers.TimedRotatingFileHandler(filename=self.daily_log_filename(), when="d")
-            fh.rotation_filename = self.daily_log_filename
+            fh = logging.handlers.TimedRotatingFileHandler(filename=self.daily_log_filename(log_dir, app_name),
+                                                           when="d")
+            fh.rotation_filename = functools.partial(self.daily_log_filename, log_dir, app_name)
             fh.setFormatter(format1)
             if self.level == logging.DEBUG:
                 fh.setLevel(logging.DEBUG)
@@ -137,26 +140,23 @@ class ReportCommand(Command):
     ReportingCommand: Reports result.
     """
 
-    def __init__(self):
-        self.start = datetime.datetime.now()
-        self.app_name = ""
+    provides = ("report_start",)
 
     def execute(self, context: Context) -> bool:
         logger = logging.getLogger(__name__)
+        context["report_start"] = time.perf_counter()
 
-        if "app_name" in context:
-            self.app_name = context["app_name"]
-        else:
-            self.app_name = "zenith"
-
-        logger.info(f"{self.app_name} - Start")
+        logger.info(f"{context.get('app_name', 'zenith')} - Start")
 
         return Command.SUCCESS
 
     def post_execute(self, context: Context, state: CommandState, error: Exception = None) -> None:
         logger = logging.getLogger(__name__)
-        delta = datetime.datetime.now() - self.start
-        duration_ms = delta.total_seconds() * 1000.0
+
+        if "report_start" in context:
+            duration_ms = (time.perf_counter() - context["report_start"]) * 1000.0
+        else:
+            duration_ms = 0.0
 
         if "user" in context:
             user = context["user"]
@@ -172,7 +172,7 @@ class ReportCommand(Command):
         else:
             status = "Unknown"
 
-        logger.info(f"{self.app_name} - Finish: {user} - {status} ({duration_ms:0.3f} ms)")
+        logger.info(f"{context.get('app_name', 'zenith')} - Finish: {user} - {status} ({duration_ms:0.3f} ms)")
 
 
 class AuthenticationCommand(Command):
@@ -180,6 +180,9 @@ class AuthenticationCommand(Command):
     AuthenticationCommand: Logs username.
     """
 
+    provides = ("user",)
+    exclusive = False
+
     def execute(self, context: Context) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("authenticate.execute() - Start")
@@ -194,24 +197,24 @@ class ReadlineCommand(Command):
     """
     ReadlineCommand: Setups GNU Readline.
     """
+
+    requires = ("etc_dir",)
+    exclusive = False
+
     def execute(self, context: Context) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("readline.execute() - Start")
 
-        if "etc_dir" not in context:
-            raise ContextKeyException("etc_dir")
-
         etc_dir = context["etc_dir"]
 
         if not os.path.isdir(etc_dir):
             os.makedirs(etc_dir)
 
-        self.history_filename = os.path.join(etc_dir, "zenith_history")
-
         try:
             readline.parse_and_bind('tab: complete')
             readline.parse_and_bind('set editing-mode vi')
-            readline.read_history_file(self.history_filename)
+            readline.clear_history()
+            readline.read_history_file(self.history_filename(etc_dir))
             readline.set_history_length(1000)
         except FileNotFoundError:
             pass
@@ -223,8 +226,12 @@ class ReadlineCommand(Command):
         logger = logging.getLogger(__name__)
         logger.debug("readline.post_execute() - Start")
 
-        if state != CommandState.ERROR:
+        if state != CommandState.ERROR and "etc_dir" in context:
             readline.set_history_length(1000)
-            readline.write_history_file(self.history_filename)
+            readline.write_history_file(self.history_filename(context["etc_dir"]))
 
         logger.debug("readline.post_execute() - Finish")
+
+    @staticmethod
+    def history_filename(etc_dir: str) -> str:
+        return os.path.join(etc_dir, "zenith_history")
@@ -1,44 +1,478 @@
+import atexit
+import configparser
 import logging
+import os
+import threading
+from typing import Union
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from zenith.chain import Command, CommandState, Context, ContextKeyException
-from zenith.models import Base
+from zenith.chain import Command, CommandState, Context
+from zenith.models import Base, SchemaVersion
+
+
+# SQLite performance profiles: the PRAGMAs set on every new connection
+PROFILES = {
+    # WAL, every commit is synced to disk
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8192,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    # WAL, commits survive a crash of the application but not a power failure
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16384,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Imports: no syncs, large cache and mmap
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+DEFAULT_PROFILE = "fast"
+
+
+def config_filename(etc_dir: str) -> str:
+    return os.path.join(etc_dir, "zenith.ini")
+
+
+def read_profile(etc_dir: str = None, name: str = None) -> dict:
+    """
+    Reads the SQLite profile from section [database] of var/etc/zenith.ini:
+
+        [database]
+        profile = durable
+        mmap_size = 0
+
+    Any PRAGMA of the profile can be overridden in the section.
+
+    :param etc_dir: the configuration directory, no configuration when None
+    :param name: the name of the profile, overrides the configured name
+    :raises KeyError: unknown profile
+    """
+    config = configparser.ConfigParser()
+    if etc_dir:
+        config.read(config_filename(etc_dir))
+
+    if not config.has_section("database"):
+        config.add_section("database")
+    section = config["database"]
+
+    name = name or section.get("profile", DEFAULT_PROFILE)
+    pragmas = dict(PROFILES[name])
+
+    for pragma, value in pragmas.items():
+        if pragma in section:
+            pragmas[pragma] = section.getint(pragma) if isinstance(value, int) else section[pragma]
+
+    return pragmas
+
+
+def apply_profile(engine: Engine, pragmas: dict) -> None:
+    """
+    Sets the PRAGMAs on every new connection of the engine.
+    """
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+
+
+# Engine and sessionmaker per database file and profile, shared by all runs in the process
+engines = dict()
+engines_lock = threading.Lock()
+
+
+def register(db_filename: str, pragmas: dict = None) -> tuple:
+    """
+    Returns the engine and sessionmaker of the database file, created on first use.
+
+    The sessions do not expire their objects on commit: the processors display them after the commit, which
+    would reload every object with a query of its own.
+
+    A pooled connection is used by one session at a time, but not always in the thread which opened it: the
+    phases of a processor may run on the executor.
+
+    :param db_filename: the database file, resolved to its real path
+    :param pragmas: the SQLite profile, default the default profile
+    :return: tuple of the engine and the sessionmaker
+    """
+    if pragmas is None:
+        pragmas = read_profile()
+
+    key = (os.path.realpath(db_filename), tuple(sorted(pragmas.items())))
+
+    with engines_lock:
+        if key not in engines:
+            engine = create_engine(f"sqlite:///{key[0]}", poolclass=QueuePool, pool_size=5, max_overflow=10,
+                                   connect_args={"check_same_thread": False})
+            apply_profile(engine, pragmas)
+            engines[key] = (engine, sessionmaker(bind=engine, expire_on_commit=False))
+
+        return engines[key]
+
+
+def dispose(db_filename: str = None) -> None:
+    """
+    Closes the pooled connections and forgets the engines, of the database file or of all files.
+    """
+    with engines_lock:
+        for key in list(engines):
+            if db_filename is None or key[0] == os.path.realpath(db_filename):
+                engine, _ = engines.pop(key)
+                engine.dispose()
+
+
+atexit.register(dispose)
+
+
+# Tables of the first release: the DDL of every migration is fixed, it does not follow the models
+BASELINE = (
+    "CREATE TABLE IF NOT EXISTS clients (client_id INTEGER NOT NULL, client_uuid VARCHAR(128) NOT NULL, "
+    "client_name VARCHAR(128) NOT NULL, client_active BOOLEAN NOT NULL, client_description VARCHAR(255), "
+    "client_remark VARCHAR(1024), created_on DATETIME NOT NULL, updated_on DATETIME NOT NULL, "
+    "PRIMARY KEY (client_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_clients_client_name ON clients (client_name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_clients_client_uuid ON clients (client_uuid)",
+    "CREATE TABLE IF NOT EXISTS contacts (client_id INTEGER NOT NULL, contact_id INTEGER NOT NULL, "
+    "contact_uuid VARCHAR(128) NOT NULL, contact_name VARCHAR(128) NOT NULL, contact_description VARCHAR(255), "
+    "contact_remark VARCHAR(1024), created_on DATETIME NOT NULL, updated_on DATETIME NOT NULL, "
+    "PRIMARY KEY (contact_id), FOREIGN KEY(client_id) REFERENCES clients (client_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_contacts_contact_name ON contacts (contact_name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_contacts_contact_uuid ON contacts (contact_uuid)",
+    "CREATE TABLE IF NOT EXISTS projects (client_id INTEGER NOT NULL, project_id INTEGER NOT NULL, "
+    "project_uuid VARCHAR(128) NOT NULL, project_name VARCHAR(128) NOT NULL, project_active BOOLEAN NOT NULL, "
+    "project_description VARCHAR(255), project_remark VARCHAR(1024), created_on DATETIME NOT NULL, "
+    "updated_on DATETIME NOT NULL, PRIMARY KEY (project_id), UNIQUE (client_id, project_name), "
+    "FOREIGN KEY(client_id) REFERENCES clients (client_id))",
+    "CREATE INDEX IF NOT EXISTS ix_projects_project_name ON projects (project_name)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_projects_project_uuid ON projects (project_uuid)",
+    "CREATE TABLE IF NOT EXISTS assets (period_id INTEGER NOT NULL, asset_id INTEGER NOT NULL, "
+    "asset_uuid VARCHAR(128) NOT NULL, created_on DATETIME NOT NULL, updated_on DATETIME NOT NULL, "
+    "PRIMARY KEY (asset_id), FOREIGN KEY(period_id) REFERENCES projects (project_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_assets_asset_uuid ON assets (asset_uuid)",
+    "CREATE TABLE IF NOT EXISTS events (period_id INTEGER NOT NULL, event_id INTEGER NOT NULL, "
+    "event_uuid VARCHAR(128) NOT NULL, created_on DATETIME NOT NULL, updated_on DATETIME NOT NULL, "
+    "PRIMARY KEY (event_id), FOREIGN KEY(period_id) REFERENCES projects (project_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_events_event_uuid ON events (event_uuid)",
+    "CREATE TABLE IF NOT EXISTS notes (period_id INTEGER NOT NULL, note_id INTEGER NOT NULL, "
+    "note_uuid VARCHAR(128) NOT NULL, note_description VARCHAR(255), note_remark VARCHAR(1024), "
+    "created_on DATETIME NOT NULL, updated_on DATETIME NOT NULL, PRIMARY KEY (note_id), "
+    "FOREIGN KEY(period_id) REFERENCES projects (project_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_notes_note_uuid ON notes (note_uuid)",
+    "CREATE TABLE IF NOT EXISTS tasks (project_id INTEGER NOT NULL, task_id INTEGER NOT NULL, "
+    "task_uuid VARCHAR(128) NOT NULL, task_name VARCHAR(128), task_active BOOLEAN NOT NULL, "
+    "task_state VARCHAR(7) NOT NULL, task_start DATETIME, task_finish DATETIME, task_duration INTEGER NOT NULL, "
+    "task_description VARCHAR(255), task_remark VARCHAR(1024), created_on DATETIME NOT NULL, "
+    "updated_on DATETIME NOT NULL, PRIMARY KEY (task_id), FOREIGN KEY(project_id) REFERENCES projects (project_id))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_tasks_task_uuid ON tasks (task_uuid)",
+    "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL, name VARCHAR(128) NOT NULL, "
+    "applied_on DATETIME NOT NULL, PRIMARY KEY (version))",
+)
+
+
+def baseline(connection: Connection) -> None:
+    """
+    Creates the tables of the first release, the existing tables of a database without a version are left as is.
+    """
+    for statement in BASELINE:
+        connection.exec_driver_sql(statement)
+
+
+def active_indexes(connection: Connection) -> None:
+    """
+    Creates the composite and partial indexes of the active client, project and task lookups.
+
+    The indexes of the active client and project are not unique yet: migration 3 removes the duplicates first.
+    """
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_clients_active ON clients (client_active) WHERE client_active = 1")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_projects_active ON projects (client_id) WHERE project_active = 1")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_tasks_project_task ON tasks (project_id, task_id)")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_active ON tasks (project_id) WHERE task_active = 1")
+
+
+def unique_active(connection: Connection) -> None:
+    """
+    Enforces one active client, one active project per client and one active task.
+
+    Of duplicate active rows, the last one created stays active.
+    """
+    connection.exec_driver_sql(
+        "UPDATE clients SET client_active = 0 WHERE client_active = 1 "
+        "AND client_id != (SELECT MAX(client_id) FROM clients WHERE client_active = 1)")
+    connection.exec_driver_sql(
+        "UPDATE projects SET project_active = 0 WHERE project_active = 1 "
+        "AND project_id != (SELECT MAX(p.project_id) FROM projects p "
+        "WHERE p.client_id = projects.client_id AND p.project_active = 1)")
+    connection.exec_driver_sql(
+        "UPDATE tasks SET task_active = 0 WHERE task_active = 1 "
+        "AND task_id != (SELECT MAX(task_id) FROM tasks WHERE task_active = 1)")
+
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_clients_active")
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_projects_active")
+
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX ix_clients_active ON clients (client_active) WHERE client_active = 1")
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX ix_projects_active ON projects (client_id) WHERE project_active = 1")
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_tasks_active_unique ON tasks (task_active) WHERE task_active = 1")
+
+
+def state_index(connection: Connection) -> None:
+    """
+    Creates the index of the task list filtered by state.
+    """
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_project_state ON tasks (project_id, task_state, task_id)")
+
+
+def periods(connection: Connection) -> None:
+    """
+    Creates table periods with its indexes, every started task gets one period.
+    """
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS periods (task_id INTEGER NOT NULL, period_id INTEGER NOT NULL, "
+        "period_start DATETIME NOT NULL, period_finish DATETIME, created_on DATETIME NOT NULL, "
+        "updated_on DATETIME NOT NULL, PRIMARY KEY (period_id), FOREIGN KEY(task_id) REFERENCES tasks (task_id))")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_periods_task_start ON periods (task_id, period_start)")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_periods_start_finish ON periods (period_start, period_finish)")
+    connection.exec_driver_sql(
+        "INSERT INTO periods (task_id, period_start, period_finish, created_on, updated_on) "
+        "SELECT task_id, task_start, task_finish, created_on, updated_on FROM tasks "
+        "WHERE task_start IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM periods WHERE periods.task_id = tasks.task_id)")
+
+
+def daily_totals(connection: Connection) -> None:
+    """
+    Creates table daily_totals from the closed periods, and the index of the open periods.
+
+    The periods are split at midnight by a recursive query, as zenith.command.rollup.split_days() splits them.
+    """
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS daily_totals (total_date DATE NOT NULL, client_id INTEGER NOT NULL, "
+        "project_id INTEGER NOT NULL, total_duration FLOAT NOT NULL, PRIMARY KEY (total_date, client_id, project_id), "
+        "FOREIGN KEY(client_id) REFERENCES clients (client_id), "
+        "FOREIGN KEY(project_id) REFERENCES projects (project_id))")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_periods_open ON periods (task_id) WHERE period_finish IS NULL")
+
+    connection.exec_driver_sql(
+        "WITH RECURSIVE spans (task_id, span_start, period_finish) AS ("
+        "SELECT task_id, period_start, period_finish FROM periods "
+        "WHERE period_finish IS NOT NULL AND julianday(period_finish) > julianday(period_start) "
+        "UNION ALL "
+        "SELECT task_id, datetime(date(span_start, '+1 day')), period_finish FROM spans "
+        "WHERE julianday(date(span_start, '+1 day')) < julianday(period_finish)) "
+        "INSERT INTO daily_totals (total_date, client_id, project_id, total_duration) "
+        "SELECT date(span_start), projects.client_id, projects.project_id, "
+        "SUM((MIN(julianday(period_finish), julianday(date(span_start, '+1 day'))) - julianday(span_start)) * 86400.0) "
+        "FROM spans JOIN tasks ON tasks.task_id = spans.task_id "
+        "JOIN projects ON projects.project_id = tasks.project_id "
+        "GROUP BY date(span_start), projects.client_id, projects.project_id")
+
+
+# End of an open period in the R*Tree
+RTREE_OPEN = 1e12
+
+
+def rtree_bounds(name: str) -> str:
+    """
+    Returns the SQL of the start and finish epochs of the period row name, as zenith.models.epoch() computes them.
+    """
+    start = f"(julianday({name}.period_start) - 2440587.5) * 86400.0"
+    finish = f"(julianday({name}.period_finish) - 2440587.5) * 86400.0"
+    return f"{start}, MAX({start}, COALESCE({finish}, {RTREE_OPEN}))"
+
+
+def period_rtree(connection: Connection) -> None:
+    """
+    Creates the R*Tree of the periods on their start and finish epochs, kept by triggers.
+
+    Without the rtree module of SQLite no R*Tree is created: the overlap queries use ix_periods_start_finish.
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS periods_rtree USING rtree(period_id, period_start, period_finish)")
+    except OperationalError as err:
+        logger.warning(f"No R*Tree of the periods: {err}")
+        return
+
+    connection.exec_driver_sql("DELETE FROM periods_rtree")
+    connection.exec_driver_sql(
+        f"INSERT INTO periods_rtree SELECT period_id, {rtree_bounds('periods')} FROM periods")
+
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS periods_rtree_insert AFTER INSERT ON periods BEGIN "
+        f"INSERT INTO periods_rtree VALUES (new.period_id, {rtree_bounds('new')}); END")
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS periods_rtree_update AFTER UPDATE OF period_start, period_finish ON periods "
+        f"BEGIN INSERT OR REPLACE INTO periods_rtree VALUES (new.period_id, {rtree_bounds('new')}); END")
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS periods_rtree_delete AFTER DELETE ON periods BEGIN "
+        "DELETE FROM periods_rtree WHERE period_id = old.period_id; END")
+
+
+def has_rtree(connection: Union[Connection, Session]) -> bool:
+    """
+    Returns True if the database has the R*Tree of the periods.
+
+    :param connection: a connection, or the session of a command
+    """
+    return connection.execute(
+        text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'periods_rtree'")).scalar() > 0
+
+
+# Migrations: (version, name, function), in order of version
+MIGRATIONS = (
+    (1, "baseline", baseline),
+    (2, "active indexes", active_indexes),
+    (3, "unique active", unique_active),
+    (4, "state index", state_index),
+    (5, "periods", periods),
+    (6, "daily totals", daily_totals),
+    (7, "period rtree", period_rtree),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(connection: Connection) -> int:
+    """
+    Returns the schema version, stored in the database header: no table is read.
+    """
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine: Engine, migrations: tuple = MIGRATIONS) -> list:
+    """
+    Applies the migrations newer than the schema version, in one transaction.
+
+    Every applied migration is recorded in table schema_version, the version of the last one is also stored in
+    PRAGMA user_version. The transaction is begun explicitly: pysqlite does not begin one for DDL.
+
+    :return: the versions of the applied migrations
+    """
+    logger = logging.getLogger(__name__)
+    applied = list()
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        version = schema_version(connection)
+
+        for migration_version, name, function in migrations:
+            if migration_version <= version:
+                continue
+
+            logger.info(f"Migration {migration_version}: {name}")
+            function(connection)
+            connection.execute(insert(SchemaVersion), {"version": migration_version, "name": name})
+            applied.append(migration_version)
+
+        if applied:
+            connection.exec_driver_sql(f"PRAGMA user_version = {applied[-1]}")
+
+    return applied
 
 
 class DatabaseContext(Context):
-    engine = None
-    db_filename: str = None
-    session = None
+    __slots__ = ("db_filename", "db_profile", "db_engine", "db_sessionmaker", "session")
+
+    db_filename: str
+    db_profile: str
+    db_engine: Engine
+    db_sessionmaker: sessionmaker
+    session: Session
 
 
 class DatabaseSetupCommand(Command):
+    requires = ("db_filename",)
+    provides = ("db_engine", "db_sessionmaker")
+    exclusive = False
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("setup.execute() - Start")
 
-        if "db_filename" not in context:
-            raise ContextKeyException("db_filename")
+        # The engine of a test or a batch can be passed in the context
+        if "db_engine" not in context:
+            try:
+                pragmas = read_profile(context.get("etc_dir"), context.get("db_profile"))
+            except KeyError as err:
+                logger.error(f"Unknown database profile: {err}")
+                return Command.FAILURE
+
+            context["db_engine"], context["db_sessionmaker"] = register(context["db_filename"], pragmas)
 
-        context["db_engine"] = create_engine(f"sqlite:///{context['db_filename']}")
+        if "db_sessionmaker" not in context:
+            context["db_sessionmaker"] = sessionmaker(bind=context["db_engine"], expire_on_commit=False)
 
         logger.debug("setup.execute() - Finish")
         return Command.SUCCESS
 
 
-class DatabaseCreateCommand(Command):
+class DatabaseMigrateCommand(Command):
+    """
+    DatabaseMigrateCommand: Migrates the database to the schema version of the models.
+    """
+
+    requires = ("db_engine",)
+    exclusive = False
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
-        logger.debug("create.execute() - Start")
+        logger.debug("migrate.execute() - Start")
 
-        if "db_filename" not in context:
-            raise ContextKeyException("db_filename")
+        with context["db_engine"].connect() as connection:
+            version = schema_version(connection)
 
-        if "db_engine" not in context:
-            raise ContextKeyException("db_engine")
+        if version > SCHEMA_VERSION:
+            logger.error(f"Database schema version {version} is newer than {SCHEMA_VERSION}")
+            return Command.FAILURE
+
+        if version < SCHEMA_VERSION:
+            migrate(context["db_engine"])
+
+        logger.debug("migrate.execute() - Finish")
+        return Command.SUCCESS
+
+
+class DatabaseCreateCommand(Command):
+    requires = ("db_filename", "db_engine")
 
-        Base.metadata.create_all(context["db_engine"])
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("create.execute() - Start")
+
+        migrate(context["db_engine"])
         logger.info(f"Created db: {context['db_filename']}")
 
         logger.debug("create.execute() - Finish")
@@ -46,17 +480,16 @@ class DatabaseCreateCommand(Command):
 
 
 class DatabaseDropCommand(Command):
+    requires = ("db_filename", "db_engine")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("create.execute() - Start")
 
-        if "db_filename" not in context:
-            raise ContextKeyException("db_filename")
-
-        if "db_engine" not in context:
-            raise ContextKeyException("db_engine")
-
-        Base.metadata.drop_all(context["db_engine"])
+        with context["db_engine"].begin() as connection:
+            Base.metadata.drop_all(connection)
+            connection.exec_driver_sql("DROP TABLE IF EXISTS periods_rtree")
+            connection.exec_driver_sql("PRAGMA user_version = 0")
         logger.info(f"Dropped db: {context['db_filename']}")
 
         logger.debug("create.execute() - Finish")
@@ -64,36 +497,36 @@ class DatabaseDropCommand(Command):
 
 
 class DatabaseSessionCommand(Command):
-    def __init__(self):
-        self.has_session = False
-        self.session = None
+    requires = ("db_engine",)
+    provides = ("session",)
+    exclusive = False
 
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("session.execute() - Start")
 
-        if "db_engine" not in context:
-            raise ContextKeyException("db_engine")
-
-        engine = context["db_engine"]
-        Session = sessionmaker(bind=engine)
-        self.session = Session()
-        context.session = self.session
-        self.has_session = True
+        if "db_sessionmaker" in context:
+            Session = context["db_sessionmaker"]
+        else:
+            Session = sessionmaker(bind=context["db_engine"], expire_on_commit=False)
+        context.session = Session()
 
         logger.debug("session.execute() - Finish")
         return Command.SUCCESS
 
-    def post_execute(self, context: Context, state: CommandState, error: Exception = None) -> None:
+    def post_execute(self, context: DatabaseContext, state: CommandState, error: Exception = None) -> None:
         logger = logging.getLogger(__name__)
         logger.debug("session.post_execute() - Start")
 
+        session = context.get("session")
+
         if state == CommandState.SUCCESS:
-            self.session.commit()
-            logger.debug("session.commit()")
+            if session is not None:
+                session.commit()
+                logger.debug("session.commit()")
         else:
-            if self.has_session:
-                self.session.rollback()
+            if session is not None:
+                session.rollback()
                 logger.debug("session.rollback()")
 
         logger.debug("session.post_execute() - Finish")
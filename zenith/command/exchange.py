@@ -0,0 +1,346 @@
+import csv
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sys
+import uuid
+
+from sqlalchemy import DateTime, and_, bindparam, exists, func, insert, select
+
+from zenith.chain import Command
+from zenith.command.database import DatabaseContext
+from zenith.command.rollup import add_totals, split_days
+from zenith.models import Client, Period, Project, Task, TaskState
+
+# Fields of a record: one task, only a client and project when the task fields are empty, or only a client
+FIELDS = ("client_name", "project_name", "task_uuid", "task_name", "task_state", "task_start", "task_finish",
+          "task_duration", "task_description", "task_remark")
+TASK_FIELDS = FIELDS[2:]
+
+# Fields of a period: a list "periods" of a JSONL record, or one CSV row per period with the fields of its task
+PERIOD_FIELDS = ("period_start", "period_finish")
+
+# A period of the task by UUID, which the task does not have yet: a re-import inserts no duplicates
+PERIOD_INSERT = insert(Period).from_select(
+    ["task_id", "period_start", "period_finish", "created_on", "updated_on"],
+    select(Task.task_id, bindparam("period_start", type_=DateTime()), bindparam("period_finish", type_=DateTime()),
+           bindparam("now", type_=DateTime()), bindparam("now", type_=DateTime()))
+    .where(Task.task_uuid == bindparam("task_uuid"),
+           ~exists().where(and_(Period.task_id == Task.task_id, Period.period_start == bindparam("period_start")))))
+
+# Namespace of the UUIDs of imported tasks without one: a re-import inserts the same UUIDs
+NAMESPACE = uuid.UUID("0c1a9b5e-2d7f-4f53-9a51-6e3b1d1f8c42")
+
+
+def file_format(filename: str, name: str = None) -> str:
+    """
+    Returns the format, by name or by the extension of the filename, default JSONL.
+    """
+    if name:
+        return name
+
+    return "csv" if filename.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(file, name: str):
+    """
+    Reads the records of a CSV or JSONL file, one at a time.
+    """
+    if name == "csv":
+        yield from csv.DictReader(file)
+    else:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_datetime(value):
+    if value in (None, ""):
+        return None
+
+    return datetime.datetime.fromisoformat(value)
+
+
+def progress_filename(tmp_dir: str, filename: str) -> str:
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()
+    return os.path.join(tmp_dir, f"import-{key}.json")
+
+
+class ImportCommand(Command):
+    """
+    ImportCommand: Imports clients, projects and tasks from a CSV or JSONL file.
+
+    The tasks are inserted with executemany, in transactions of import_chunk records. Clients and projects are
+    resolved through a name to ID map held in memory. After every transaction the number of imported records is
+    written to a progress file in var/tmp: an interrupted import resumes after the last committed record.
+
+    The periods of a task are inserted after the task. A started task of a file without periods gets one period,
+    from its start and finish. The closed periods inserted by a transaction are added to the daily totals in the
+    same transaction: the periods and tasks of before are not read.
+    """
+
+    requires = ("db_engine", "tmp_dir", "import_filename")
+    provides = ("imported",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("import.execute() - Start")
+
+        filename = context["import_filename"]
+        name = file_format(filename, context.get("import_format"))
+        chunk = int(context.get("import_chunk") or 10000)
+
+        stat = os.stat(filename)
+        source = {"filename": os.path.abspath(filename), "size": stat.st_size, "mtime": stat.st_mtime}
+        progress = progress_filename(context["tmp_dir"], filename)
+        skip = 0 if context.get("import_restart") else self.read_progress(progress, source)
+        if skip:
+            logger.info(f"Import of {filename} - resumed after {skip} records")
+
+        count = skip
+        with context["db_engine"].connect() as connection:
+            clients = dict(connection.execute(select(Client.client_name, Client.client_id)).all())
+            projects = {(client_id, project_name): project_id for client_id, project_name, project_id in
+                        connection.execute(select(Project.client_id, Project.project_name, Project.project_id))}
+
+            with open(filename, "rt", newline="") as file:
+                tasks = list()
+                periods = list()
+                transaction = connection.begin()
+
+                for number, record in enumerate(read_records(file, name)):
+                    if number < skip:
+                        continue
+
+                    project_id = self.resolve(connection, clients, projects, record)
+                    if any(record.get(field) not in (None, "") for field in TASK_FIELDS):
+                        task = self.task(record, project_id, f"{source['filename']}:{number}")
+                        tasks.append(task)
+                        periods.extend(self.periods(record, task["task_uuid"], task["created_on"]))
+                    count += 1
+
+                    if count % chunk == 0:
+                        self.insert(connection, tasks, periods)
+                        transaction.commit()
+                        self.write_progress(progress, source, count)
+                        logger.info(f"Import of {filename} - {count} records")
+                        tasks = list()
+                        periods = list()
+                        transaction = connection.begin()
+
+                self.insert(connection, tasks, periods)
+                transaction.commit()
+
+        if os.path.isfile(progress):
+            os.remove(progress)
+
+        context["imported"] = count - skip
+        logger.info(f"Import of {filename} - {count - skip} records imported")
+        logger.debug("import.execute() - Finish")
+        return Command.SUCCESS
+
+    @staticmethod
+    def resolve(connection, clients: dict, projects: dict, record: dict) -> int:
+        """
+        Returns the project ID of the record, the client and project are created when missing.
+
+        :return: the project ID, None for a record of a client without projects
+        """
+        client_name = record["client_name"]
+        if client_name not in clients:
+            clients[client_name] = connection.execute(
+                insert(Client).values(client_name=client_name)).inserted_primary_key[0]
+        client_id = clients[client_name]
+
+        if record.get("project_name") in (None, ""):
+            return None
+
+        key = (client_id, record["project_name"])
+        if key not in projects:
+            projects[key] = connection.execute(
+                insert(Project).values(client_id=client_id, project_name=key[1])).inserted_primary_key[0]
+
+        return projects[key]
+
+    @staticmethod
+    def task(record: dict, project_id: int, source: str) -> dict:
+        now = datetime.datetime.now()
+        start = parse_datetime(record.get("task_start"))
+        finish = parse_datetime(record.get("task_finish"))
+
+        if record.get("task_state"):
+            state = TaskState[record["task_state"]]
+        elif finish:
+            state = TaskState.STOPPED
+        elif start:
+            state = TaskState.STARTED
+        else:
+            state = TaskState.NEW
+
+        return {
+            "project_id": project_id,
+            "task_uuid": record.get("task_uuid") or str(uuid.uuid5(NAMESPACE, source)),
+            "task_name": record.get("task_name") or None,
+            "task_active": False,
+            "task_state": state,
+            "task_start": start,
+            "task_finish": finish,
+            "task_duration": int(record.get("task_duration") or 0),
+            "task_description": record.get("task_description") or None,
+            "task_remark": record.get("task_remark") or None,
+            "created_on": now,
+            "updated_on": now,
+        }
+
+    @staticmethod
+    def periods(record: dict, task_uuid: str, now: datetime.datetime) -> list:
+        """
+        Returns the periods of the record: its list "periods" of JSONL, or the period fields of a CSV row.
+        """
+        if "periods" in record:
+            spans = [(period.get("period_start"), period.get("period_finish")) for period in record["periods"] or ()]
+        else:
+            spans = [(record.get("period_start"), record.get("period_finish"))]
+
+        return [{"task_uuid": task_uuid, "period_start": parse_datetime(start), "period_finish": parse_datetime(finish),
+                 "now": now} for start, finish in spans if start]
+
+    @staticmethod
+    def insert(connection, tasks: list, periods: list) -> None:
+        """
+        Inserts the tasks and their periods, and adds the inserted closed periods to the daily totals.
+        """
+        # Rows are inserted after the greatest ID
+        last_task = connection.execute(select(func.max(Task.task_id))).scalar() or 0
+        last_period = connection.execute(select(func.max(Period.period_id))).scalar() or 0
+
+        if tasks:
+            # A task imported before keeps its row
+            connection.execute(insert(Task).prefix_with("OR IGNORE"), tasks)
+        if periods:
+            connection.execute(PERIOD_INSERT, periods)
+
+        # Files without periods: one period per inserted started task, from its start and finish
+        connection.execute(insert(Period).from_select(
+            ["task_id", "period_start", "period_finish", "created_on", "updated_on"],
+            select(Task.task_id, Task.task_start, Task.task_finish, Task.created_on, Task.updated_on)
+            .where(Task.task_id > last_task, Task.task_start != None,
+                   ~exists().where(Period.task_id == Task.task_id))))
+
+        rows = list()
+        for start, finish, client_id, project_id in connection.execute(
+                select(Period.period_start, Period.period_finish, Project.client_id, Project.project_id)
+                .select_from(Period)
+                .join(Task, Task.task_id == Period.task_id)
+                .join(Project, Project.project_id == Task.project_id)
+                .where(Period.period_id > last_period, Period.period_finish != None)):
+            rows.extend((day, client_id, project_id, seconds) for day, seconds in split_days(start, finish))
+        add_totals(connection, rows)
+
+    @staticmethod
+    def read_progress(progress: str, source: dict) -> int:
+        """
+        Returns the number of records imported before, 0 when the file changed since.
+        """
+        try:
+            with open(progress, "rt") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return 0
+
+        if any(state.get(key) != value for key, value in source.items()):
+            return 0
+
+        return state["records"]
+
+    @staticmethod
+    def write_progress(progress: str, source: dict, count: int) -> None:
+        with open(f"{progress}.tmp", "wt") as file:
+            json.dump(dict(source, records=count), file)
+        os.replace(f"{progress}.tmp", progress)
+
+
+class ExportCommand(Command):
+    """
+    ExportCommand: Exports the clients, projects, tasks and periods to a CSV or JSONL file, or to stdout.
+
+    The rows are streamed from the cursor in batches of export_chunk, and written as they are fetched. A CSV file
+    has one row per period, a JSONL file one record per task with the list of its periods. A project without tasks,
+    and a client without projects, is a record of its own.
+    """
+
+    requires = ("db_engine", "export_filename")
+    provides = ("exported",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("export.execute() - Start")
+
+        filename = context["export_filename"]
+        name = file_format(filename if filename != "-" else "", context.get("export_format"))
+        chunk = int(context.get("export_chunk") or 10000)
+
+        query = select(Client.client_name, Project.project_name, Task.task_uuid, Task.task_name, Task.task_state,
+                       Task.task_start, Task.task_finish, Task.task_duration, Task.task_description,
+                       Task.task_remark, Period.period_start, Period.period_finish) \
+            .select_from(Client) \
+            .outerjoin(Project, Project.client_id == Client.client_id) \
+            .outerjoin(Task, Task.project_id == Project.project_id) \
+            .outerjoin(Period, Period.task_id == Task.task_id) \
+            .order_by(Client.client_id, Project.project_id, Task.task_id, Period.period_start)
+
+        count = 0
+        file = sys.stdout if filename == "-" else open(filename, "wt", newline="")
+        try:
+            if name == "csv":
+                writer = csv.writer(file)
+                writer.writerow(FIELDS + PERIOD_FIELDS)
+
+            with context["db_engine"].connect() as connection:
+                result = connection.execution_options(stream_results=True).execute(query)
+                # The JSONL record of a task is written after its last period
+                record = None
+
+                for rows in result.partitions(chunk):
+                    for row in rows:
+                        values = [self.value(value) for value in row]
+                        if name == "csv":
+                            writer.writerow(["" if value is None else value for value in values])
+                            count += 1
+                            continue
+
+                        period = dict(zip(PERIOD_FIELDS, values[len(FIELDS):]))
+                        if record is not None and record.get("task_uuid") is not None \
+                                and record["task_uuid"] == values[FIELDS.index("task_uuid")]:
+                            record["periods"].append(period)
+                            continue
+
+                        if record is not None:
+                            file.write(json.dumps(record) + "\n")
+                            count += 1
+                        record = dict(zip(FIELDS, values))
+                        if record["task_uuid"] is not None:
+                            record["periods"] = [period] if period["period_start"] else []
+
+                if record is not None:
+                    file.write(json.dumps(record) + "\n")
+                    count += 1
+        finally:
+            if file is not sys.stdout:
+                file.close()
+
+        context["exported"] = count
+        logger.info(f"Export to {filename} - {count} records exported")
+        logger.debug("export.execute() - Finish")
+        return Command.SUCCESS
+
+    @staticmethod
+    def value(value):
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if isinstance(value, TaskState):
+            return value.name
+
+        return value
@@ -4,6 +4,9 @@ import uuid
 from zenith.chain import Command, Context
 
 class NodeUUIDCommand(Command):
+    provides = ("node_uuid",)
+    exclusive = False
+
     # __node_uuid: str = None
     #
     # def get_node_UUID(self) -> str:
@@ -1,27 +1,39 @@
 import logging
 
-from sqlalchemy import true
+from sqlalchemy import delete, exists, select, true, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import defer, joinedload
 
-from zenith.chain import Command, ContextKeyException
+from zenith.chain import Command
 from zenith.command.database import DatabaseContext
-from zenith.models import Project
+from zenith.models import Project, Task
+
+# Core statements on the table: no identity map, no synchronization of loaded objects
+projects = Project.__table__
 
 
 class ProjectActivateCommand(Command):
+    requires = ("session", "client", "project_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("activate.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
         project_name = context["project_name"]
+        client = context["client"]
 
-        for project in context.session.query(Project).filter(Project.project_active == true()).all():
-            project.project_active = False
+        # Every client has its own active project
+        context.session.execute(update(Project).where(Project.client_id == client.client_id,
+                                                      Project.project_active == true(),
+                                                      Project.project_name != project_name)
+                                .values(project_active=False))
+        result = context.session.execute(update(Project).where(Project.client_id == client.client_id,
+                                                               Project.project_name == project_name)
+                                         .values(project_active=True))
 
-        project = context.session.query(Project).filter(Project.project_name == project_name).one()
-        project.project_active = True
+        if result.rowcount == 0:
+            logger.warning(f"Project[project_name = {project_name}] - does not exist")
+            return Command.FAILURE
 
         logger.info(f"Project[project_name = {project_name}] - activated")
         logger.debug("activate.execute() - Finish")
@@ -29,13 +41,13 @@ class ProjectActivateCommand(Command):
 
 
 class ProjectActiveCommand(Command):
+    requires = ("session", "client")
+    provides = ("project",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("active.execute() - Start")
 
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         client = context["client"]
         project = context.session.query(Project).filter(Project.client_id == client.client_id,
                                                         Project.project_active == true()).first()
@@ -52,21 +64,24 @@ class ProjectActiveCommand(Command):
 
 
 class ProjectCreateCommand(Command):
+    requires = ("session", "client", "project_name")
+    provides = ("project_id",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("create.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("client_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         project_name = context["project_name"]
         client = context["client"]
 
-        project = Project(client_id=client.client_id, project_name=project_name)
-        context.session.add(project)
+        result = context.session.execute(insert(projects).values(client_id=client.client_id,
+                                                                 project_name=project_name).on_conflict_do_nothing())
+
+        if result.rowcount == 0:
+            logger.warning(f"Project[project_name = {project_name}] - does exist")
+            return Command.FAILURE
+
+        context["project_id"] = result.inserted_primary_key[0]
 
         logger.info(f"Project[project_name = {project_name}] - created")
         logger.debug("create.execute() - Finish")
@@ -74,21 +89,26 @@ class ProjectCreateCommand(Command):
 
 
 class ProjectReadCommand(Command):
+    requires = ("session", "client", "project_name")
+    provides = ("project",)
+
+    # Loader options of the query: the client is displayed with the project
+    options = (joinedload(Project.client, innerjoin=True),)
+
+    def __init__(self, options: tuple = None):
+        super().__init__()
+        if options is not None:
+            self.options = options
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("read.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         project_name = context["project_name"]
         client = context["client"]
 
-        project = context.session.query(Project).filter(Project.client_id == client.client_id,
-                                                        Project.project_name == project_name).one()
+        project = context.session.query(Project).options(*self.options).filter(
+            Project.client_id == client.client_id, Project.project_name == project_name).one()
 
         context["project"] = project
 
@@ -97,61 +117,52 @@ class ProjectReadCommand(Command):
 
 
 class ProjectUpdateCommand(Command):
+    requires = ("session", "client", "project_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("update.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
-        updated = False
         project_name = context["project_name"]
         client = context["client"]
+        values = {key: context[key] for key in ("project_active", "project_description", "project_remark")
+                  if key in context}
 
-        project = context.session.query(Project).filter(Project.client_id == client.client_id,
-                                                        Project.project_name == project_name).one()
-
-        if "project_active" in context:
-            project.project_active = context["project_active"]
-            updated = True
-
-        if "project_description" in context:
-            project.project_description = context["project_description"]
-            updated = True
+        if not values:
+            logger.warning(f"Project[project_name = {project_name}] - not updated")
+            return Command.FAILURE
 
-        if "project_remark" in context:
-            project.project_remark = context["project_remark"]
-            updated = True
+        result = context.session.execute(update(projects).where(projects.c.client_id == client.client_id,
+                                                                projects.c.project_name == project_name)
+                                         .values(values))
 
-        if updated:
-            logger.info(f"Project[project_name = {project_name}] - updated")
-        else:
-            logger.warning(f"Project[project_name = {project_name}] - not updated")
+        if result.rowcount == 0:
+            logger.warning(f"Project[project_name = {project_name}] - does not exist")
+            return Command.FAILURE
 
+        logger.info(f"Project[project_name = {project_name}] - updated")
         logger.debug("update.execute() - Finish")
-        return updated
+        return Command.SUCCESS
 
 
 class ProjectDeleteCommand(Command):
+    requires = ("session", "client", "project_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("delete.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         project_name = context["project_name"]
         client = context["client"]
 
-        project = context.session.query(Project).filter(Project.client_id == client.client_id,
-                                                        Project.project_name == project_name).one()
-        context.session.delete(project)
+        # A project with tasks is kept
+        result = context.session.execute(delete(projects).where(
+            projects.c.client_id == client.client_id, projects.c.project_name == project_name,
+            ~exists(select(Task.task_id).where(Task.project_id == projects.c.project_id))))
+
+        if result.rowcount == 0:
+            logger.warning(f"Project[project_name = {project_name}] - does not exist or has tasks")
+            return Command.FAILURE
 
         logger.info(f"Project[project_name = {project_name}] - deleted")
         logger.debug("delete.execute() - Finish")
@@ -159,34 +170,56 @@ class ProjectDeleteCommand(Command):
 
 
 class ProjectListCommand(Command):
+    """
+    ProjectListCommand: Lists the projects of the client, as a query streamed by the caller.
+
+    Optional keys: project_after (a project name, keyset pagination) and project_limit.
+    """
+
+    requires = ("session", "client")
+    provides = ("projects",)
+
+    # Loader options of the query: the client is displayed, the large columns are not
+    options = (joinedload(Project.client, innerjoin=True), defer(Project.project_description),
+               defer(Project.project_remark))
+
+    # Rows fetched and loaded per batch, while the projects are iterated
+    yield_per = 1000
+
+    def __init__(self, options: tuple = None):
+        super().__init__()
+        if options is not None:
+            self.options = options
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("list.execute() - Start")
 
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         client = context["client"]
 
-        projects = context.session.query(Project).filter(Project.client_id == client.client_id).order_by(
-            Project.project_name).all()
-        context["projects"] = projects
+        query = context.session.query(Project).options(*self.options).filter(Project.client_id == client.client_id)
+
+        if context.get("project_after") is not None:
+            query = query.filter(Project.project_name > context["project_after"])
+
+        query = query.order_by(Project.project_name)
+
+        if context.get("project_limit") is not None:
+            query = query.limit(int(context["project_limit"]))
+
+        context["projects"] = query.yield_per(self.yield_per)
 
         logger.debug("list.execute() - Finish")
         return Command.SUCCESS
 
 
 class ProjectExistCommand(Command):
+    requires = ("session", "client", "project_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("exist.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         exist = True
         project_name = context["project_name"]
         client = context["client"]
@@ -201,16 +234,12 @@ class ProjectExistCommand(Command):
 
 
 class ProjectNotExistCommand(Command):
+    requires = ("session", "client", "project_name")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("not_exist.execute() - Start")
 
-        if "project_name" not in context:
-            raise ContextKeyException("project_name")
-
-        if "client" not in context:
-            raise ContextKeyException("client")
-
         not_exist = True
         project_name = context["project_name"]
         client = context["client"]
@@ -0,0 +1,152 @@
+import datetime
+import logging
+
+from sqlalchemy import func, select
+
+from zenith.chain import Command
+from zenith.command.database import DatabaseContext
+from zenith.command.rollup import split_days
+from zenith.models import Client, DailyTotal, Period, Project, Task
+
+# Group columns of the report, per level
+GROUPS = {
+    "client": ("client_name",),
+    "project": ("client_name", "project_name"),
+    "task": ("client_name", "project_name", "task_id", "task_name"),
+}
+
+PERIODS = ("day", "week", "month")
+
+
+def bucket(day: datetime.date, period: str) -> str:
+    """
+    Returns the name of the day, ISO week or month of the day.
+    """
+    if period == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "month":
+        return f"{day:%Y-%m}"
+
+    return day.isoformat()
+
+
+def first_day(column, period: str):
+    """
+    Returns the SQL expression of the first day of the day, week (Monday) or month of the column.
+    """
+    if period == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if period == "month":
+        return func.date(column, "start of month")
+
+    return func.date(column)
+
+
+class ReportTotalsCommand(Command):
+    """
+    ReportTotalsCommand: Totals the durations of the periods per client, project or task, and per day, week or month.
+
+    Per client or project, the closed periods are summed by SQL from the daily totals, grouped by the first day of
+    their day, week or month. Per task, the periods within one day are summed by SQL from the periods, only the
+    periods that cross midnight are fetched. The open periods are split at midnight and clipped to the range.
+    """
+
+    requires = ("session", "report_from", "report_to")
+    provides = ("report_rows",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("totals.execute() - Start")
+
+        level = context.get("report_by") or "project"
+        period = context.get("report_period") or "day"
+        if level not in GROUPS or period not in PERIODS:
+            logger.warning(f"Report by {level} per {period} - unknown")
+            return Command.FAILURE
+
+        # The range is [from, to], in whole days
+        start = datetime.datetime.combine(context["report_from"], datetime.time())
+        finish = datetime.datetime.combine(context["report_to"] + datetime.timedelta(days=1), datetime.time())
+        now = datetime.datetime.now()
+
+        columns = [self.column(name) for name in GROUPS[level]]
+        totals = dict()
+
+        if level == "task":
+            self.periods(context, totals, columns, period, start, finish)
+        else:
+            self.daily_totals(context, totals, columns, period, start, finish)
+
+        # Open: through ix_periods_open, split in days and clipped to the range
+        query = self.join(select(Period.period_start, *columns)).where(Period.period_finish == None)
+
+        for row in context.session.execute(query):
+            for span_day, seconds in split_days(max(row[0], start), min(now, finish)):
+                self.add(totals, bucket(span_day, period), tuple(row[1:]), seconds)
+
+        context["report_rows"] = [dict(zip(("period",) + GROUPS[level] + ("duration",), (key[0],) + key[1] +
+                                           (int(round(seconds)),))) for key, seconds in sorted(totals.items())]
+
+        logger.info(f"Report by {level} per {period} - {len(context['report_rows'])} rows")
+        logger.debug("totals.execute() - Finish")
+        return Command.SUCCESS
+
+    def daily_totals(self, context: DatabaseContext, totals: dict, columns: list, period: str,
+                     start: datetime.datetime, finish: datetime.datetime) -> None:
+        """
+        Totals the closed periods from the daily totals: one row per day and project.
+        """
+        first = first_day(DailyTotal.total_date, period)
+        query = select(first, *columns, func.sum(DailyTotal.total_duration)) \
+            .select_from(DailyTotal) \
+            .join(Project, Project.project_id == DailyTotal.project_id) \
+            .join(Client, Client.client_id == DailyTotal.client_id) \
+            .where(DailyTotal.total_date >= start.date(), DailyTotal.total_date < finish.date()) \
+            .group_by(first, *columns)
+
+        for row in context.session.execute(query):
+            self.add(totals, bucket(datetime.date.fromisoformat(row[0]), period), tuple(row[1:-1]), row[-1])
+
+    def periods(self, context: DatabaseContext, totals: dict, columns: list, period: str,
+                start: datetime.datetime, finish: datetime.datetime) -> None:
+        """
+        Totals the closed periods from the periods: the daily totals have no tasks.
+        """
+        # Within one day: through ix_periods_start_finish, grouped by SQL
+        first = first_day(Period.period_start, period)
+        query = self.join(select(first, *columns,
+                                 func.sum((func.julianday(Period.period_finish) -
+                                           func.julianday(Period.period_start)) * 86400.0))) \
+            .where(Period.period_start >= start, Period.period_start < finish,
+                   func.date(Period.period_finish) == func.date(Period.period_start)) \
+            .group_by(first, *columns)
+
+        for row in context.session.execute(query):
+            self.add(totals, bucket(datetime.date.fromisoformat(row[0]), period), tuple(row[1:-1]), row[-1])
+
+        # Across midnight: split in days, clipped to the range
+        query = self.join(select(Period.period_start, Period.period_finish, *columns)) \
+            .where(Period.period_start < finish, Period.period_finish > start,
+                   func.date(Period.period_finish) != func.date(Period.period_start))
+
+        for row in context.session.execute(query):
+            for span_day, seconds in split_days(max(row[0], start), min(row[1], finish)):
+                self.add(totals, bucket(span_day, period), tuple(row[2:]), seconds)
+
+    @staticmethod
+    def column(name: str):
+        for model in (Client, Project, Task):
+            if hasattr(model, name):
+                return getattr(model, name)
+
+    @staticmethod
+    def join(query):
+        return query.select_from(Period) \
+            .join(Task, Task.task_id == Period.task_id) \
+            .join(Project, Project.project_id == Task.project_id) \
+            .join(Client, Client.client_id == Project.client_id)
+
+    @staticmethod
+    def add(totals: dict, name: str, key: tuple, seconds: float) -> None:
+        totals[(name, key)] = totals.get((name, key), 0.0) + seconds
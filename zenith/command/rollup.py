@@ -0,0 +1,99 @@
+import datetime
+import logging
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from zenith.chain import Command
+from zenith.command.database import DatabaseContext
+from zenith.models import DailyTotal, Period, Project, Task
+
+daily_totals = DailyTotal.__table__
+
+
+def split_days(start: datetime.datetime, finish: datetime.datetime):
+    """
+    Splits a span at midnight, yields (date, seconds) per day.
+    """
+    while start.date() < finish.date():
+        midnight = datetime.datetime.combine(start.date() + datetime.timedelta(days=1), datetime.time())
+        yield start.date(), (midnight - start).total_seconds()
+        start = midnight
+
+    if start < finish:
+        yield start.date(), (finish - start).total_seconds()
+
+
+def add_totals(connection, rows: list) -> None:
+    """
+    Adds the seconds of rows of (date, client_id, project_id, seconds) to the daily totals.
+
+    :param connection: a connection or a session, the totals change in its transaction
+    """
+    if not rows:
+        return
+
+    statement = insert(daily_totals)
+    statement = statement.on_conflict_do_update(
+        index_elements=[daily_totals.c.total_date, daily_totals.c.client_id, daily_totals.c.project_id],
+        set_={"total_duration": daily_totals.c.total_duration + statement.excluded.total_duration})
+
+    connection.execute(statement, [{"total_date": day, "client_id": client_id, "project_id": project_id,
+                                    "total_duration": seconds} for day, client_id, project_id, seconds in rows])
+
+
+def add_period(connection, client_id: int, project_id: int, start: datetime.datetime, finish: datetime.datetime,
+               sign: int = 1) -> None:
+    """
+    Adds a closed period to the daily totals of its project, or subtracts it with sign -1.
+    """
+    add_totals(connection, [(day, client_id, project_id, sign * seconds) for day, seconds in split_days(start, finish)])
+
+
+def rebuild_rollups(connection) -> None:
+    """
+    Recomputes the daily totals from the closed periods.
+
+    The periods within one day are summed by SQL, the periods across midnight are split in days.
+    """
+    connection.execute(delete(daily_totals))
+
+    day = func.date(Period.period_start)
+    same_day = func.date(Period.period_finish) == day
+    connection.execute(insert(daily_totals).from_select(
+        ["total_date", "client_id", "project_id", "total_duration"],
+        select(day, Project.client_id, Project.project_id,
+               func.sum((func.julianday(Period.period_finish) - func.julianday(Period.period_start)) * 86400.0))
+        .select_from(Period)
+        .join(Task, Task.task_id == Period.task_id)
+        .join(Project, Project.project_id == Task.project_id)
+        .where(Period.period_finish != None, same_day)
+        .group_by(day, Project.client_id, Project.project_id)))
+
+    rows = list()
+    for start, finish, client_id, project_id in connection.execute(
+            select(Period.period_start, Period.period_finish, Project.client_id, Project.project_id)
+            .select_from(Period)
+            .join(Task, Task.task_id == Period.task_id)
+            .join(Project, Project.project_id == Task.project_id)
+            .where(Period.period_finish != None, ~same_day)):
+        rows.extend((day, client_id, project_id, seconds) for day, seconds in split_days(start, finish))
+    add_totals(connection, rows)
+
+
+class RollupRebuildCommand(Command):
+    """
+    RollupRebuildCommand: Recomputes the daily totals of the report from the periods.
+    """
+
+    requires = ("session",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("rebuild.execute() - Start")
+
+        rebuild_rollups(context.session)
+
+        logger.info("Daily totals - rebuilt")
+        logger.debug("rebuild.execute() - Finish")
+        return Command.SUCCESS
@@ -0,0 +1,63 @@
+import logging
+import os
+
+from sqlalchemy import and_, select, true
+
+from zenith import snapshot
+from zenith.chain import Command, CommandState
+from zenith.command.database import DatabaseContext
+from zenith.models import Client, Period, Project, Task
+from zenith.paths import snapshot_filename
+
+
+def write_snapshot(connection, filename: str) -> None:
+    """
+    Writes the snapshot of the active client, project and task, read in one outer joined query.
+
+    The write-ahead log is checkpointed and truncated first: else the checkpoint on close of the last connection
+    would write the database after the snapshot, and a log with frames makes the snapshot stale.
+    """
+    connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    query = select(Client.client_id, Client.client_name, Project.project_id, Project.project_name,
+                   Task.task_id, Task.task_name, Period.period_start) \
+        .select_from(Client) \
+        .outerjoin(Project, and_(Project.client_id == Client.client_id, Project.project_active == true())) \
+        .outerjoin(Task, and_(Task.project_id == Project.project_id, Task.task_active == true())) \
+        .outerjoin(Period, and_(Period.task_id == Task.task_id, Period.period_finish == None)) \
+        .where(Client.client_active == true())
+
+    row = connection.execute(query).first()
+    if row is None:
+        snapshot.write(filename)
+        return
+
+    snapshot.write(filename, (row[0], row[1]), (row[2], row[3]) if row[2] is not None else None,
+                   (row[4], row[5]) if row[4] is not None else None,
+                   row[6].timestamp() if row[6] is not None else None)
+
+
+class SnapshotCommand(Command):
+    """
+    SnapshotCommand: Writes the snapshot of the active client, project and task after a successful run.
+
+    The snapshot is written after the session is committed, so its modification time follows the database
+    and the truncation of its write-ahead log: `zenith status` only reads the database when it changed since.
+    """
+
+    requires = ("db_engine", "zenith_dir", "tmp_dir")
+    exclusive = False
+
+    def post_execute(self, context: DatabaseContext, state: CommandState, error: Exception = None) -> None:
+        logger = logging.getLogger(__name__)
+        logger.debug("snapshot.post_execute() - Start")
+
+        if state == CommandState.SUCCESS and os.path.isdir(context.get("tmp_dir", "")):
+            try:
+                with context["db_engine"].connect() as connection:
+                    write_snapshot(connection, snapshot_filename(context["zenith_dir"]))
+            except OSError as err:
+                # Without a snapshot, `zenith status` reads the database
+                logger.warning(f"Snapshot not written: {err}")
+
+        logger.debug("snapshot.post_execute() - Finish")
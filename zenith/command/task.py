@@ -1,21 +1,27 @@
 import datetime
 import logging
 
-from sqlalchemy import true
+from sqlalchemy import and_, delete, func, insert, select, true, update
+from sqlalchemy.orm import aliased, defer, joinedload
 
-from zenith.chain import Command, ContextKeyException
-from zenith.command.database import DatabaseContext
-from zenith.models import Task, TaskState
+from zenith.chain import Command
+from zenith.command.database import DatabaseContext, has_rtree
+from zenith.command.rollup import add_period, daily_totals
+from zenith.models import Period, Project, Task, TaskState, periods_rtree, sql_epoch
+
+# Core statements on the table: no identity map, no synchronization of loaded objects
+tasks = Task.__table__
+periods = Period.__table__
 
 
 class TaskActiveCommand(Command):
+    requires = ("session", "project")
+    provides = ("task",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("active.execute() - Start")
 
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         project = context["project"]
         task = context.session.query(Task).filter(Task.project_id == project.project_id, Task.task_active == true()).first()
 
@@ -31,38 +37,44 @@ class TaskActiveCommand(Command):
 
 
 class TaskCreateCommand(Command):
+    requires = ("session", "project")
+    provides = ("task_id",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("create.execute() - Start")
 
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         project = context["project"]
 
-        task = Task(project_id=project.project_id)
-        context.session.add(task)
+        result = context.session.execute(insert(tasks).values(project_id=project.project_id))
+        context["task_id"] = result.inserted_primary_key[0]
 
-        logger.info(f"Task[task_name = NEW] - created")
+        logger.info(f"Task[task_id = {context['task_id']}] - created")
         logger.debug("create.execute() - Finish")
         return Command.SUCCESS
 
 
 class TaskReadCommand(Command):
+    requires = ("session", "project", "task_id")
+    provides = ("task",)
+
+    # Loader options of the query: the project and client are displayed with the task
+    options = (joinedload(Task.project, innerjoin=True).joinedload(Project.client, innerjoin=True),)
+
+    def __init__(self, options: tuple = None):
+        super().__init__()
+        if options is not None:
+            self.options = options
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("read.execute() - Start")
 
-        if "task_id" not in context:
-            raise ContextKeyException("task_id")
-
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         task_id = int(context["task_id"])
         project = context["project"]
 
-        task = context.session.query(Task).filter(Task.project_id == project.project_id, Task.task_id == task_id).one()
+        task = context.session.query(Task).options(*self.options).filter(Task.project_id == project.project_id,
+                                                                         Task.task_id == task_id).one()
 
         context["task"] = task
 
@@ -71,63 +83,59 @@ class TaskReadCommand(Command):
 
 
 class TaskUpdateCommand(Command):
+    requires = ("session", "project", "task_id")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("update.execute() - Start")
 
-        if "task_id" not in context:
-            raise ContextKeyException("task_id")
-
-        if "project" not in context:
-            raise ContextKeyException("project")
-
-        updated = False
         task_id = int(context["task_id"])
         project = context["project"]
+        values = {key: context[key] for key in ("task_name", "task_active", "task_description", "task_remark")
+                  if key in context}
 
-        task = context.session.query(Task).filter(Task.project_id == project.project_id, Task.task_id == task_id).one()
-
-        if "task_name" in context:
-            task.task_name = context["task_name"]
-            updated = True
-
-        if "task_active" in context:
-            task.task_active = context["task_active"]
-            updated = True
-
-        if "task_description" in context:
-            task.task_description = context["task_description"]
-            updated = True
+        if not values:
+            logger.warning(f"Task[task_id = {task_id}] - not updated")
+            return Command.FAILURE
 
-        if "task_remark" in context:
-            task.task_remark = context["task_remark"]
-            updated = True
+        result = context.session.execute(update(tasks).where(tasks.c.project_id == project.project_id,
+                                                             tasks.c.task_id == task_id).values(values))
 
-        if updated:
-            logger.info(f"Task[task_id = {task_id}] - updated")
-        else:
-            logger.warning(f"Task[task_id = {task_id}] - not updated")
+        if result.rowcount == 0:
+            logger.warning(f"Task[task_id = {task_id}] - does not exist")
+            return Command.FAILURE
 
+        logger.info(f"Task[task_id = {task_id}] - updated")
         logger.debug("update.execute() - Finish")
-        return updated
+        return Command.SUCCESS
 
 
 class TaskDeleteCommand(Command):
+    requires = ("session", "project", "task_id")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("delete.execute() - Start")
 
-        if "task_id" not in context:
-            raise ContextKeyException("task_id")
-
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         task_id = int(context["task_id"])
         project = context["project"]
 
-        task = context.session.query(Task).filter(Task.project_id == project.project_id, Task.task_id == task_id).one()
-        context.session.delete(task)
+        # The periods first: SQLite does not enforce the foreign key
+        task = select(tasks.c.task_id).where(tasks.c.project_id == project.project_id,
+                                             tasks.c.task_id == task_id).scalar_subquery()
+        for start, finish in context.session.execute(select(periods.c.period_start, periods.c.period_finish)
+                                                     .where(periods.c.task_id == task, periods.c.period_finish != None)):
+            add_period(context.session, project.client_id, project.project_id, start, finish, -1)
+        context.session.execute(delete(daily_totals).where(daily_totals.c.client_id == project.client_id,
+                                                           daily_totals.c.project_id == project.project_id,
+                                                           daily_totals.c.total_duration < 0.001))
+        context.session.execute(delete(periods).where(periods.c.task_id == task))
+        result = context.session.execute(delete(tasks).where(tasks.c.project_id == project.project_id,
+                                                             tasks.c.task_id == task_id))
+
+        if result.rowcount == 0:
+            logger.warning(f"Task[task_id = {task_id}] - does not exist")
+            return Command.FAILURE
 
         logger.info(f"Task[task_id = {task_id}] - deleted")
         logger.debug("delete.execute() - Finish")
@@ -135,67 +143,108 @@ class TaskDeleteCommand(Command):
 
 
 class TaskListCommand(Command):
+    """
+    TaskListCommand: Lists the tasks of the project, as a query streamed by the caller.
+
+    Optional keys: task_state, task_between (start, finish: the tasks with a period overlapping it), task_after (a
+    task ID, keyset pagination) and task_limit.
+    """
+
+    requires = ("session", "project")
+    provides = ("tasks",)
+
+    # Loader options of the query: the project and client are displayed, the large columns are not
+    options = (joinedload(Task.project, innerjoin=True).joinedload(Project.client, innerjoin=True),
+               defer(Task.task_description), defer(Task.task_remark))
+
+    # Rows fetched and loaded per batch, while the tasks are iterated
+    yield_per = 1000
+
+    def __init__(self, options: tuple = None):
+        super().__init__()
+        if options is not None:
+            self.options = options
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("list.execute() - Start")
 
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         project = context["project"]
 
-        tasks = context.session.query(Task).filter(Task.project_id == project.project_id).order_by(
-            Task.task_id).all()
-        context["tasks"] = tasks
+        query = context.session.query(Task).options(*self.options).filter(Task.project_id == project.project_id)
+
+        if context.get("task_state") is not None:
+            query = query.filter(Task.task_state == TaskState[context["task_state"]])
+
+        if context.get("task_between") is not None:
+            start, finish = context["task_between"]
+            query = query.filter(Task.overlapping(start, finish, has_rtree(context.session)))
+
+        if context.get("task_after") is not None:
+            query = query.filter(Task.task_id > int(context["task_after"]))
+
+        query = query.order_by(Task.task_id)
+
+        if context.get("task_limit") is not None:
+            query = query.limit(int(context["task_limit"]))
+
+        context["tasks"] = query.yield_per(self.yield_per)
 
         logger.debug("list.execute() - Finish")
         return Command.SUCCESS
 
 
 class TaskNewCommand(Command):
+    requires = ("session", "project")
+    provides = ("task_id",)
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("new.execute() - Start")
 
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         project = context["project"]
 
-        task = Task(project_id=project.project_id, task_state=TaskState.NEW)
-        context.session.add(task)
+        result = context.session.execute(insert(tasks).values(project_id=project.project_id,
+                                                              task_state=TaskState.NEW))
+        context["task_id"] = result.inserted_primary_key[0]
 
-        logger.info(f"Task[task_id = NEW] - created")
+        logger.info(f"Task[task_id = {context['task_id']}] - created")
         logger.debug("new.execute() - Finish")
         return Command.SUCCESS
 
 
 class TaskStartCommand(Command):
+    """
+    TaskStartCommand: Starts a new task, or resumes a stopped task, by appending an open period.
+    """
+
+    requires = ("session", "project", "task_id")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("start.execute() - Start")
 
-        if "task_id" not in context:
-            raise ContextKeyException("task_id")
-
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         task_id = int(context["task_id"])
         project = context["project"]
 
-        for task in context.session.query(Task).filter(Task.task_active == true()).all():
-            task.task_active = False
-
         task = context.session.query(Task).filter(Task.project_id == project.project_id, Task.task_id == task_id).one()
 
-        if task.task_state != TaskState.NEW:
-            logger.warning(f"Task[task_id = {task_id}] is not NEW")
+        if task.task_state == TaskState.STARTED:
+            logger.warning(f"Task[task_id = {task_id}] is STARTED")
             return Command.FAILURE
 
+        # Through the partial index: the cost does not depend on the number of tasks
+        context.session.execute(update(Task).where(Task.task_active == true(), Task.task_id != task_id)
+                                .values(task_active=False))
+
+        now = datetime.datetime.now()
+        context.session.execute(insert(periods).values(task_id=task_id, period_start=now))
+
+        if task.task_start is None:
+            task.task_start = now
+        task.task_finish = None
         task.task_active = True
         task.task_state = TaskState.STARTED
-        task.task_start = datetime.datetime.now()
 
         logger.info(f"Task[task_id = {task_id}] - started")
         logger.debug("start.execute() - Finish")
@@ -203,16 +252,18 @@ class TaskStartCommand(Command):
 
 
 class TaskStopCommand(Command):
+    """
+    TaskStopCommand: Stops a task by closing its open period, task_duration caches the sum of the closed periods.
+
+    The closed period is added to the daily totals of the project.
+    """
+
+    requires = ("session", "project", "task_id")
+
     def execute(self, context: DatabaseContext) -> bool:
         logger = logging.getLogger(__name__)
         logger.debug("stop.execute() - Start")
 
-        if "task_id" not in context:
-            raise ContextKeyException("task_id")
-
-        if "project" not in context:
-            raise ContextKeyException("project")
-
         project = context["project"]
         task_id = int(context["task_id"])
 
@@ -222,14 +273,77 @@ class TaskStopCommand(Command):
             logger.warning(f"Task[task_id = {task_id}] is not STARTED")
             return Command.FAILURE
 
+        # Through ix_periods_open: a started task has one open period
+        period_id, start = context.session.execute(
+            select(periods.c.period_id, periods.c.period_start)
+            .where(periods.c.task_id == task_id, periods.c.period_finish.is_(None))).one()
+
+        now = datetime.datetime.now()
+        context.session.execute(update(periods).where(periods.c.period_id == period_id)
+                                .values(period_finish=now))
+        # The daily totals change in the same transaction
+        add_period(context.session, project.client_id, project.project_id, start, now)
+
         task.task_active = False
         task.task_state = TaskState.STOPPED
-        task.task_finish = datetime.datetime.now()
-
-        difference = task.task_finish - task.task_start
-        seconds = int(difference.total_seconds())
-        task.task_duration = task.task_duration + seconds
+        task.task_finish = now
+        # Summed by SQL and rounded once, as the report sums the periods: rounding every period drifts
+        seconds = context.session.execute(
+            select(func.sum((func.julianday(periods.c.period_finish) -
+                             func.julianday(periods.c.period_start)) * 86400.0))
+            .where(periods.c.task_id == task_id, periods.c.period_finish.isnot(None))).scalar()
+        task.task_duration = int(round(seconds or 0))
 
         logger.info(f"Task[task_id = {task_id}] - stopped")
         logger.debug("stop.execute() - Finish")
         return Command.SUCCESS
+
+
+class TaskConflictCommand(Command):
+    """
+    TaskConflictCommand: Finds the overlapping periods of different tasks, of all projects.
+
+    Every period is joined to the periods of its span through the R*Tree, or through ix_periods_start_finish without
+    one. Optional key: task_between (start, finish), only the periods overlapping it are checked.
+    """
+
+    requires = ("session",)
+    provides = ("conflicts",)
+
+    def execute(self, context: DatabaseContext) -> bool:
+        logger = logging.getLogger(__name__)
+        logger.debug("conflict.execute() - Start")
+
+        rtree = has_rtree(context.session)
+        now = datetime.datetime.now()
+        first = aliased(Period)
+        second = aliased(Period)
+        first_finish = func.coalesce(first.period_finish, now)
+        overlap = and_(second.period_start < first_finish,
+                       func.coalesce(second.period_finish, now) > first.period_start)
+
+        query = select(first.task_id, first.period_start, first.period_finish,
+                       second.task_id, second.period_start, second.period_finish).select_from(first)
+
+        if rtree:
+            candidates = periods_rtree.alias()
+            query = query \
+                .join(candidates, and_(candidates.c.period_start <= sql_epoch(first_finish),
+                                       candidates.c.period_finish >= sql_epoch(first.period_start))) \
+                .join(second, second.period_id == candidates.c.period_id)
+        else:
+            query = query.join(second, overlap)
+
+        query = query.where(overlap, second.task_id != first.task_id, first.period_id < second.period_id) \
+            .order_by(first.period_start, second.period_start)
+
+        if context.get("task_between") is not None:
+            start, finish = context["task_between"]
+            query = query.where(first.period_id.in_(select(Period.period_id)
+                                                    .where(Period.overlapping(start, finish, rtree))))
+
+        context["conflicts"] = context.session.execute(query).all()
+
+        logger.info(f"Conflicts - {len(context['conflicts'])}")
+        logger.debug("conflict.execute() - Finish")
+        return Command.SUCCESS
@@ -1,31 +1,32 @@
 import logging
 
 from zenith.chain import Processor
-from zenith.command.client import ClientActivateCommand, ClientExistCommand, ClientNotExistCommand, ClientCreateCommand, \
-    ClientReadCommand, ClientUpdateCommand, ClientDeleteCommand, ClientListCommand
-from zenith.factory.default import DefaultFactory
+from zenith.command.client import ClientActivateCommand, ClientExistCommand, ClientCreateCommand, ClientReadCommand, \
+    ClientUpdateCommand, ClientDeleteCommand, ClientListCommand
+from zenith.factory.default import DefaultFactory, template
 
 
 class ClientFactory(DefaultFactory):
     log_level = logging.INFO
 
     @classmethod
+    @template
     def create_activate(cls, level = logging.ERROR) -> Processor:
-        client = cls.create_default(level)
-        client.validating.append(ClientExistCommand())
+        client = cls.create_default(level, snapshot=True)
         client.processing.append(ClientActivateCommand())
 
         return client
 
     @classmethod
+    @template
     def create_create(cls, level = logging.ERROR) -> Processor:
-        client = cls.create_default(level)
-        client.validating.append(ClientNotExistCommand())
+        client = cls.create_default(level, snapshot=True)
         client.processing.append(ClientCreateCommand())
 
         return client
 
     @classmethod
+    @template
     def create_read(cls, level = logging.ERROR) -> Processor:
         client = cls.create_default(level)
         client.validating.append(ClientExistCommand())
@@ -34,22 +35,23 @@ class ClientFactory(DefaultFactory):
         return client
 
     @classmethod
+    @template
     def create_update(cls, level = logging.ERROR) -> Processor:
-        client = cls.create_default(level)
-        client.validating.append(ClientExistCommand())
+        client = cls.create_default(level, snapshot=True)
         client.processing.append(ClientUpdateCommand())
 
         return client
 
     @classmethod
+    @template
     def create_delete(cls, level = logging.ERROR) -> Processor:
-        client = cls.create_default(level)
-        client.validating.append(ClientExistCommand())
+        client = cls.create_default(level, snapshot=True)
         client.processing.append(ClientDeleteCommand())
 
         return client
 
     @classmethod
+    @template
     def create_list(cls, level = logging.ERROR) -> Processor:
         client = cls.create_default(level)
         client.processing.append(ClientListCommand())
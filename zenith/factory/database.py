@@ -0,0 +1,17 @@
+import logging
+
+from zenith.chain import Processor
+from zenith.command.rollup import RollupRebuildCommand
+from zenith.factory.default import DefaultFactory, template
+
+
+class DatabaseFactory(DefaultFactory):
+    log_level = logging.INFO
+
+    @classmethod
+    @template
+    def create_rebuild_rollups(cls, level = logging.ERROR) -> Processor:
+        database = cls.create_default(level, snapshot=True)
+        database.processing.append(RollupRebuildCommand())
+
+        return database
@@ -1,20 +1,60 @@
+import functools
 import logging
+import os
+import threading
 
 from zenith.chain import Processor
 from zenith.command.client import ClientActivateCommand, ClientExistCommand, ClientNotExistCommand, ClientCreateCommand, \
     ClientReadCommand, ClientUpdateCommand, ClientDeleteCommand, ClientListCommand
 from zenith.command.common import ReportCommand, ZenithCommand, ZenithDirectoryCommand, LoggingCommand, \
     AuthenticationCommand, ReadlineCommand
-from zenith.command.database import DatabaseSetupCommand, DatabaseSessionCommand, DatabaseCreateCommand
+from zenith.command.database import DatabaseSetupCommand, DatabaseSessionCommand, DatabaseCreateCommand, \
+    DatabaseMigrateCommand
 from zenith.command.node import NodeUUIDCommand
+from zenith.command.snapshot import SnapshotCommand
+
+
+def template(create):
+    """
+    Caches the processors created by a factory method, per factory class and log level.
+
+    The processor is compiled once and shared: the commands keep their per-run state in the context,
+    so the processor can be executed repeatedly and concurrently.
+    """
+    processors = dict()
+    lock = threading.Lock()
+
+    @functools.wraps(create)
+    def wrapper(cls, level=logging.ERROR) -> Processor:
+        key = (cls, level)
+
+        processor = processors.get(key)
+        if processor is None:
+            with lock:
+                processor = processors.get(key)
+                if processor is None:
+                    processor = create(cls, level)
+                    processor.compile()
+                    processors[key] = processor
+
+        return processor
+
+    wrapper.cache_clear = processors.clear
+    return wrapper
 
 
 class DefaultFactory(object):
     log_level = logging.INFO
+    # Opt-in: a one-shot command gains nothing from the executor threads, nor from a timings line in the log
+    parallel = bool(os.environ.get("ZENITH_PARALLEL"))
+    timed = bool(os.environ.get("ZENITH_TIMED"))
 
     @classmethod
-    def create_default(cls, level) -> Processor:
-        default = Processor()
+    def create_default(cls, level, snapshot: bool = False) -> Processor:
+        """
+        :param snapshot: writes the snapshot of `zenith status` after the commit, for the mutating commands
+        """
+        default = Processor(cls.parallel, cls.timed)
 
         default.reporting.append(ReportCommand())
 
@@ -22,6 +62,10 @@ class DefaultFactory(object):
         default.initialization.append(ZenithDirectoryCommand())
         default.initialization.append(LoggingCommand(level))
         default.initialization.append(DatabaseSetupCommand())
+        default.initialization.append(DatabaseMigrateCommand())
+        # Declared before the session: unwound after the commit
+        if snapshot:
+            default.initialization.append(SnapshotCommand())
         default.initialization.append(DatabaseSessionCommand())
         default.initialization.append(NodeUUIDCommand())
         default.initialization.append(ReadlineCommand())
@@ -0,0 +1,25 @@
+import logging
+
+from zenith.chain import Processor
+from zenith.command.exchange import ExportCommand, ImportCommand
+from zenith.factory.default import DefaultFactory, template
+
+
+class ExchangeFactory(DefaultFactory):
+    log_level = logging.INFO
+
+    @classmethod
+    @template
+    def create_import(cls, level = logging.ERROR) -> Processor:
+        exchange = cls.create_default(level, snapshot=True)
+        exchange.processing.append(ImportCommand())
+
+        return exchange
+
+    @classmethod
+    @template
+    def create_export(cls, level = logging.ERROR) -> Processor:
+        exchange = cls.create_default(level)
+        exchange.processing.append(ExportCommand())
+
+        return exchange
@@ -5,15 +5,16 @@ from zenith.command.common import ReportCommand, ZenithCommand, ZenithDirectoryC
     AuthenticationCommand
 from zenith.command.database import DatabaseSetupCommand, DatabaseSessionCommand, DatabaseCreateCommand
 from zenith.command.node import NodeUUIDCommand
-from zenith.factory.default import DefaultFactory
+from zenith.factory.default import DefaultFactory, template
 
 
 class InitFactory(DefaultFactory):
     log_level = logging.INFO
 
     @classmethod
+    @template
     def create_init(cls, level = logging.ERROR) -> Processor:
-        client = cls.create_default(level)
+        client = cls.create_default(level, snapshot=True)
         client.processing.append(DatabaseCreateCommand())
 
         return client
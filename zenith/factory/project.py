@@ -1,64 +1,66 @@
 import logging
 
 from zenith.chain import Processor
-from zenith.command.client import ClientActiveCommand
-from zenith.command.project import ProjectExistCommand, ProjectActivateCommand, ProjectNotExistCommand, \
-    ProjectCreateCommand, ProjectReadCommand, ProjectUpdateCommand, ProjectDeleteCommand, ProjectListCommand
-from zenith.factory.default import DefaultFactory
+from zenith.command.active import ActiveCommand
+from zenith.command.project import ProjectExistCommand, ProjectActivateCommand, ProjectCreateCommand, \
+    ProjectReadCommand, ProjectUpdateCommand, ProjectDeleteCommand, ProjectListCommand
+from zenith.factory.default import DefaultFactory, template
 
 
 class ProjectFactory(DefaultFactory):
     log_level = logging.INFO
 
     @classmethod
+    @template
     def create_activate(cls, level = logging.ERROR) -> Processor:
-        project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
-        project.validating.append(ProjectExistCommand())
+        project = cls.create_default(level, snapshot=True)
+        project.validating.append(ActiveCommand(project=False))
         project.processing.append(ProjectActivateCommand())
 
         return project
 
     @classmethod
+    @template
     def create_create(cls, level = logging.ERROR) -> Processor:
-        project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
-        project.validating.append(ProjectNotExistCommand())
+        project = cls.create_default(level, snapshot=True)
+        project.validating.append(ActiveCommand(project=False))
         project.processing.append(ProjectCreateCommand())
 
         return project
 
     @classmethod
+    @template
     def create_read(cls, level = logging.ERROR) -> Processor:
         project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
+        project.validating.append(ActiveCommand(project=False))
         project.validating.append(ProjectExistCommand())
         project.processing.append(ProjectReadCommand())
 
         return project
 
     @classmethod
+    @template
     def create_update(cls, level = logging.ERROR) -> Processor:
-        project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
-        project.validating.append(ProjectExistCommand())
+        project = cls.create_default(level, snapshot=True)
+        project.validating.append(ActiveCommand(project=False))
         project.processing.append(ProjectUpdateCommand())
 
         return project
 
     @classmethod
+    @template
     def create_delete(cls, level = logging.ERROR) -> Processor:
-        project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
-        project.validating.append(ProjectExistCommand())
+        project = cls.create_default(level, snapshot=True)
+        project.validating.append(ActiveCommand(project=False))
         project.processing.append(ProjectDeleteCommand())
 
         return project
 
     @classmethod
+    @template
     def create_list(cls, level = logging.ERROR) -> Processor:
         project = cls.create_default(level)
-        project.validating.append(ClientActiveCommand())
+        project.validating.append(ActiveCommand(project=False))
         project.processing.append(ProjectListCommand())
 
         return project
@@ -0,0 +1,17 @@
+import logging
+
+from zenith.chain import Processor
+from zenith.command.report import ReportTotalsCommand
+from zenith.factory.default import DefaultFactory, template
+
+
+class ReportFactory(DefaultFactory):
+    log_level = logging.INFO
+
+    @classmethod
+    @template
+    def create_totals(cls, level = logging.ERROR) -> Processor:
+        report = cls.create_default(level)
+        report.processing.append(ReportTotalsCommand())
+
+        return report
@@ -0,0 +1,14 @@
+import logging
+
+from zenith.chain import Processor
+from zenith.factory.default import DefaultFactory, template
+
+
+class StatusFactory(DefaultFactory):
+    log_level = logging.INFO
+
+    @classmethod
+    @template
+    def create_status(cls, level = logging.ERROR) -> Processor:
+        # Nothing to process: the snapshot is rewritten from the database
+        return cls.create_default(level, snapshot=True)
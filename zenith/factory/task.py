@@ -1,75 +1,80 @@
 import logging
 
 from zenith.chain import Processor
-from zenith.command.client import ClientActiveCommand
-from zenith.command.project import ProjectActiveCommand
-from zenith.command.task import TaskNewCommand, TaskStartCommand, TaskActiveCommand, TaskStopCommand, \
-    TaskListCommand, TaskReadCommand, TaskUpdateCommand, TaskDeleteCommand
-from zenith.factory.default import DefaultFactory
+from zenith.command.active import ActiveCommand
+from zenith.command.task import TaskNewCommand, TaskStartCommand, TaskStopCommand, TaskListCommand, \
+    TaskReadCommand, TaskUpdateCommand, TaskDeleteCommand, TaskConflictCommand
+from zenith.factory.default import DefaultFactory, template
 
 
 class TaskFactory(DefaultFactory):
     @classmethod
+    @template
     def create_new(cls, level=logging.ERROR) -> Processor:
-        task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
+        task = cls.create_default(level, snapshot=True)
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskNewCommand())
 
         return task
 
     @classmethod
+    @template
     def create_start(cls, level=logging.ERROR) -> Processor:
-        task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
+        task = cls.create_default(level, snapshot=True)
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskStartCommand())
 
         return task
 
     @classmethod
+    @template
     def create_stop(cls, level=logging.ERROR) -> Processor:
-        task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
-        task.validating.append(TaskActiveCommand())
+        task = cls.create_default(level, snapshot=True)
+        task.validating.append(ActiveCommand(task=True))
         task.processing.append(TaskStopCommand())
 
         return task
 
     @classmethod
+    @template
     def create_read(cls, level=logging.ERROR) -> Processor:
         task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
-        # task.validating.append(TaskActiveCommand())
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskReadCommand())
 
         return task
 
     @classmethod
+    @template
     def create_update(cls, level=logging.ERROR) -> Processor:
-        task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
+        task = cls.create_default(level, snapshot=True)
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskUpdateCommand())
 
         return task
 
     @classmethod
+    @template
     def create_delete(cls, level=logging.ERROR) -> Processor:
-        task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
+        task = cls.create_default(level, snapshot=True)
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskDeleteCommand())
 
         return task
 
     @classmethod
+    @template
     def create_list(cls, level=logging.ERROR) -> Processor:
         task = cls.create_default(level)
-        task.validating.append(ClientActiveCommand())
-        task.validating.append(ProjectActiveCommand())
+        task.validating.append(ActiveCommand())
         task.processing.append(TaskListCommand())
 
         return task
+
+    @classmethod
+    @template
+    def create_conflicts(cls, level=logging.ERROR) -> Processor:
+        task = cls.create_default(level)
+        task.processing.append(TaskConflictCommand())
+
+        return task
@@ -2,13 +2,37 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum, Float, ForeignKey, Index, Integer, MetaData, String, \
+    Table, UniqueConstraint, and_, func, or_, select, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import configure_mappers, relationship
 
 Base = declarative_base()
 
 
+# The R*Tree of the periods, a virtual table: not created by create_all()
+periods_rtree = Table("periods_rtree", MetaData(),
+                      Column("period_id", Integer(), primary_key=True),
+                      Column("period_start", Float()),
+                      Column("period_finish", Float()))
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def epoch(value: datetime) -> float:
+    """
+    Returns the seconds since 1970-01-01 of the datetime, as SQLite julianday() computes them.
+    """
+    return (value - EPOCH).total_seconds()
+
+
+def sql_epoch(column):
+    """
+    Returns the SQL expression of the seconds since 1970-01-01 of the datetime column.
+    """
+    return (func.julianday(column) - 2440587.5) * 86400.0
+
+
 def generate_uuid() -> str:
     """
     Generates a random UUID.
@@ -20,6 +44,7 @@ def generate_uuid() -> str:
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (Index("ix_clients_active", "client_active", unique=True, sqlite_where=text("client_active = 1")),)
 
     client_id = Column(Integer(), primary_key=True, nullable=False)
     client_uuid = Column(String(128), index=True, default=generate_uuid, nullable=False, unique=True)
@@ -56,7 +81,8 @@ class Contact(Base):
 
 class Project(Base):
     __tablename__ = "projects"
-    __table_args__ = (UniqueConstraint('client_id', 'project_name'),)
+    __table_args__ = (UniqueConstraint('client_id', 'project_name'),
+                      Index("ix_projects_active", "client_id", unique=True, sqlite_where=text("project_active = 1")))
 
     client_id = Column(Integer(), ForeignKey("clients.client_id"), nullable=False)
     project_id = Column(Integer(), primary_key=True, nullable=False)
@@ -87,6 +113,10 @@ class TaskState(enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_project_task", "project_id", "task_id"),
+                      Index("ix_tasks_project_state", "project_id", "task_state", "task_id"),
+                      Index("ix_tasks_active", "project_id", sqlite_where=text("task_active = 1")),
+                      Index("ix_tasks_active_unique", "task_active", unique=True, sqlite_where=text("task_active = 1")))
 
     project_id = Column(Integer(), ForeignKey("projects.project_id"), nullable=False)
     task_id = Column(Integer(), primary_key=True, nullable=False)
@@ -102,11 +132,68 @@ class Task(Base):
     created_on = Column(DateTime(), default=datetime.now, nullable=False)
     updated_on = Column(DateTime(), default=datetime.now, onupdate=datetime.now, nullable=False)
 
+    periods = relationship("Period", backref="task", order_by="Period.period_start")
+
+    @classmethod
+    def overlapping(cls, start: datetime, finish: datetime, rtree: bool = True):
+        """
+        Returns the criterion of the tasks with a period overlapping [start, finish).
+        """
+        return cls.task_id.in_(select(Period.task_id).where(Period.overlapping(start, finish, rtree)))
+
     def __repr__(self) -> str:
         return f"Task<task_id: {self.task_id}, task_uuid: {self.task_uuid}, " \
                f"task_name: {self.task_name}, task_active: {self.task_active}>"
 
 
+class Period(Base):
+    __tablename__ = "periods"
+    __table_args__ = (Index("ix_periods_task_start", "task_id", "period_start"),
+                      Index("ix_periods_start_finish", "period_start", "period_finish"),
+                      Index("ix_periods_open", "task_id", sqlite_where=text("period_finish IS NULL")))
+
+    task_id = Column(Integer(), ForeignKey("tasks.task_id"), nullable=False)
+    period_id = Column(Integer(), primary_key=True, nullable=False)
+    period_start = Column(DateTime(), nullable=False)
+    period_finish = Column(DateTime(), default=None, nullable=True)
+    created_on = Column(DateTime(), default=datetime.now, nullable=False)
+    updated_on = Column(DateTime(), default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    @classmethod
+    def overlapping(cls, start: datetime, finish: datetime, rtree: bool = True):
+        """
+        Returns the criterion of the periods overlapping [start, finish), an open period lasts until now.
+
+        With rtree, the candidates are searched in the R*Tree: its bounds are rounded outwards, the exact comparison
+        is done on the periods. Without, ix_periods_start_finish is scanned up to finish.
+        """
+        criterion = and_(cls.period_start < finish, or_(cls.period_finish == None, cls.period_finish > start))
+
+        if rtree:
+            candidates = select(periods_rtree.c.period_id).where(periods_rtree.c.period_start <= epoch(finish),
+                                                                 periods_rtree.c.period_finish >= epoch(start))
+            criterion = and_(cls.period_id.in_(candidates), criterion)
+
+        return criterion
+
+    def __repr__(self) -> str:
+        return f"Period<period_id: {self.period_id}, task_id: {self.task_id}, " \
+               f"period_start: {self.period_start}, period_finish: {self.period_finish}>"
+
+
+class DailyTotal(Base):
+    __tablename__ = "daily_totals"
+
+    total_date = Column(Date(), primary_key=True, nullable=False)
+    client_id = Column(Integer(), ForeignKey("clients.client_id"), primary_key=True, nullable=False)
+    project_id = Column(Integer(), ForeignKey("projects.project_id"), primary_key=True, nullable=False)
+    total_duration = Column(Float(), default=0.0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"DailyTotal<total_date: {self.total_date}, client_id: {self.client_id}, " \
+               f"project_id: {self.project_id}, total_duration: {self.total_duration}>"
+
+
 class Asset(Base):
     __tablename__ = "assets"
 
@@ -139,6 +226,18 @@ class Note(Base):
     updated_on = Column(DateTime(), default=datetime.now, onupdate=datetime.now, nullable=False)
 
 
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer(), primary_key=True, nullable=False)
+    name = Column(String(128), nullable=False)
+    applied_on = Column(DateTime(), default=datetime.now, nullable=False)
+
+
+# Creates the backrefs Project.client, Task.project and Period.task, used in loader options
+configure_mappers()
+
+
 if __name__ == "__main__":
     from sqlalchemy import create_engine
 
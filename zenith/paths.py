@@ -0,0 +1,48 @@
+"""
+Zenith directory layout, without importing the rest of Zenith.
+"""
+import os
+
+
+def find_zenith_dir(directory: str) -> str:
+    """
+    Finds the .zenith directory in the directory or one of its parents.
+
+    :param directory: the directory to start from
+    :return: the .zenith directory, or None when not found
+    """
+    current_dir = directory
+
+    while True:
+        tmp = os.path.join(current_dir, ".zenith")
+
+        if os.path.isdir(tmp):
+            return tmp
+
+        parent = os.path.dirname(current_dir)
+        if current_dir == parent:
+            return None
+
+        current_dir = parent
+
+
+def db_filename(zenith_dir: str) -> str:
+    return os.path.join(zenith_dir, "var", "db", "zenith.db")
+
+
+def tmp_dir(zenith_dir: str) -> str:
+    return os.path.join(zenith_dir, "var", "tmp")
+
+
+def socket_filename(zenith_dir: str) -> str:
+    """
+    Returns the Unix domain socket of `zenith serve`.
+    """
+    return os.path.join(tmp_dir(zenith_dir), "zenith.sock")
+
+
+def snapshot_filename(zenith_dir: str) -> str:
+    """
+    Returns the snapshot of the active client, project and task, read by `zenith status`.
+    """
+    return os.path.join(tmp_dir(zenith_dir), "status.bin")
@@ -0,0 +1,187 @@
+"""
+Snapshot of the active client, project and task, read by `zenith status` without importing SQLAlchemy.
+
+The snapshot is a fixed-layout binary file in var/tmp, rewritten after every mutating command. Only the
+standard library is imported: a shell prompt pays the start up of Python, not of Zenith.
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+
+from zenith.paths import db_filename, find_zenith_dir, snapshot_filename
+
+# Magic, version, flags, client_id, project_id, task_id, start (epoch seconds) and the names, UTF-8 padded with NULs
+LAYOUT = struct.Struct("<4sHHqqqd64s64s64s")
+MAGIC = b"ZNTH"
+VERSION = 1
+
+HAS_CLIENT = 0x01
+HAS_PROJECT = 0x02
+HAS_TASK = 0x04
+RUNNING = 0x08
+
+
+def encode(name: str) -> bytes:
+    """
+    Encodes a name in UTF-8, truncated to 64 bytes without splitting a character.
+    """
+    return (name or "").encode("utf-8")[:64].decode("utf-8", "ignore").encode("utf-8")
+
+
+def write(filename: str, client: tuple = None, project: tuple = None, task: tuple = None,
+          start: float = None) -> None:
+    """
+    Writes the snapshot, replacing the file at once.
+
+    :param client: tuple of the id and name of the active client, None when no client is active
+    :param project: tuple of the id and name of the active project
+    :param task: tuple of the id and name of the active task
+    :param start: the start of the open period of the active task in epoch seconds, None when it is not running
+    """
+    flags = (HAS_CLIENT if client else 0) | (HAS_PROJECT if project else 0) | (HAS_TASK if task else 0) | \
+        (RUNNING if start else 0)
+    client_id, client_name = client or (0, None)
+    project_id, project_name = project or (0, None)
+    task_id, task_name = task or (0, None)
+
+    data = LAYOUT.pack(MAGIC, VERSION, flags, client_id, project_id, task_id, start or 0.0,
+                       encode(client_name), encode(project_name), encode(task_name))
+
+    tmp = f"{filename}.{os.getpid()}"
+    with open(tmp, "wb") as file:
+        file.write(data)
+    os.replace(tmp, filename)
+
+
+def read(filename: str) -> dict:
+    """
+    Reads the snapshot through a memory map.
+
+    :return: dict with the ids and names of the client, project and task, and the start in epoch seconds; None
+             when the file is missing or of another layout
+    """
+    try:
+        with open(filename, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if len(data) != LAYOUT.size:
+                    return None
+                magic, version, flags, client_id, project_id, task_id, start, client_name, project_name, \
+                    task_name = LAYOUT.unpack_from(data)
+    except (OSError, ValueError):
+        return None
+
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    return {
+        "client_id": client_id if flags & HAS_CLIENT else None,
+        "client_name": client_name.rstrip(b"\0").decode("utf-8") if flags & HAS_CLIENT else None,
+        "project_id": project_id if flags & HAS_PROJECT else None,
+        "project_name": project_name.rstrip(b"\0").decode("utf-8") if flags & HAS_PROJECT else None,
+        "task_id": task_id if flags & HAS_TASK else None,
+        "task_name": task_name.rstrip(b"\0").decode("utf-8") if flags & HAS_TASK else None,
+        "start": start if flags & RUNNING else None,
+    }
+
+
+def stale(filename: str, database: str) -> bool:
+    """
+    Returns whether the database was changed after the snapshot was written.
+
+    The writer of the snapshot checkpoints the write-ahead log into the database first, and truncates it: a later
+    commit is in the log, a later checkpoint changes the database file. The modification time of the log is not
+    compared, every connection which opens the database can create it anew.
+    """
+    try:
+        written = os.stat(filename).st_mtime_ns
+    except OSError:
+        return True
+
+    try:
+        if os.stat(database).st_mtime_ns > written:
+            return True
+    except FileNotFoundError:
+        pass
+
+    try:
+        return os.stat(f"{database}-wal").st_size > 0
+    except FileNotFoundError:
+        return False
+
+
+def elapsed(start: float, now: float = None) -> str:
+    seconds = max(0, int((now or time.time()) - start))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def prompt(snapshot: dict) -> str:
+    """
+    Returns the status in one line for a shell prompt: client/project #task 0:12:34
+    """
+    if snapshot["client_name"] is None:
+        return ""
+
+    line = snapshot["client_name"]
+    if snapshot["project_name"] is not None:
+        line += f"/{snapshot['project_name']}"
+    if snapshot["task_id"] is not None:
+        line += f" #{snapshot['task_id']}"
+    if snapshot["start"] is not None:
+        line += f" {elapsed(snapshot['start'])}"
+
+    return line
+
+
+def display(snapshot: dict) -> str:
+    """
+    Returns the status, one line per client, project and task.
+    """
+    lines = [f"Client:      {snapshot['client_name'] or ''}", f"Project:     {snapshot['project_name'] or ''}"]
+
+    if snapshot["task_id"] is None:
+        lines.append("Task:")
+    elif snapshot["task_name"]:
+        lines.append(f"Task:        {snapshot['task_id']} {snapshot['task_name']}")
+    else:
+        lines.append(f"Task:        {snapshot['task_id']}")
+
+    if snapshot["start"] is not None:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["start"]))
+        lines.append(f"Started:     {started} ({elapsed(snapshot['start'])})")
+
+    return "\n".join(lines)
+
+
+def status(argv: list, directory: str = None):
+    """
+    Prints the status from the snapshot, when it is newer than the database.
+
+    :param argv: the arguments after `status`
+    :param directory: the current directory, default os.getcwd()
+    :return: the exit status, or None when the snapshot is stale and the database must be read
+    """
+    zenith_dir = find_zenith_dir(directory or os.getcwd())
+    if zenith_dir is None:
+        # Outside of a Zenith tree a shell prompt shows nothing
+        if "--prompt" in argv:
+            sys.stdout.write("\n")
+            return 0
+        sys.stdout.write("No .zenith directory found\n")
+        return 1
+
+    filename = snapshot_filename(zenith_dir)
+    if stale(filename, db_filename(zenith_dir)):
+        return None
+
+    snapshot = read(filename)
+    if snapshot is None:
+        return None
+
+    if "--prompt" in argv:
+        sys.stdout.write(prompt(snapshot) + "\n")
+    else:
+        sys.stdout.write(display(snapshot) + "\n")
+
+    return 0